@@ -3,7 +3,6 @@ import subprocess
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import configparser
-import ffmpeg  # Biblioteca ffmpeg-python para extrair informações do vídeo
 import json
 import platform
 
@@ -276,6 +275,8 @@ def show_video_info():
         messagebox.showerror("Erro", "Caminho do ffprobe não encontrado. Verifique se o caminho está correto.")
         return
 
+    import ffmpeg  # Biblioteca ffmpeg-python (só para o tipo de erro); importada aqui para não atrasar a abertura
+
     try:
         command = [ffprobe_path, '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', input_file]
         process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
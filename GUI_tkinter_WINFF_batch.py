@@ -1,3 +1,5 @@
+import time
+startup_started = time.perf_counter()  # Início da abertura (winff_bench.py startup)
 import os
 import subprocess
 import tkinter as tk
@@ -6,35 +8,81 @@ import configparser
 import json
 import threading
 import platform
-import requests
-import zipfile
-import shutil
-import tempfile
 import sys
-
-# Caminho padrão em subpasta bin para o ffmpeg
-def get_default_ffmpeg_path():
-    if getattr(sys, 'frozen', False):  # Verifica se o programa está empacotado pelo PyInstaller
-        base_path = os.path.join(sys._MEIPASS, 'bin')
-    else:
-        base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin')
-    
-    executable_name = 'ffmpeg.exe' if platform.system() == 'Windows' else 'ffmpeg'
-    return os.path.join(base_path, executable_name)
+import queue
+import sqlite3
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from winff_probecache import get_ffprobe_version
+from winff_core import (PROGRESS_UPDATE_INTERVAL, PROBE_WORKERS, JOB_ORDERS, get_default_ffmpeg_path, get_default_config, parse_job_count,
+                        get_ffprobe_path, get_output_dir, get_output_file, build_command, format_command, run_batch,
+                        plan_core_budget, apply_core_budget, format_duration, read_probe, ProbeError, get_probe_cache,
+                        cached_probe, plan_stream_copy, get_probe_duration, get_capabilities, no_window_kwargs,
+                        parse_renditions, get_rendition_outputs, resolve_data_paths, settings_from_config, config_boolean)
+from winff_core import load_language as load_language_file
+from winff_jobqueue import JobJournal
+from winff_metrics import read_metrics, last_batch_metrics, summarize_metrics
+from winff_filelist import FileList
+from winff_scan import scan_media_files
+from winff_preflight import run_preflight, valid_files, format_preflight_report
+# requests/zipfile (download do ffmpeg) e winff_status (servidor HTTP) são importados só quando usados
+imports_finished = time.perf_counter()
+
+# Fila única de eventos da interface: threads de trabalho apenas enfileiram,
+# e o loop principal do Tk aplica os eventos via root.after
+UI_POLL_INTERVAL_MS = 16
+ui_events = queue.Queue()
+ui_latency_samples = deque(maxlen=10000)
+
+# Enfileira uma chamada para o loop principal; eventos com a mesma chave são
+# agrupados e somente o último de cada ciclo é aplicado
+def post_ui(func, *args, key=None):
+    ui_events.put((key, func, args, time.monotonic()))
+
+# Drena a fila uma vez por quadro, aplicando uma única atualização por chave
+def process_ui_events():
+    pending = {}
+    try:
+        while True:
+            key, func, args, posted = ui_events.get_nowait()
+            if key is None:
+                key = object()
+            pending.pop(key, None)
+            pending[key] = (func, args, posted)
+    except queue.Empty:
+        pass
+
+    for func, args, posted in pending.values():
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"UI event error: {e}")
+        ui_latency_samples.append(time.monotonic() - posted)
+
+    root.after(UI_POLL_INTERVAL_MS, process_ui_events)
+
+# Resumo da latência (ms) entre o evento enfileirado e sua aplicação no loop principal
+def get_ui_latency_stats():
+    samples = sorted(ui_latency_samples)
+    if not samples:
+        return None
+    return {
+        'events': len(samples),
+        'mean_ms': 1000 * sum(samples) / len(samples),
+        'p95_ms': 1000 * samples[int(0.95 * (len(samples) - 1))],
+        'max_ms': 1000 * samples[-1],
+    }
 
 # Inicializar o objeto de configuração
 config = configparser.ConfigParser()
-config_file = 'config.ini'
+config_file = os.path.abspath('config.ini')
 
 # Função para carregar o idioma selecionado
 def load_language(lang_code):
-    locales_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
-    try:
-        with open(os.path.join(locales_folder, f"{lang_code}.json"), "r", encoding="utf-8") as file:
-            return json.load(file)
-    except FileNotFoundError:
+    language_data = load_language_file(lang_code)
+    if not language_data:
         messagebox.showerror("Error", f"Language file {lang_code}.json not found.")
-        return {}
+    return language_data
 
 # Carregar o idioma padrão (Português)
 language = load_language("pt_br")
@@ -59,21 +107,7 @@ def load_or_create_config():
     if os.path.exists(config_file):
         config.read(config_file)
     else:
-        config['DEFAULT'] = {
-            'ffmpeg_path': get_default_ffmpeg_path(),
-            'default_format': 'wmv',
-            'default_output_dir': '',
-            'default_video_codec': 'wmv2',
-            'default_audio_codec': 'wmav2',
-            'default_resolution': '320x240',
-            'video_bitrate': '204800',
-            'audio_bitrate': '65536',
-            'frame_rate': '20',
-            'audio_sample_rate': '22050',
-            'audio_channels': '1',
-            'use_same_directory': 'False',
-            'overwrite_existing': 'True'
-        }
+        config['DEFAULT'] = get_default_config()
         with open(config_file, 'w') as configfile:
             config.write(configfile)
 
@@ -91,7 +125,8 @@ def save_config():
         messagebox.showwarning(language.get("warning", "Warning"), language.get("no_file_selected", "No file selected. Configuration not saved."))
         return
 
-    config['DEFAULT'] = {
+    # Atualiza em vez de substituir, preservando chaves ajustadas só no arquivo (ex.: split_min_duration)
+    config.read_dict({'DEFAULT': {
         'ffmpeg_path': ffmpeg_path_entry.get(),
         'default_format': format_var.get(),
         'default_output_dir': output_dir_entry.get(),
@@ -104,8 +139,14 @@ def save_config():
         'audio_sample_rate': audio_sample_rate_entry.get(),
         'audio_channels': audio_channels_var.get(),
         'use_same_directory': use_same_directory_var.get(),
-        'overwrite_existing': overwrite_var.get()
-    }
+        'overwrite_existing': overwrite_var.get(),
+        'stream_copy': stream_copy_var.get(),
+        'split_encode': split_encode_var.get(),
+        'transcription_audio': transcription_var.get(),
+        'parallel_jobs': parallel_jobs_spinbox.get(),
+        'job_order': job_order_var.get(),
+        'renditions': json.dumps(renditions)
+    }})
     with open(config_file_path, 'w') as configfile:
         config.write(configfile)
     messagebox.showinfo(language.get("config", "Configuration"), f"{language.get('config_saved', 'Configuration successfully saved to')} {config_file_path}.")
@@ -137,6 +178,14 @@ def set_default_options():
     ffmpeg_path_entry.insert(0, get_default_ffmpeg_path())
     use_same_directory_var.set(False)
     overwrite_var.set(True)
+    stream_copy_var.set(True)
+    split_encode_var.set(False)
+    transcription_var.set(False)
+    parallel_jobs_spinbox.delete(0, tk.END)
+    parallel_jobs_spinbox.insert(0, "auto")
+    job_order_var.set("longest")
+    renditions.clear()
+    update_renditions_button()
     update_command_display()
 
 # Função para aplicar opções salvas
@@ -158,20 +207,175 @@ def apply_saved_config():
     audio_sample_rate_entry.delete(0, tk.END)
     audio_sample_rate_entry.insert(0, config.get('DEFAULT', 'audio_sample_rate', fallback='22050'))
     audio_channels_var.set(config.get('DEFAULT', 'audio_channels', fallback='1'))
-    use_same_directory_var.set(config.getboolean('DEFAULT', 'use_same_directory', fallback=False))
-    overwrite_var.set(config.getboolean('DEFAULT', 'overwrite_existing', fallback=True))
+    use_same_directory_var.set(config_boolean(config, 'use_same_directory'))
+    overwrite_var.set(config_boolean(config, 'overwrite_existing'))
+    stream_copy_var.set(config_boolean(config, 'stream_copy'))
+    split_encode_var.set(config_boolean(config, 'split_encode'))
+    transcription_var.set(config_boolean(config, 'transcription_audio'))
+    parallel_jobs_spinbox.delete(0, tk.END)
+    parallel_jobs_spinbox.insert(0, str(parse_job_count(config.get('DEFAULT', 'parallel_jobs', fallback='auto'))))
+    job_order = config.get('DEFAULT', 'job_order', fallback='longest')
+    job_order_var.set(job_order if job_order in JOB_ORDERS else 'longest')
+    renditions[:] = parse_renditions(config.get('DEFAULT', 'renditions', fallback='[]'))
+    update_renditions_button()
     toggle_output_directory()
     update_command_display()
 
+# Lista de arquivos do lote (winff_filelist) exibida de forma virtualizada: o Treeview só
+# contém as FILE_VIEW_ROWS linhas visíveis, refeitas a partir de file_view_offset a cada
+# rolagem ou alteração, então a lista abre e rola igual com 10 ou 100 mil arquivos
+FILE_VIEW_ROWS = 10
+FILE_INFO_BATCH = 500   # Arquivos por atualização ao preencher tamanho e duração
+file_model = FileList()
+file_selection = set()
+file_view_offset = 0
+file_info_executor = ThreadPoolExecutor(max_workers=1)
+folder_import_cancel = threading.Event()
+
+def format_file_size(size):
+    if size is None:
+        return ""
+    if size >= 1024 * 1024 * 1024:
+        return f"{size / 1024 ** 3:.2f} GB"
+    return f"{size / 1024 ** 2:.1f} MB"
+
+def render_file_view():
+    global file_view_offset
+    total = len(file_model)
+    file_view_offset = max(0, min(file_view_offset, total - FILE_VIEW_ROWS))
+    file_tree.delete(*file_tree.get_children())
+    for path, entry in file_model.rows(file_view_offset, FILE_VIEW_ROWS):
+        status = language.get(f"file_status_{entry['status']}", entry['status']) if entry['status'] else ""
+        duration = format_duration(entry['duration']) if entry['duration'] else ""
+        file_tree.insert('', 'end', iid=path, values=(path, format_file_size(entry['size']), duration, status))
+    file_tree.selection_set([path for path in file_tree.get_children() if path in file_selection])
+    if total > FILE_VIEW_ROWS:
+        file_scrollbar.set(file_view_offset / total, (file_view_offset + FILE_VIEW_ROWS) / total)
+    else:
+        file_scrollbar.set(0, 1)
+    selected_files_label.config(text=f"{language.get('selected_files', 'Selected Files:')} {total}" if total else language.get("selected_files", "Selected Files:"))
+
+# Comando da barra de rolagem ("moveto" fração / "scroll" n units|pages)
+def scroll_file_view(*args):
+    global file_view_offset
+    if args[0] == 'moveto':
+        file_view_offset = int(float(args[1]) * len(file_model))
+    elif args[0] == 'scroll':
+        file_view_offset += int(args[1]) * (FILE_VIEW_ROWS if args[2] == 'pages' else 1)
+    render_file_view()
+
+def on_file_view_wheel(event):
+    scroll_file_view('scroll', -3 if event.num == 4 or event.delta > 0 else 3, 'units')
+    return 'break'
+
+# A seleção é guardada por caminho, porque as linhas do Treeview são refeitas ao rolar
+def on_file_view_select(event=None):
+    file_selection.difference_update(file_tree.get_children())
+    file_selection.update(file_tree.selection())
+
+def set_file_view_headings():
+    headings = {'path': language.get("file_info", "File Info"), 'size': language.get("size", "Size"),
+                'duration': language.get("duration", "Duration"), 'status': "Status"}
+    for column, text in headings.items():
+        file_tree.heading(column, text=text)
+
+# Inclui arquivos ainda não listados; tamanho (se não vier em sizes) e duração (do cache de
+# ffprobe) são preenchidos em segundo plano
+def add_files_to_list(paths, sizes=None):
+    added = file_model.add(paths)
+    if added:
+        render_file_view()
+        fill_file_info(added, sizes)
+    update_command_display()
+    return added
+
+def fill_file_info(paths, sizes=None):
+    settings = collect_settings()
+    ffprobe_path = get_ffprobe_path(settings['ffmpeg_path'])
+    cache = get_probe_cache(settings)
+    fast = settings['probe_mode'] == 'fast'
+
+    def fill():
+        for start in range(0, len(paths), FILE_INFO_BATCH):
+            updates = []
+            for path in paths[start:start + FILE_INFO_BATCH]:
+                try:
+                    size = sizes[path] if sizes else os.path.getsize(path)
+                except OSError:
+                    size = None
+                info = cached_probe(ffprobe_path, path, cache, fast)
+                updates.append((path, size, get_probe_duration(info) if info else None))
+            post_ui(apply_file_info, updates)
+
+    file_info_executor.submit(fill)
+
+def apply_file_info(updates):
+    for path, size, duration in updates:
+        file_model.update(path, size=size, duration=duration)
+    render_file_view()
+
+def set_file_status(path, status):
+    file_model.update(path, status=status)
+
+def remove_selected_files():
+    file_model.remove(file_selection)
+    file_selection.clear()
+    render_file_view()
+    update_command_display()
+
+# Limpar a lista também interrompe as importações de pasta em andamento
+def clear_file_list():
+    global folder_import_cancel
+    folder_import_cancel.set()
+    folder_import_cancel = threading.Event()
+    file_model.clear()
+    file_selection.clear()
+    render_file_view()
+    update_command_display()
+
 # Função para selecionar arquivos de vídeo
 def select_files():
     files = filedialog.askopenfilenames(title=language.get("select_files", "Select Files"))
     if files:
-        current_files = file_list.get(0, tk.END)
-        for file in files:
-            if file not in current_files:
-                file_list.insert(tk.END, file)
-    update_command_display()
+        add_files_to_list(files)
+    else:
+        update_command_display()
+
+# Importa uma pasta com subpastas em segundo plano (winff_scan); os arquivos entram na lista
+# em lotes enquanto a busca continua
+def select_folder():
+    directory = filedialog.askdirectory(title=language.get("add_folder_button", "Add Folder"))
+    if directory:
+        start_folder_import([directory])
+
+def start_folder_import(directories):
+    cancel = folder_import_cancel
+    settings = collect_settings()
+
+    def on_batch(files):
+        post_ui(add_imported_files, cancel, [path for path, size in files], dict(files))
+
+    def on_progress(totals):
+        text = f"{language.get('importing', 'Importing')}: {totals['files']} {language.get('files', 'files')}, {totals['directories']} {language.get('folders', 'folders')}"
+        post_ui(individual_progress_label.config, {'text': text}, key='folder_import')
+
+    def run():
+        totals = scan_media_files(directories, on_batch, settings['scan_magic'], settings['scan_settle_seconds'], cancel=cancel, on_progress=on_progress)
+        post_ui(finish_folder_import, totals, key='folder_import')
+
+    threading.Thread(target=run, daemon=True).start()
+
+def add_imported_files(cancel, paths, sizes):
+    if not cancel.is_set():
+        add_files_to_list(paths, sizes)
+
+def finish_folder_import(totals):
+    text = (f"{language.get('imported', 'Imported')}: {totals['files']} {language.get('files', 'files')}, {totals['directories']} {language.get('folders', 'folders')}; "
+            f"{language.get('skipped', 'skipped')}: {totals['empty']} {language.get('empty_files', 'empty')}, "
+            f"{totals['growing']} {language.get('growing_files', 'still being written')}, {totals['other']} {language.get('other_files', 'other')}")
+    if totals['cancelled']:
+        text += f" ({language.get('cancelled', 'cancelled')})"
+    individual_progress_label.config(text=text)
 
 # Função para selecionar diretório de saída
 def select_output_directory():
@@ -204,19 +408,16 @@ def show_installing_window(install_path):
     
     return installing_window, progress_bar
 
-def download_ffmpeg():
-    download_url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
-    dest_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin')
+def download_ffmpeg(dest_folder, installing_window, progress_bar):
+    import requests
+    import zipfile
+    import shutil
+    import tempfile
 
-    # Verificar se a pasta bin já existe
-    if os.path.exists(dest_folder):
-        result = messagebox.askyesno(language.get("confirmation", "Confirmation"), language.get("bin_exists", "The 'bin' folder already exists. Do you want to continue with the download and overwrite the files?"))
-        if not result:
-            return
+    download_url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
+    temp_dir = None
 
     try:
-        installing_window, progress_bar = show_installing_window(dest_folder)
-
         temp_dir = tempfile.mkdtemp()
         zip_path = os.path.join(temp_dir, "ffmpeg.zip")
 
@@ -229,9 +430,9 @@ def download_ffmpeg():
                 if chunk:
                     f.write(chunk)
                     downloaded += len(chunk)
-                    progress_percentage = int(100 * downloaded / total_length)
-                    progress_bar['value'] = progress_percentage
-                    installing_window.update()
+                    if total_length:
+                        progress_percentage = int(100 * downloaded / total_length)
+                        post_ui(progress_bar.config, {'value': progress_percentage}, key='download_progress')
 
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             zip_ref.extractall(temp_dir)
@@ -245,182 +446,374 @@ def download_ffmpeg():
             d = os.path.join(dest_folder, item)
             shutil.move(s, d)
 
-        messagebox.showinfo(language.get("success", "Success"), f"{language.get('ffmpeg_installed', 'FFmpeg and ffprobe have been successfully downloaded and installed to')} {dest_folder}.")
+        post_ui(messagebox.showinfo, language.get("success", "Success"), f"{language.get('ffmpeg_installed', 'FFmpeg and ffprobe have been successfully downloaded and installed to')} {dest_folder}.")
     
     except requests.exceptions.RequestException as e:
-        messagebox.showerror(language.get("download_error", "Download Error"), f"{language.get('download_error_message', 'Error downloading FFmpeg. Please check your internet connection.')}\n\n{str(e)}")
+        post_ui(messagebox.showerror, language.get("download_error", "Download Error"), f"{language.get('download_error_message', 'Error downloading FFmpeg. Please check your internet connection.')}\n\n{str(e)}")
     
     except zipfile.BadZipFile:
-        messagebox.showerror(language.get("extraction_error", "Extraction Error"), language.get("extraction_error_message", "Error extracting the ZIP file. The file may be corrupted."))
+        post_ui(messagebox.showerror, language.get("extraction_error", "Extraction Error"), language.get("extraction_error_message", "Error extracting the ZIP file. The file may be corrupted."))
 
     except Exception as e:
-        messagebox.showerror(language.get("error", "Error"), f"{language.get('ffmpeg_installation_error', 'Error downloading or installing FFmpeg:')}\n\n{str(e)}")
+        post_ui(messagebox.showerror, language.get("error", "Error"), f"{language.get('ffmpeg_installation_error', 'Error downloading or installing FFmpeg:')}\n\n{str(e)}")
     
     finally:
-        shutil.rmtree(temp_dir)
-        installing_window.destroy()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        post_ui(installing_window.destroy)
 
+# A confirmação e a janela de instalação são criadas no loop principal; só o download roda em thread
 def start_download_ffmpeg():
-    download_thread = threading.Thread(target=download_ffmpeg)
-    download_thread.start()
-
-import threading
-
-def show_ffmpeg_info():
-    def get_error_message(item):
-        return f"{language.get('error_getting', 'Error getting')} {item} {language.get('from_ffmpeg', 'from FFmpeg')}: "
+    dest_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin')
 
-    ffmpeg_path = ffmpeg_path_entry.get()
-    ffprobe_path = os.path.join(os.path.dirname(ffmpeg_path), 'ffprobe' if platform.system() == 'Darwin' else 'ffprobe.exe')
+    # Verificar se a pasta bin já existe
+    if os.path.exists(dest_folder):
+        result = messagebox.askyesno(language.get("confirmation", "Confirmation"), language.get("bin_exists", "The 'bin' folder already exists. Do you want to continue with the download and overwrite the files?"))
+        if not result:
+            return
 
-    results = {}
-    
-    def run_command(command, key, error_message):
-        try:
-            # Para Windows
-            if platform.system() == "Windows":
-                result = subprocess.check_output(command, universal_newlines=True, stderr=subprocess.STDOUT, creationflags=subprocess.CREATE_NO_WINDOW).strip()
-            else:  # Para macOS e Linux
-                result = subprocess.check_output(command, universal_newlines=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).strip()
-        except Exception as e:
-            result = error_message + str(e)
-        results[key] = result
+    installing_window, progress_bar = show_installing_window(dest_folder)
+    download_thread = threading.Thread(target=download_ffmpeg, args=(dest_folder, installing_window, progress_bar), daemon=True)
+    download_thread.start()
 
+# Informações do ffmpeg a partir do índice de recursos (winff_capabilities), montado fora do
+# loop principal só quando o binário muda
+def show_ffmpeg_info():
+    settings = collect_settings()
 
-    threads = [
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-version"], "ffmpeg_version_output", get_error_message("version"))),
-        threading.Thread(target=run_command, args=([ffprobe_path, "-version"], "ffprobe_output", get_error_message("ffprobe"))),
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-buildconf"], "ffmpeg_buildconf", get_error_message("build configuration"))),
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-codecs"], "ffmpeg_codecs", get_error_message("codecs"))),
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-formats"], "ffmpeg_formats", get_error_message("formats"))),
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-protocols"], "ffmpeg_protocols", get_error_message("protocols"))),
-        threading.Thread(target=run_command, args=([ffmpeg_path, "-filters"], "ffmpeg_filters", get_error_message("filters"))),
-    ]
+    def show_results(index):
+        if index is None:
+            messagebox.showerror(language.get("error", "Error"), f"{language.get('error_getting', 'Error getting')} {language.get('ffmpeg_info', 'FFmpeg Info')} {language.get('from_ffmpeg', 'from FFmpeg')}: {settings['ffmpeg_path']}")
+            return
+        raw = index['raw']
+        version_parts = index['version'].split()
+        ffmpeg_version = version_parts[2] if len(version_parts) > 2 else language.get("unknown", "Unknown")
 
-    for thread in threads:
-        thread.start()
+        version_info = (
+            f"FFmpeg:\n{raw['version']}\n\n"
+            f"{language.get('build_configuration', 'FFmpeg Build Configuration')}:\n{raw['buildconf']}\n\n"
+        )
+        encoders = "\n".join(f"{encoder['type']:<10} {name:<24} {encoder['description']}" for name, encoder in sorted(index['encoders'].items(), key=lambda item: (item[1]['type'], item[0])))
+        muxers = "\n".join(f"{name:<24} {description}" for name, description in sorted(index['muxers'].items()))
 
-    for thread in threads:
-        thread.join()
+        info_window = tk.Toplevel(root)
+        info_window.title(f"{language.get('ffmpeg_info', 'FFmpeg Info')} - {ffmpeg_version}")
 
-    ffmpeg_version = results.get("ffmpeg_version_output", "").split()[2] if "ffmpeg_version_output" in results else language.get("unknown", "Unknown")
+        notebook = ttk.Notebook(info_window)
+        notebook.pack(fill='both', expand=True)
 
-    version_info = (
-        f"FFmpeg:\n{results.get('ffmpeg_version_output', '')}\n\n"
-        f"{language.get('build_configuration', 'FFmpeg Build Configuration')}:\n{results.get('ffmpeg_buildconf', '')}\n\n"
-    )
-    
-    info_window = tk.Toplevel(root)
-    info_window.title(f"{language.get('ffmpeg_info', 'FFmpeg Info')} - {ffmpeg_version}")
-    
-    notebook = ttk.Notebook(info_window)
-    notebook.pack(fill='both', expand=True)
-    
-    def add_tab(title, content):
-        frame = tk.Frame(notebook)
-        text_widget = tk.Text(frame, wrap='word', height=40, width=100)
-        text_widget.insert('end', content)
-        text_widget.pack(side='left', fill='both', expand=True)
-        scrollbar = tk.Scrollbar(frame, orient='vertical', command=text_widget.yview)
-        text_widget.config(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side='right', fill='y')
-        notebook.add(frame, text=title)
-
-    add_tab(language.get("version_and_config", "Version and Configuration"), version_info)
-    add_tab(language.get("codecs", "Codecs"), results.get('ffmpeg_codecs', ''))
-    add_tab(language.get("formats", "Formats"), results.get('ffmpeg_formats', ''))
-    add_tab(language.get("protocols", "Protocols"), results.get('ffmpeg_protocols', ''))
-    add_tab(language.get("filters", "Filters"), results.get('ffmpeg_filters', ''))
-    add_tab("ffprobe", results.get('ffprobe_output', ''))
+        def add_tab(title, content):
+            frame = tk.Frame(notebook)
+            text_widget = tk.Text(frame, wrap='word', height=40, width=100)
+            text_widget.insert('end', content)
+            text_widget.pack(side='left', fill='both', expand=True)
+            scrollbar = tk.Scrollbar(frame, orient='vertical', command=text_widget.yview)
+            text_widget.config(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side='right', fill='y')
+            notebook.add(frame, text=title)
+
+        add_tab(language.get("version_and_config", "Version and Configuration"), version_info)
+        add_tab(language.get("encoders", "Encoders"), encoders)
+        add_tab(language.get("muxers", "Muxers"), muxers)
+        add_tab(language.get("codecs", "Codecs"), raw['codecs'])
+        add_tab(language.get("formats", "Formats"), raw['formats'])
+        add_tab(language.get("protocols", "Protocols"), raw['protocols'])
+        add_tab(language.get("filters", "Filters"), raw['filters'])
+        add_tab("ffprobe", raw['ffprobe_version'])
+
+    # Os comandos (na primeira vez para este binário) rodam fora do loop principal
+    threading.Thread(target=lambda: post_ui(show_results, get_capabilities(settings)), daemon=True).start()
+
+# Função para ler o número de conversões simultâneas escolhido ("auto" deixa o plano de núcleos decidir)
+def get_parallel_jobs():
+    return parse_job_count(parallel_jobs_spinbox.get())
+
+# Opções de conversão atuais da interface, no mesmo formato usado pelo winff_core. As que só existem
+# no config.ini são convertidas pelo winff_core, que troca um valor inválido (ex.: staging_budget_mb = 4GB) pelo padrão
+def collect_settings():
+    file_settings = settings_from_config(config)
+    return resolve_data_paths({
+        'ffmpeg_path': ffmpeg_path_entry.get(),
+        'default_format': format_var.get(),
+        'default_output_dir': output_dir_entry.get(),
+        'default_video_codec': video_codec_var.get(),
+        'default_audio_codec': audio_codec_var.get(),
+        'default_resolution': resolution_var.get(),
+        'video_bitrate': video_bitrate_entry.get(),
+        'audio_bitrate': audio_bitrate_entry.get(),
+        'frame_rate': frame_rate_entry.get(),
+        'audio_sample_rate': audio_sample_rate_entry.get(),
+        'audio_channels': audio_channels_var.get(),
+        'use_same_directory': use_same_directory_var.get(),
+        'overwrite_existing': overwrite_var.get(),
+        'stream_copy': stream_copy_var.get(),
+        'split_encode': split_encode_var.get(),
+        'transcription_audio': transcription_var.get(),
+        'split_min_duration': file_settings['split_min_duration'],
+        'parallel_jobs': get_parallel_jobs(),
+        'threads_per_job': file_settings['threads_per_job'],
+        'job_journal': file_settings['job_journal'],
+        'job_order': job_order_var.get(),
+        'staging_dir': file_settings['staging_dir'],
+        'staging_budget_mb': file_settings['staging_budget_mb'],
+        'staging_prefetch': file_settings['staging_prefetch'],
+        'staging_read_limit_mb': file_settings['staging_read_limit_mb'],
+        'metrics_log': file_settings['metrics_log'],
+        'status_port': file_settings['status_port'],
+        'probe_cache': file_settings['probe_cache'],
+        'probe_cache_mb': file_settings['probe_cache_mb'],
+        'probe_mode': file_settings['probe_mode'],
+        'capability_cache': file_settings['capability_cache'],
+        'scan_magic': file_settings['scan_magic'],
+        'scan_settle_seconds': file_settings['scan_settle_seconds'],
+        'renditions': list(renditions),
+    }, config_file)
+
+# Diário de conversões (SQLite), aberto uma única vez; None se não puder ser usado
+job_journal = None
+
+def get_job_journal(settings):
+    global job_journal
+    if job_journal is None and settings.get('job_journal'):
+        try:
+            job_journal = JobJournal(settings['job_journal'])
+        except sqlite3.Error as e:
+            print(f"Job journal unavailable: {e}")
+    return job_journal
+
+# Oferece retomar o lote interrompido mais antigo registrado no diário
+def offer_resume_unfinished_batch():
+    journal = get_job_journal(resolve_data_paths({'job_journal': config.get('DEFAULT', 'job_journal', fallback='winff_jobs.sqlite')}, config_file))
+    if not journal:
+        return
+    batches = journal.unfinished_batches()
+    if not batches:
+        return
+    batch_id, output_dir, settings, count = batches[0]
+    resume = messagebox.askyesno(language.get("confirmation", "Confirmation"), f"{language.get('resume_batch_question', 'A previous batch was interrupted with unfinished files:')} {count}\n{output_dir}\n\n{language.get('resume_batch_confirm', 'Do you want to resume it?')}")
+    if not resume:
+        journal.abandon_batch(batch_id)
+        return
+    files = journal.recover(batch_id)
+    file_model.clear()
+    file_selection.clear()
+    add_files_to_list(files)
+    start_preflight(files, settings, output_dir, batch_id)
+
+# Situação dos lotes servida em http://127.0.0.1:status_port, iniciada no primeiro lote; com a porta
+# inválida ou em uso o lote segue sem o endpoint e o aviso fica junto do progresso
+batch_status = None
+batch_status_error = None
+
+def get_batch_status(settings):
+    global batch_status, batch_status_error
+    if batch_status is None and str(settings.get('status_port', '')).strip():
+        from winff_status import BatchStatus, start_status_server
+        try:
+            status = BatchStatus()
+            start_status_server(status, int(settings['status_port']))
+            batch_status = status
+            batch_status_error = None
+        except (OSError, ValueError) as e:
+            batch_status_error = f"{language.get('status_endpoint_unavailable', 'Status endpoint unavailable')}: {e}"
+            individual_progress_label.config(text=batch_status_error)
+    return batch_status
+
+# Registro de desempenho do último lote convertido nesta sessão
+last_metrics_file = None
+
+# Descrição do plano de núcleos (conversões simultâneas x threads por conversão)
+def format_core_plan(plan):
+    return (f"{language.get('core_plan', 'Core plan')}: {plan['jobs']} {language.get('jobs', 'jobs')} x {plan['threads']} threads "
+            f"({plan['cores']} {language.get('cores', 'cores')}, {plan['encoder']})")
+
+# Descrição da ordem do lote e do tempo total estimado (e do real, ao final)
+def format_schedule(schedule):
+    text = (f"{language.get('job_order', 'Order')}: {schedule['order']}, {language.get('estimated_time', 'estimated time')} "
+            f"{format_duration(schedule['estimated_makespan'])}")
+    if not schedule['speed_known']:
+        text += f" ({language.get('estimate_without_history', 'assuming realtime speed, no history for this profile')})"
+    if 'actual_makespan' in schedule:
+        text += f", {language.get('actual_time', 'actual time')} {format_duration(schedule['actual_makespan'])}"
+    return text
 
 def convert_videos():
-    files = file_list.get(0, tk.END)
+    files = file_model.paths()
     if not files:
         messagebox.showwarning(language.get("warning", "Warning"), language.get("no_video_selected", "No video file selected."))
         return
 
-    ffmpeg_path = ffmpeg_path_entry.get()
-    if not os.path.exists(ffmpeg_path):
+    settings = collect_settings()
+    if not os.path.exists(settings['ffmpeg_path']):
         messagebox.showerror(language.get("error", "Error"), language.get("ffmpeg_path_not_found", "FFmpeg path not found. Please check if the path is correct."))
         return
 
-    if not use_same_directory_var.get() and not output_dir_entry.get():
+    if not settings['use_same_directory'] and not settings['default_output_dir']:
         messagebox.showerror(language.get("error", "Error"), language.get("output_directory_error", "Please select an output directory or check the 'Use same directory as input file' option."))
         return
-    
-    output_format = format_var.get()
-    video_codec = video_codec_var.get()
-    if video_codec == "wmv2":
-        output_format = "asf"
-    video_bitrate = video_bitrate_entry.get()
-    audio_bitrate = audio_bitrate_entry.get()
-    resolution = resolution_var.get()
-    audio_codec = audio_codec_var.get()
-    frame_rate = frame_rate_entry.get()
-    audio_sample_rate = audio_sample_rate_entry.get()
-    audio_channels = audio_channels_var.get()
 
-    def run_conversion():
-        total_files = len(files)
-        total_progress['maximum'] = total_files
-        total_progress['value'] = 0
-
-        if use_same_directory_var.get():
-            output_dir = os.path.dirname(files[0])
-        else:
-            output_dir = output_dir_entry.get()
-
-        output_dir = os.path.join(output_dir, language.get("converted_files_folder", "Converted Files"))
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        for index, input_file in enumerate(files):
-            
-            base_name = os.path.splitext(os.path.basename(input_file))[0]
-            output_file = os.path.join(output_dir, base_name + '.' + output_format)
-
-            if not overwrite_var.get() and os.path.exists(output_file):
-                messagebox.showerror(language.get("error", "Error"), f"{language.get('file_exists_error', 'The file already exists and cannot be overwritten.')}'{output_file}'.")
+    start_preflight(files, settings, get_output_dir(settings, files, language))
+
+# Verificação prévia do lote inteiro (winff_preflight) em segundo plano, antes de qualquer codificação;
+# batch_id: lote retomado do diário, verificado de novo porque o ffmpeg, as pastas e os arquivos podem ter mudado
+def start_preflight(files, settings, output_dir, batch_id=None):
+    convert_button.config(state=tk.DISABLED)
+    individual_progress_label.config(text=language.get("preflight_checking", "Checking inputs, codecs and outputs..."))
+
+    def preflight():
+        report = run_preflight(files, settings, output_dir)
+        post_ui(finish_preflight, files, settings, output_dir, report, batch_id)
+
+    threading.Thread(target=preflight, daemon=True).start()
+
+# Mostra o relatório da verificação prévia: problemas do lote impedem a conversão (um lote retomado
+# fica no diário para outra tentativa); arquivos com problema próprio ficam marcados como falha e os demais podem seguir
+def finish_preflight(files, settings, output_dir, report, batch_id=None):
+    convert_button.config(state=tk.NORMAL)
+    individual_progress_label.config(text="")
+    title = language.get("preflight", "Preflight check")
+    text = format_preflight_report(report, language)
+    if report['batch']:
+        messagebox.showerror(title, text)
+        return
+    if report['file_problems']:
+        file_model.set_status(report['file_problems'], 'failed')
+        render_file_view()
+        valid = valid_files(report, files)
+        if not valid:
+            messagebox.showerror(title, text)
+            return
+        if not messagebox.askyesno(title, f"{text}\n\n{language.get('preflight_skip_invalid', 'Convert the files without problems?')} ({len(valid)}/{len(files)})"):
+            return
+        files = valid
+
+    journal = get_job_journal(settings)
+    if batch_id is None:
+        batch_id = journal.create_batch(files, output_dir, settings) if journal else None
+    elif journal:
+        for input_file, problems in report['file_problems'].items():
+            journal.mark_failed(batch_id, input_file, ", ".join(kind for kind, _ in problems))
+    start_conversion(files, settings, output_dir, batch_id, report['probes'])
+
+# Executa o lote em segundo plano (novo ou retomado do diário de conversões);
+# probes: sondagens da verificação prévia, reaproveitadas pelo run_batch
+def start_conversion(files, settings, output_dir, batch_id=None, probes=None):
+    journal = get_job_journal(settings) if batch_id else None
+    status = get_batch_status(collect_settings())
+    active_jobs = {}
+    failed_files = []
+    state_lock = threading.Lock()
+    progress_state = {'completed': 0, 'last_refresh': 0.0, 'copied': 0, 'plan': None, 'schedule': None}
+
+    # Mostra todos os arquivos em conversão, com percentual e velocidade real do ffmpeg
+    def refresh_progress(force=False):
+        now = time.monotonic()
+        with state_lock:
+            if not force and now - progress_state['last_refresh'] < PROGRESS_UPDATE_INTERVAL:
                 return
+            progress_state['last_refresh'] = now
+            jobs = [(os.path.basename(f), dict(job)) for f, job in active_jobs.items()]
+            completed = progress_state['completed']
+            parallel_jobs = progress_state['plan']['jobs'] if progress_state['plan'] else '?'
+
+        parts = []
+        partial = 0.0
+        for name, job in jobs[:3]:
+            part = name
+            if job.get('percent') is not None:
+                part += f" {job['percent']:.0f}%"
+            if job.get('speed') is not None:
+                part += f" {job['speed']:.2f}x"
+            parts.append(part)
+        for name, job in jobs:
+            partial += (job.get('percent') or 0) / 100
+        if parts:
+            shown = ", ".join(parts)
+            if len(jobs) > 3:
+                shown += f" (+{len(jobs) - 3})"
+            text = f"{language.get('converting', 'Converting')} ({len(jobs)}/{parallel_jobs}): {shown}"
+        else:
+            text = ""
+        post_ui(apply_progress, text, completed + partial, key='conversion_progress')
+
+    # Executado no loop principal pelo despachante de eventos
+    def apply_progress(text, value):
+        individual_progress_label.config(text=f"{text} ({batch_status_error})" if text and batch_status_error else text or batch_status_error or "")
+        total_progress['value'] = value
+
+    # Eventos do winff_core.run_batch, recebidos nas threads de conversão
+    def on_event(event, input_file, data):
+        if status:
+            status.on_event(event, input_file, data)
+        if event == 'plan':
+            with state_lock:
+                progress_state['plan'] = data
+        elif event == 'schedule':
+            # Mostrado até o primeiro arquivo começar
+            post_ui(apply_progress, format_schedule(data), 0, key='conversion_progress')
+        elif event == 'summary':
+            with state_lock:
+                progress_state['schedule'] = data
+        elif event == 'start':
+            with state_lock:
+                active_jobs[input_file] = {'percent': None, 'speed': None}
+            post_ui(set_file_status, input_file, 'converting')
+            post_ui(render_file_view, key='file_view')
+            refresh_progress(force=True)
+        elif event == 'progress':
+            with state_lock:
+                active_jobs[input_file] = {'percent': data['percent'], 'speed': data['speed']}
+            refresh_progress(force=data['finished'])
+        elif event == 'done':
+            with state_lock:
+                active_jobs.pop(input_file, None)
+                progress_state['completed'] += 1
+                if data['status'] == 'exists':
+                    failed_files.append((input_file, f"{language.get('file_exists_error', 'The file already exists and cannot be overwritten.')}'{data['output_file']}'."))
+                elif data['status'] == 'failed':
+                    failed_files.append((input_file, f"{language.get('conversion_error', 'Failed to convert video.')} {data['error']}"))
+                elif data['copied_streams']:
+                    progress_state['copied'] += 1
+            post_ui(set_file_status, input_file, data['status'])
+            post_ui(render_file_view, key='file_view')
+            refresh_progress(force=True)
 
-            command = [
-                ffmpeg_path, '-y', '-i', input_file,
-                '-b:v', video_bitrate,
-                '-b:a', audio_bitrate,
-                '-s', resolution,
-                '-r', frame_rate,
-                '-ar', audio_sample_rate,
-                '-ac', audio_channels,
-                '-vcodec', video_codec,
-                '-acodec', audio_codec,
-                output_file
-            ]
-
-            individual_progress_label.config(text=f"{language.get('converting', 'Converting')}: {os.path.basename(input_file)}")
-
-            try:
-                # Para Windows
-                if platform.system() == "Windows":
-                    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, creationflags=subprocess.CREATE_NO_WINDOW)
-                else:  # Para macOS e Linux
-                    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-
-                while True:
-                    output = process.stderr.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    root.update_idletasks()
-
-                process.wait()
-
-            except Exception as e:
-                messagebox.showerror(language.get("error", "Error"), f"{language.get('conversion_error', 'Failed to convert video.')}\n{str(e)}")
-                return
+    def run_conversion():
+        global last_metrics_file
+        total_files = len(files)
 
-            total_progress['value'] += 1
-            root.update_idletasks()
+        # Um arquivo com falha não interrompe o restante da fila; um erro do lote inteiro (pasta de
+        # saída, diário, área local) encerra a conversão com um aviso
+        try:
+            run_batch(files, settings, output_dir, on_event=on_event, journal=journal, batch_id=batch_id, probes=probes)
+        except Exception as e:
+            post_ui(messagebox.showerror, language.get("error", "Error"), f"{language.get('conversion_error', 'Failed to convert video.')} {e}")
+            return
+        if settings.get('metrics_log'):
+            last_metrics_file = os.path.join(output_dir, settings['metrics_log'])
 
         success_message = f"{language.get('conversion_complete', 'Video conversion completed.')}\n{language.get('files_saved_in', 'Files saved in:')} {output_dir}"
+        plan = progress_state['plan']
+        if plan:
+            success_message += f"\n{format_core_plan(plan)}"
+        if progress_state['schedule']:
+            success_message += f"\n{format_schedule(progress_state['schedule'])}"
+        if progress_state['copied']:
+            success_message += f"\n{language.get('stream_copied_files', 'Files with streams copied without re-encoding:')} {progress_state['copied']}"
+        if failed_files:
+            failed_lines = "\n".join(f"{os.path.basename(f)}: {error}" for f, error in failed_files[:10])
+            if len(failed_files) > 10:
+                failed_lines += f"\n... (+{len(failed_files) - 10})"
+            success_message += f"\n\n{language.get('conversion_failed_files', 'Some files could not be converted:')} {len(failed_files)}/{total_files}\n{failed_lines}"
+        latency = get_ui_latency_stats()
+        if latency:
+            success_message += f"\n\n{language.get('ui_latency', 'Interface latency')}: {latency['events']} {language.get('events', 'events')}, p95 {latency['p95_ms']:.1f} ms, max {latency['max_ms']:.1f} ms"
+        if last_metrics_file and os.path.exists(last_metrics_file):
+            success_message += f"\n{language.get('job_metrics', 'Job metrics')}: {last_metrics_file}"
+        post_ui(show_conversion_result, success_message)
+
+    # Pergunta final e abertura da pasta, sempre no loop principal
+    def show_conversion_result(success_message):
         result = messagebox.askyesno(language.get("success", "Success"), success_message + f"\n\n{language.get('open_folder', 'Do you want to open the folder with the converted files?')}")
 
         if result:
@@ -431,67 +824,33 @@ def convert_videos():
             else:
                 subprocess.Popen(["xdg-open", output_dir])
 
+    file_model.set_status(files, 'queued')
+    render_file_view()
+    total_progress['maximum'] = len(files)
+    total_progress['value'] = 0
+    if status:
+        status.start_batch(len(files))
+    ui_latency_samples.clear()
     conversion_thread = threading.Thread(target=run_conversion)
     conversion_thread.start()
 
 def update_command_display():
-    files = file_list.get(0, tk.END)
+    files = file_model.paths()
     if not files:
         command_display.delete(1.0, tk.END)
         return
 
     first_file = files[0]
-    output_format = format_var.get()
-    video_codec = video_codec_var.get()
-    if video_codec == "wmv2":
-        output_format = "asf"
-    else:
-        output_format = format_var.get()
-    video_bitrate = video_bitrate_entry.get()
-    audio_bitrate = audio_bitrate_entry.get()
-    resolution = resolution_var.get()
-    audio_codec = audio_codec_var.get()
-    frame_rate = frame_rate_entry.get()
-    audio_sample_rate = audio_sample_rate_entry.get()
-    audio_channels = audio_channels_var.get()
-    ffmpeg_path = ffmpeg_path_entry.get()
-
-    if use_same_directory_var.get():
-        output_dir = os.path.dirname(first_file)
-    else:
-        output_dir = output_dir_entry.get()
-
-    output_dir = os.path.join(output_dir, language.get("converted_files_folder", "Converted Files"))
-    base_name = os.path.splitext(os.path.basename(first_file))[0]
-    output_file = os.path.join(output_dir, base_name + '.' + output_format)
-
-    command = f"\"{ffmpeg_path}\" -y -i \"{first_file}\""
-
-    if video_bitrate:
-        command += f" -b:v {video_bitrate}"
-
-    if audio_bitrate:
-        command += f" -b:a {audio_bitrate}"
-
-    if resolution != "original":
-        command += f" -s {resolution}"
-
-    if frame_rate:
-        command += f" -r {frame_rate}"
-
-    if audio_sample_rate:
-        command += f" -ar {audio_sample_rate}"
-
-    if audio_channels:
-        command += f" -ac {audio_channels}"
-
-    if video_codec != "auto":
-        command += f" -vcodec {video_codec}"
-
-    if audio_codec != "auto":
-        command += f" -acodec {audio_codec}"
-
-    command += f" \"{output_file}\""
+    settings = collect_settings()
+    settings = apply_core_budget(settings, plan_core_budget(settings, len(files)))
+    output_dir = get_output_dir(settings, files, language)
+    output_file = get_output_file(output_dir, first_file, settings)
+    # Só consulta o cache de ffprobe: a prévia nunca executa o ffprobe no loop principal
+    info = cached_probe(get_ffprobe_path(settings['ffmpeg_path']), first_file, get_probe_cache(settings), settings['probe_mode'] == 'fast')
+    copy_video, copy_audio = plan_stream_copy(info, settings)
+    extra_outputs = [(rendition_file, rendition_settings) + plan_stream_copy(info, rendition_settings)
+                     for rendition_file, rendition_settings in get_rendition_outputs(output_file, settings)]
+    command = format_command(build_command(first_file, output_file, settings, copy_video=copy_video, copy_audio=copy_audio, extra_outputs=extra_outputs))
     
     command_display.delete(1.0, tk.END)
     command_display.insert(tk.END, command)
@@ -505,17 +864,111 @@ def toggle_output_directory():
         output_dir_button.config(state=tk.NORMAL)
     update_command_display()
 
+# Verifica o ffmpeg configurado e monta o índice de recursos e a versão do ffprobe em segundo
+# plano, depois que a janela já está aberta (a primeira conversão não precisa esperar por isso)
+def discover_ffmpeg():
+    settings = collect_settings()
+
+    def discover():
+        if not os.path.exists(settings['ffmpeg_path']):
+            post_ui(individual_progress_label.config, {'text': language.get("ffmpeg_path_not_found", "FFmpeg path not found. Please check if the path is correct.")})
+            return
+        get_capabilities(settings)
+        get_ffprobe_version(get_ffprobe_path(settings['ffmpeg_path']), no_window_kwargs())
+
+    threading.Thread(target=discover, daemon=True).start()
+
+# Benchmark de inicialização (winff_bench.py startup): informa os tempos com a janela desenhada e fecha
+def report_startup_time():
+    root.update()
+    print(json.dumps({'imports_seconds': imports_finished - startup_started,
+                      'first_window_seconds': time.perf_counter() - startup_started}), flush=True)
+    root.destroy()
+
 def show_about():
     messagebox.showinfo(language.get("about_program", "About the Program"), f"Mauricio Menon (+AI) \ngithub.com/mauriciomenon\nPython 3.10 + tk \n{language.get('version', 'Version')} 10.0.0 \n22/08/2024")
 
+# Texto com as informações de um arquivo a partir do resultado do ffprobe
+def format_video_info(input_file, info_data):
+    info_text = f"{language.get('file_info', 'File Info')}: {os.path.basename(input_file)}\n\n"
+    audio_count = 0
+    for stream in info_data.get('streams', []):
+        if stream['codec_type'] == 'video':
+            info_text += f"{language.get('video_stream', 'Video Stream')}\n"
+            info_keys = ['codec_long_name', 'width', 'height', 'r_frame_rate']
+        elif stream['codec_type'] == 'audio':
+            audio_count += 1
+            info_text += f"{language.get('audio_stream', 'Audio Stream')} {audio_count}\n"
+            info_keys = ['codec_long_name', 'channels', 'sample_rate', 'bit_rate']
+        else:
+            continue
+
+        for key in info_keys:
+            if key in stream:
+                value = stream[key]
+                if key == 'codec_long_name':
+                    description = language.get("codec", "Codec")
+                elif key == 'width':
+                    description = language.get("width", "Width")
+                    value = f"{value} {language.get('pixels', 'pixels')}"
+                elif key == 'height':
+                    description = language.get("height", "Height")
+                    value = f"{value} {language.get('pixels', 'pixels')}"
+                elif key == 'channels':
+                    description = language.get("channels", "Channels")
+                    value = f"{value} ({language.get('mono', 'mono') if value == '1' else language.get('stereo', 'stereo') if value == '2' else language.get('multi_channel', 'multi-channel')})"
+                elif key == 'sample_rate':
+                    description = language.get("sample_rate", "Sample Rate")
+                    value += " Hz"
+                elif key == 'r_frame_rate':
+                    description = "FPS"
+                elif key == 'bit_rate':
+                    description = language.get("bitrate", "Bitrate")
+                    value = f"{int(value)/1000:.2f} kbps"
+                info_text += f"{description}: {value}\n"
+        info_text += "\n"
+
+    if 'format' in info_data:
+        info_text += f"{language.get('format_info', 'Format Info')}\n"
+        for key in ['format_name', 'duration', 'size', 'bit_rate']:
+            if key in info_data['format']:
+                value = info_data['format'][key]
+                if key == 'format_name':
+                    description = language.get("format", "Format")
+                elif key == 'duration':
+                    description = language.get("duration", "Duration")
+                    value = f"{float(value):.2f} {language.get('seconds', 'seconds')}"
+                elif key == 'size':
+                    description = language.get("size", "Size")
+                    value = f"{int(value)/1024/1024:.2f} MB"
+                elif key == 'bit_rate':
+                    description = language.get("bitrate", "Bitrate")
+                    value = f"{int(value)/1000:.2f} kbps"
+                info_text += f"{description}: {value}\n"
+    return info_text
+
+# Resumo de uma linha (duração, vídeo, áudio) para a lista de arquivos da janela de informações
+def summarize_video_info(info_data):
+    duration = get_probe_duration(info_data)
+    video = audio = ""
+    for stream in info_data.get('streams', []):
+        if stream.get('codec_type') == 'video' and not video:
+            video = f"{stream.get('codec_name', '?')} {stream.get('width', '?')}x{stream.get('height', '?')}"
+        elif stream.get('codec_type') == 'audio' and not audio:
+            audio = f"{stream.get('codec_name', '?')} {stream.get('sample_rate', '?')} Hz {stream.get('channels', '?')}ch"
+    return (format_duration(duration) if duration else "-"), video or "-", audio or "-"
+
+# Função para mostrar as informações dos arquivos selecionados. O ffprobe roda em
+# paralelo fora do loop principal; a lista tem uma linha por arquivo e o detalhe só é
+# montado para o arquivo escolhido, então a janela abre igual com 10 ou 1000 arquivos
 def show_video_info():
-    files = file_list.get(0, tk.END)
+    files = file_model.paths()
     if not files:
         messagebox.showwarning(language.get("warning", "Warning"), language.get("no_video_selected", "No video file selected."))
         return
 
     ffmpeg_path = ffmpeg_path_entry.get()
-    ffprobe_path = os.path.join(os.path.dirname(ffmpeg_path), 'ffprobe' if platform.system() == 'Darwin' else 'ffprobe.exe')
+    ffprobe_path = get_ffprobe_path(ffmpeg_path)
 
     if not os.path.exists(ffprobe_path):
         if platform.system() == 'Darwin':
@@ -530,88 +983,239 @@ def show_video_info():
     window_width = root.winfo_width()
     info_window.geometry(f"{window_width}x500")
 
-    notebook = ttk.Notebook(info_window)
-    notebook.pack(fill='both', expand=True)
-
-    for input_file in files:
-        try:
-            command = [ffprobe_path, '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', input_file]
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            out, err = process.communicate()
-            if process.returncode != 0:
-                raise Exception(f"{language.get('ffprobe_error', 'Error executing ffprobe')}: {err}")
-
-            info_data = json.loads(out)
-            info_text = f"{language.get('file_info', 'File Info')}: {os.path.basename(input_file)}\n\n"
-            audio_count = 0
-            for stream in info_data.get('streams', []):
-                if stream['codec_type'] == 'video':
-                    info_text += f"{language.get('video_stream', 'Video Stream')}\n"
-                    info_keys = ['codec_long_name', 'width', 'height', 'r_frame_rate']
-                elif stream['codec_type'] == 'audio':
-                    audio_count += 1
-                    info_text += f"{language.get('audio_stream', 'Audio Stream')} {audio_count}\n"
-                    info_keys = ['codec_long_name', 'channels', 'sample_rate', 'bit_rate']
-
-                for key in info_keys:
-                    if key in stream:
-                        value = stream[key]
-                        if key == 'codec_long_name':
-                            description = language.get("codec", "Codec")
-                        elif key == 'width':
-                            description = language.get("width", "Width")
-                            value = f"{value} {language.get('pixels', 'pixels')}"
-                        elif key == 'height':
-                            description = language.get("height", "Height")
-                            value = f"{value} {language.get('pixels', 'pixels')}"
-                        elif key == 'channels':
-                            description = language.get("channels", "Channels")
-                            value = f"{value} ({language.get('mono', 'mono') if value == '1' else language.get('stereo', 'stereo') if value == '2' else language.get('multi_channel', 'multi-channel')})"
-                        elif key == 'sample_rate':
-                            description = language.get("sample_rate", "Sample Rate")
-                            value += " Hz"
-                        elif key == 'r_frame_rate':
-                            description = "FPS"
-                        elif key == 'bit_rate':
-                            description = language.get("bitrate", "Bitrate")
-                            value = f"{int(value)/1000:.2f} kbps"
-                        info_text += f"{description}: {value}\n"
-                info_text += "\n"
-
-            if 'format' in info_data:
-                info_text += f"{language.get('format_info', 'Format Info')}\n"
-                for key in ['format_name', 'duration', 'size', 'bit_rate']:
-                    if key in info_data['format']:
-                        value = info_data['format'][key]
-                        if key == 'format_name':
-                            description = language.get("format", "Format")
-                        elif key == 'duration':
-                            description = language.get("duration", "Duration")
-                            value = f"{float(value):.2f} {language.get('seconds', 'seconds')}"
-                        elif key == 'size':
-                            description = language.get("size", "Size")
-                            value = f"{int(value)/1024/1024:.2f} MB"
-                        elif key == 'bit_rate':
-                            description = language.get("bitrate", "Bitrate")
-                            value = f"{int(value)/1000:.2f} kbps"
-                        info_text += f"{description}: {value}\n"
-
-            frame = tk.Frame(notebook)
-            frame.pack(fill='both', expand=True)
-
-            text_widget = tk.Text(frame, wrap='word', height=20, width=60)
-            text_widget.insert('end', info_text)
-            text_widget.config(state='normal')
-            text_widget.pack(side='left', fill='both', expand=True)
-
-            scrollbar = tk.Scrollbar(frame, orient='vertical', command=text_widget.yview)
+    status_frame = tk.Frame(info_window)
+    status_frame.pack(fill='x')
+    status_label = tk.Label(status_frame, text="")
+    status_label.pack(side='left', padx=5, pady=2)
+
+    panes = ttk.PanedWindow(info_window, orient='horizontal')
+    panes.pack(fill='both', expand=True)
+
+    list_frame = tk.Frame(panes)
+    columns = ('file', 'duration', 'video', 'audio')
+    tree = ttk.Treeview(list_frame, columns=columns, show='headings', selectmode='browse')
+    headings = {'file': language.get("file_info", "File Info"), 'duration': language.get("duration", "Duration"),
+                'video': language.get("video_stream", "Video Stream"), 'audio': language.get("audio_stream", "Audio Stream")}
+    for column in columns:
+        tree.heading(column, text=headings[column])
+        tree.column(column, width=200 if column == 'file' else 110, anchor='w')
+    list_scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=tree.yview)
+    tree.config(yscrollcommand=list_scrollbar.set)
+    tree.pack(side='left', fill='both', expand=True)
+    list_scrollbar.pack(side='right', fill='y')
+    panes.add(list_frame, weight=1)
+
+    detail_frame = tk.Frame(panes)
+    panes.add(detail_frame, weight=1)
+
+    # Linhas da lista são itens do Treeview, não widgets; o detalhe é um único Text reaproveitado
+    for index, input_file in enumerate(files):
+        tree.insert('', 'end', iid=str(index), values=(os.path.basename(input_file), "...", "", ""))
+
+    state = {'done': 0, 'errors': 0, 'cancelled': False, 'detail': None}
+    results = {}
+    settings = collect_settings()
+    cache = get_probe_cache(settings)
+    fast = settings['probe_mode'] == 'fast'
+    executor = ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(files)))
+
+    def update_status():
+        text = f"{state['done']}/{len(files)}"
+        if state['errors']:
+            text += f", {state['errors']} {language.get('failed', 'failed')}"
+        if state['cancelled']:
+            text += f" ({language.get('cancelled', 'cancelled')})"
+        status_label.config(text=text)
+
+    # Detalhe do arquivo escolhido; o widget só é criado na primeira seleção
+    def show_detail(event=None):
+        selection = tree.selection()
+        if not selection:
+            return
+        index = int(selection[0])
+        input_file = files[index]
+        if state['detail'] is None:
+            text_widget = tk.Text(detail_frame, wrap='word', height=20, width=60)
+            scrollbar = tk.Scrollbar(detail_frame, orient='vertical', command=text_widget.yview)
             text_widget.config(yscrollcommand=scrollbar.set)
+            text_widget.pack(side='left', fill='both', expand=True)
             scrollbar.pack(side='right', fill='y')
+            state['detail'] = text_widget
+        if index not in results:
+            info_text = f"{language.get('file_info', 'File Info')}: {os.path.basename(input_file)}\n\n..."
+        else:
+            info_data, error = results[index]
+            if error:
+                info_text = f"{language.get('video_info_error', 'Could not retrieve video information')} {input_file}.\n{language.get('error', 'Error')}: {error}"
+            else:
+                info_text = format_video_info(input_file, info_data)
+        state['detail'].delete(1.0, tk.END)
+        state['detail'].insert('end', info_text)
 
-            notebook.add(frame, text=os.path.basename(input_file))
+    tree.bind('<<TreeviewSelect>>', show_detail)
 
-        except Exception as e:
-            messagebox.showerror(language.get("error", "Error"), f"{language.get('video_info_error', 'Could not retrieve video information')} {input_file}.\n{language.get('error', 'Error')}: {str(e)}")
+    # Executado no loop principal; a janela pode já ter sido fechada
+    def show_result(index, info_data, error):
+        if state['cancelled'] or not info_window.winfo_exists():
+            return
+        state['done'] += 1
+        results[index] = (info_data, error)
+        if error:
+            # Um arquivo com erro fica marcado na lista, com a mensagem no detalhe, sem interromper os demais
+            state['errors'] += 1
+            tree.item(str(index), values=(os.path.basename(files[index]), language.get('error', 'Error'), error, ""))
+        else:
+            tree.item(str(index), values=(os.path.basename(files[index]),) + summarize_video_info(info_data))
+            file_model.update(files[index], duration=get_probe_duration(info_data))
+            post_ui(render_file_view, key='file_view')
+        if tree.selection() == (str(index),):
+            show_detail()
+        update_status()
+        if state['done'] == len(files):
+            cancel_button.config(state=tk.DISABLED)
+            # A prévia do comando agora pode usar os resultados do cache
+            update_command_display()
+
+    def probe(index):
+        if state['cancelled']:
+            return
+        try:
+            info_data, error = read_probe(ffprobe_path, files[index], cache, fast), None
+        except ProbeError as e:
+            info_data, error = None, f"{language.get('ffprobe_error', 'Error executing ffprobe')}: {e}"
+        post_ui(show_result, index, info_data, error)
+
+    def cancel():
+        state['cancelled'] = True
+        executor.shutdown(wait=False, cancel_futures=True)
+        if info_window.winfo_exists():
+            cancel_button.config(state=tk.DISABLED)
+            update_status()
+
+    def close():
+        cancel()
+        info_window.destroy()
+
+    cancel_button = tk.Button(status_frame, text=language.get("cancel", "Cancel"), command=cancel)
+    cancel_button.pack(side='right', padx=5, pady=2)
+    info_window.protocol("WM_DELETE_WINDOW", close)
+    update_status()
+
+    for index in range(len(files)):
+        executor.submit(probe, index)
+    executor.shutdown(wait=False)
+
+# Função para mostrar o resumo de desempenho por conversão (último lote do registro)
+def show_job_metrics():
+    metrics_file = last_metrics_file
+    if not metrics_file or not os.path.exists(metrics_file):
+        metrics_file = filedialog.askopenfilename(title=language.get("job_metrics", "Job metrics"), filetypes=[(language.get("job_metrics", "Job metrics"), "*.jsonl *.csv")])
+        if not metrics_file:
+            return
+    try:
+        records = last_batch_metrics(read_metrics(metrics_file))
+    except (OSError, ValueError) as e:
+        messagebox.showerror(language.get("error", "Error"), f"{metrics_file}\n{language.get('error', 'Error')}: {str(e)}")
+        return
+    if not records:
+        messagebox.showwarning(language.get("warning", "Warning"), f"{language.get('no_job_metrics', 'No conversions recorded in')} {metrics_file}")
+        return
+
+    summary = summarize_metrics(records)
+    metrics_window = tk.Toplevel()
+    metrics_window.title(language.get("job_metrics", "Job metrics"))
+    metrics_window.geometry(f"{root.winfo_width()}x400")
+
+    speed = f"{summary['speed']:.2f}x" if summary['speed'] else "-"
+    summary_text = (f"{records[0]['batch_started']}  {summary['done']}/{summary['files']} OK, {summary['failed']} {language.get('failed', 'failed')}\n"
+                    f"{language.get('conversion_time', 'Conversion time')}: {summary['wall_seconds']:.1f} s, CPU {summary['user_seconds']:.1f} s user + {summary['system_seconds']:.1f} s sys, "
+                    f"{language.get('peak_memory', 'peak memory')} {summary['max_rss'] / 2**20:.0f} MB, {language.get('speed', 'speed')} {speed}\n"
+                    f"{language.get('input', 'Input')} {summary['input_bytes'] / 2**20:.1f} MB -> {language.get('output', 'output')} {summary['output_bytes'] / 2**20:.1f} MB")
+    tk.Label(metrics_window, text=summary_text, justify="left").pack(anchor="w", padx=5, pady=5)
+
+    columns = ('file', 'status', 'wait', 'wall', 'cpu', 'rss', 'speed', 'fps', 'size')
+    frame = tk.Frame(metrics_window)
+    frame.pack(fill='both', expand=True)
+    tree = ttk.Treeview(frame, columns=columns, show='headings')
+    headings = {'file': language.get("file_info", "File Info"), 'status': "Status", 'wait': f"{language.get('queue_wait', 'Queue wait')} (s)",
+                'wall': f"{language.get('conversion_time', 'Conversion time')} (s)", 'cpu': "CPU (s)", 'rss': "RSS (MB)",
+                'speed': language.get("speed", "speed"), 'fps': "fps", 'size': f"{language.get('output', 'output')}/{language.get('input', 'Input')}"}
+    for column in columns:
+        tree.heading(column, text=headings[column])
+        tree.column(column, width=220 if column == 'file' else 80, anchor='w' if column == 'file' else 'e')
+
+    def number(value, pattern):
+        return pattern.format(value) if value is not None else "-"
+
+    for record in records:
+        cpu = (record['user_seconds'] or 0) + (record['system_seconds'] or 0) if record['user_seconds'] is not None else None
+        tree.insert('', 'end', values=(
+            os.path.basename(record['input_file']), record['status'],
+            number(record['queue_wait_seconds'], "{:.1f}"), number(record['wall_seconds'], "{:.1f}"), number(cpu, "{:.1f}"),
+            number(record['max_rss'] / 2**20 if record['max_rss'] else None, "{:.0f}"), number(record['speed'], "{:.2f}x"),
+            number(record['fps'], "{:.1f}"), number(record['size_ratio'], "{:.1%}"),
+        ))
+    scrollbar = tk.Scrollbar(frame, orient='vertical', command=tree.yview)
+    tree.config(yscrollcommand=scrollbar.set)
+    tree.pack(side='left', fill='both', expand=True)
+    scrollbar.pack(side='right', fill='y')
+
+# Rendições extras: cada uma guarda as opções de saída dos campos no momento em que foi
+# incluída, e todas são geradas pelo mesmo processo do ffmpeg (o arquivo é decodificado uma vez)
+renditions = []
+RENDITION_COLUMNS = ('default_format', 'default_video_codec', 'default_resolution', 'video_bitrate', 'default_audio_codec', 'audio_bitrate')
+
+def update_renditions_button():
+    text = language.get("renditions", "Renditions")
+    renditions_button.config(text=f"{text} ({len(renditions)})" if renditions else text)
+
+def show_renditions():
+    renditions_window = tk.Toplevel()
+    renditions_window.title(language.get("renditions", "Renditions"))
+    renditions_window.geometry("640x300")
+    tk.Label(renditions_window, text=language.get("renditions_hint", "Each rendition is written next to the main output, from the same decode."), justify="left").pack(anchor="w", padx=5, pady=5)
+
+    frame = tk.Frame(renditions_window)
+    frame.pack(fill='both', expand=True)
+    tree = ttk.Treeview(frame, columns=RENDITION_COLUMNS, show='headings')
+    headings = {'default_format': language.get("output_format", "Output Format"), 'default_video_codec': language.get("video_codec", "Video Codec"),
+                'default_resolution': language.get("resolution", "Resolution"), 'video_bitrate': language.get("video_bitrate", "Video Bitrate"),
+                'default_audio_codec': language.get("audio_codec", "Audio Codec"), 'audio_bitrate': language.get("audio_bitrate", "Audio Bitrate")}
+    for column in RENDITION_COLUMNS:
+        tree.heading(column, text=headings[column])
+        tree.column(column, width=100, anchor='w')
+    scrollbar = tk.Scrollbar(frame, orient='vertical', command=tree.yview)
+    tree.config(yscrollcommand=scrollbar.set)
+    tree.pack(side='left', fill='both', expand=True)
+    scrollbar.pack(side='right', fill='y')
+
+    def refresh():
+        tree.delete(*tree.get_children())
+        for index, rendition in enumerate(renditions):
+            tree.insert('', 'end', iid=str(index), values=tuple(rendition.get(column, '') for column in RENDITION_COLUMNS))
+        update_renditions_button()
+        update_command_display()
+
+    def add_current():
+        settings = collect_settings()
+        renditions.append(parse_renditions([{key: settings[key] for key in RENDITION_COLUMNS + ('frame_rate', 'audio_sample_rate', 'audio_channels')}])[0])
+        refresh()
+
+    def remove_selected():
+        selected = {int(iid) for iid in tree.selection()}
+        renditions[:] = [rendition for index, rendition in enumerate(renditions) if index not in selected]
+        refresh()
+
+    def clear():
+        renditions.clear()
+        refresh()
+
+    button_frame = tk.Frame(renditions_window)
+    button_frame.pack(fill='x', padx=5, pady=5)
+    tk.Button(button_frame, text=language.get("add_rendition", "Add current options"), command=add_current).pack(side='left', padx=5)
+    tk.Button(button_frame, text=language.get("remove_rendition", "Remove selected"), command=remove_selected).pack(side='left', padx=5)
+    tk.Button(button_frame, text=language.get("clear_renditions", "Clear renditions"), command=clear).pack(side='left', padx=5)
+    refresh()
 
 def adjust_window_size_based_on_language():
     if platform.system() != "Darwin":
@@ -657,11 +1261,19 @@ def update_ui_language():
     info_button.config(text=truncate_text(language.get("video_info_button", "Video Information"), max_length))
     version_button.config(text=truncate_text(language.get("ffmpeg_version_button", "FFmpeg Version"), max_length))
     download_button.config(text=truncate_text(language.get("install_ffmpeg", "Install FFmpeg"), max_length))
+    metrics_button.config(text=truncate_text(language.get("job_metrics", "Job metrics"), max_length))
+    update_renditions_button()
     add_button.config(text=truncate_text(language.get("add_files_button", "Add File(s)"), max_length))
+    add_folder_button.config(text=truncate_text(language.get("add_folder_button", "Add Folder"), max_length))
     remove_button.config(text=truncate_text(language.get("remove_files_button", "Remove File(s)"), max_length))
     clear_button.config(text=truncate_text(language.get("clear_list_button", "Clear List"), max_length))
+    parallel_jobs_label.config(text=truncate_text(language.get("parallel_jobs", "Simultaneous conversions"), max_length))
+    job_order_label.config(text=truncate_text(language.get("job_order", "Order"), max_length))
     use_same_directory_check.config(text=truncate_text(language.get("use_same_directory", "Use the same directory as the input file"), max_length))
     overwrite_check.config(text=truncate_text(language.get("overwrite_existing", "Overwrite existing files"), max_length))
+    stream_copy_check.config(text=truncate_text(language.get("stream_copy", "Copy streams that already match"), max_length))
+    split_encode_check.config(text=truncate_text(language.get("split_encode", "Split long files across all cores"), max_length))
+    transcription_check.config(text=truncate_text(language.get("transcription_audio", "WAV/FLAC for transcription (16 kHz mono)"), max_length))
     format_label.config(text=truncate_text(language.get("output_format", "Output Format"), max_length))
     video_bitrate_label.config(text=truncate_text(language.get("video_bitrate", "Video Bitrate"), max_length))
     audio_bitrate_label.config(text=truncate_text(language.get("audio_bitrate", "Audio Bitrate"), max_length))
@@ -680,15 +1292,18 @@ def update_ui_language():
     load_button.config(text=truncate_text(language.get("load_config_button", "Load Configuration"), max_length))
     save_button.config(text=truncate_text(language.get("save_config_button", "Save Configuration"), max_length))
     convert_button.config(text=truncate_text(language.get("convert_button", "Convert"), max_length))
+    set_file_view_headings()
+    render_file_view()
 
     root.update_idletasks()
 
 # nao deveria ser aqui, mas para deixar mais claro
-global root, selected_files_label, about_button, info_button, version_button, download_button
-global add_button, remove_button, clear_button, output_dir_label, output_dir_button
+global root, selected_files_label, about_button, info_button, version_button, download_button, metrics_button, renditions_button
+global add_button, add_folder_button, remove_button, clear_button, output_dir_label, output_dir_button
 global format_label, video_bitrate_label, audio_bitrate_label, resolution_label
 global video_codec_label, audio_codec_label, frame_rate_label, audio_sample_rate_label
 global audio_channels_label, ffmpeg_path_label, command_label, convert_button
+global parallel_jobs_label, stream_copy_check, split_encode_check, transcription_check, job_order_label
 
 root = tk.Tk()
 root.title(language.get("main_window_title", "Advanced Video Converter - FFmpeg GUI"))
@@ -722,6 +1337,10 @@ version_button = tk.Button(top_button_frame, text=language.get("ffmpeg_version_b
 version_button.pack(side="left", padx=5)
 download_button = tk.Button(top_button_frame, text=language.get("install_ffmpeg", "Install FFmpeg"), command=start_download_ffmpeg, font=("TkDefaultFont", 9))
 download_button.pack(side="left", padx=5)
+metrics_button = tk.Button(top_button_frame, text=language.get("job_metrics", "Job metrics"), command=show_job_metrics, font=("TkDefaultFont", 9))
+metrics_button.pack(side="left", padx=5)
+renditions_button = tk.Button(top_button_frame, text=language.get("renditions", "Renditions"), command=show_renditions, font=("TkDefaultFont", 9))
+renditions_button.pack(side="left", padx=5)
 
 language_frame = tk.Frame(top_button_frame)
 language_frame.pack(side="right", padx=5)
@@ -736,24 +1355,43 @@ language_option_menu.pack(side="left", padx=5)
 listbox_frame = tk.Frame(root)
 listbox_frame.grid(row=2, column=0, columnspan=4, padx=5, pady=5, sticky="nswe")
 
-scrollbar = tk.Scrollbar(listbox_frame, orient="vertical")
+file_scrollbar = tk.Scrollbar(listbox_frame, orient="vertical", command=scroll_file_view)
 
-file_list = tk.Listbox(listbox_frame, width=80, height=8, selectmode=tk.MULTIPLE, yscrollcommand=scrollbar.set)
-file_list.pack(side="left", fill="both", expand=True)
+file_tree = ttk.Treeview(listbox_frame, columns=('path', 'size', 'duration', 'status'), show='headings', height=FILE_VIEW_ROWS, selectmode='extended')
+for column, width in (('path', 420), ('size', 80), ('duration', 80), ('status', 90)):
+    file_tree.column(column, width=width, anchor='w' if column == 'path' else 'e', stretch=column == 'path')
+set_file_view_headings()
+file_tree.pack(side="left", fill="both", expand=True)
+file_tree.bind('<<TreeviewSelect>>', on_file_view_select)
+for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+    file_tree.bind(sequence, on_file_view_wheel)
 
-scrollbar.config(command=file_list.yview)
-scrollbar.pack(side="right", fill="y")
+file_scrollbar.pack(side="right", fill="y")
 
 file_button_frame = tk.Frame(root)
 file_button_frame.grid(row=3, column=0, columnspan=4, padx=5, pady=5, sticky="we")
 
 add_button = tk.Button(file_button_frame, text=language.get("add_files_button", "Add File(s)"), command=select_files)
 add_button.pack(side="left", padx=5)
-remove_button = tk.Button(file_button_frame, text=language.get("remove_files_button", "Remove File(s)"), command=lambda: [file_list.delete(i) for i in reversed(file_list.curselection())])
+add_folder_button = tk.Button(file_button_frame, text=language.get("add_folder_button", "Add Folder"), command=select_folder)
+add_folder_button.pack(side="left", padx=5)
+remove_button = tk.Button(file_button_frame, text=language.get("remove_files_button", "Remove File(s)"), command=remove_selected_files)
 remove_button.pack(side="left", padx=5)
-clear_button = tk.Button(file_button_frame, text=language.get("clear_list_button", "Clear List"), command=lambda: file_list.delete(0, tk.END))
+clear_button = tk.Button(file_button_frame, text=language.get("clear_list_button", "Clear List"), command=clear_file_list)
 clear_button.pack(side="left", padx=5)
 
+parallel_jobs_spinbox = tk.Spinbox(file_button_frame, values=("auto",) + tuple(str(i) for i in range(1, 65)), width=5, command=lambda: update_command_display())
+parallel_jobs_spinbox.pack(side="right", padx=5)
+parallel_jobs_label = tk.Label(file_button_frame, text=language.get("parallel_jobs", "Simultaneous conversions"))
+parallel_jobs_label.pack(side="right", padx=5)
+
+# Maior primeiro reduz o tempo total do lote; menor primeiro entrega resultados mais cedo
+job_order_var = tk.StringVar(value="longest")
+job_order_menu = tk.OptionMenu(file_button_frame, job_order_var, *JOB_ORDERS)
+job_order_menu.pack(side="right", padx=5)
+job_order_label = tk.Label(file_button_frame, text=language.get("job_order", "Order"))
+job_order_label.pack(side="right", padx=5)
+
 output_frame = tk.Frame(root)
 output_frame.grid(row=4, column=0, columnspan=4, padx=5, pady=5, sticky="we")
 
@@ -768,16 +1406,34 @@ use_same_directory_var = tk.BooleanVar()
 use_same_directory_check = tk.Checkbutton(root, text=language.get("use_same_directory", "Use the same directory as the input file"), variable=use_same_directory_var, command=toggle_output_directory)
 use_same_directory_check.grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky="w")
 
+options_frame = tk.Frame(root)
+options_frame.grid(row=5, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+
 overwrite_var = tk.BooleanVar()
-overwrite_check = tk.Checkbutton(root, text=language.get("overwrite_existing", "Overwrite existing files"), variable=overwrite_var)
-overwrite_check.grid(row=5, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+overwrite_check = tk.Checkbutton(options_frame, text=language.get("overwrite_existing", "Overwrite existing files"), variable=overwrite_var)
+overwrite_check.pack(side="left")
+
+# Fluxos que já atendem ao perfil são remuxados sem recodificar
+stream_copy_var = tk.BooleanVar()
+stream_copy_check = tk.Checkbutton(options_frame, text=language.get("stream_copy", "Copy streams that already match"), variable=stream_copy_var)
+stream_copy_check.pack(side="left", padx=5)
+
+# Saídas WAV/FLAC em 16 kHz mono, o formato esperado pela transcrição automática
+transcription_var = tk.BooleanVar()
+transcription_check = tk.Checkbutton(options_frame, text=language.get("transcription_audio", "WAV/FLAC for transcription (16 kHz mono)"), variable=transcription_var)
+transcription_check.pack(side="left", padx=5)
 
 format_label = tk.Label(root, text=language.get("output_format", "Output Format"))
 format_label.grid(row=6, column=0, padx=5, pady=5, sticky="w")
 format_var = tk.StringVar()
-format_menu = tk.OptionMenu(root, format_var, "mp4", "avi", "mkv", "flv", "mov", "mp3", "wmv", "asf")
+format_menu = tk.OptionMenu(root, format_var, "mp4", "avi", "mkv", "flv", "mov", "mp3", "wav", "flac", "wmv", "asf")
 format_menu.grid(row=6, column=1, padx=5, pady=5, sticky="w")
 
+# Arquivos longos são divididos em quadros-chave e as partes codificadas em paralelo
+split_encode_var = tk.BooleanVar()
+split_encode_check = tk.Checkbutton(root, text=language.get("split_encode", "Split long files across all cores"), variable=split_encode_var)
+split_encode_check.grid(row=6, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+
 video_bitrate_label = tk.Label(root, text=language.get("video_bitrate", "Video Bitrate"))
 video_bitrate_label.grid(row=7, column=0, padx=5, pady=5, sticky="w")
 video_bitrate_entry = tk.Entry(root, width=20)
@@ -853,4 +1509,10 @@ convert_button = tk.Button(root, text=language.get("convert_button", "Convert"),
 convert_button.grid(row=14, column=3, padx=5, pady=5, sticky="we")
 
 set_default_options()
+root.after(UI_POLL_INTERVAL_MS, process_ui_events)
+if os.environ.get('WINFF_STARTUP_BENCH'):
+    root.after_idle(report_startup_time)
+else:
+    root.after(500, offer_resume_unfinished_batch)
+    root.after(1000, discover_ffmpeg)
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,490 @@
+# Benchmarks do pipeline de conversão (sem tkinter)
+#
+# Exemplos:
+#   python winff_bench.py plans -c config.ini --plans auto,1x16,4x4,16x1 amostras/
+#   python winff_bench.py staging -c config.ini --read-limit 20 --prefetch 0,2,4 amostras/
+#   python winff_bench.py profiles -c config.ini --json antes.json
+#   python winff_bench.py compare antes.json depois.json
+#   python winff_bench.py probe --repeat 5 //servidor/audiencias/*.asf
+#   python winff_bench.py startup --repeat 5 --json startup_10.1.json
+#   python winff_bench.py filelist --count 100000
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+from winff_core import (read_settings, run_batch, run_ffmpeg, build_command,
+                        parse_job_count, plan_core_budget, apply_core_budget, probe_file, get_probe_duration,
+                        get_ffprobe_path, no_window_kwargs, run_ffprobe, probe_is_complete, ProbeError)
+from winff_cli import collect_input_files
+from winff_filelist import FileList
+
+# Converte "4x2" em (4, 2); "auto" deixa o planejador decidir
+def parse_plan(text):
+    if text == 'auto':
+        return 'auto', 'auto'
+    jobs, _, threads = text.partition('x')
+    return parse_job_count(jobs), parse_job_count(threads or 'auto')
+
+# Compara planos (conversões x threads) convertendo o mesmo conjunto de arquivos
+def bench_plans(args):
+    settings = read_settings(args.config)
+    if args.ffmpeg:
+        settings['ffmpeg_path'] = args.ffmpeg
+    settings['overwrite_existing'] = True
+    files = collect_input_files(args.inputs)
+    if not files:
+        print("no input files", file=sys.stderr)
+        return 2
+
+    ffprobe_path = get_ffprobe_path(settings['ffmpeg_path'])
+    media_seconds = sum(get_probe_duration(probe_file(ffprobe_path, file)) or 0.0 for file in files)
+
+    rows = []
+    for plan_text in args.plans.split(','):
+        jobs, threads = parse_plan(plan_text.strip())
+        plan_settings = dict(settings, parallel_jobs=jobs, threads_per_job=threads)
+        plan = plan_core_budget(plan_settings, len(files))
+        output_dir = tempfile.mkdtemp(prefix='winff_bench_')
+        try:
+            for _ in range(args.warmup):
+                run_batch(files, plan_settings, output_dir)
+            times = []
+            failed = 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = run_batch(files, plan_settings, output_dir)
+                times.append(time.perf_counter() - start)
+                failed += sum(1 for result in results if result['status'] != 'done')
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        best = min(times)
+        rows.append({
+            'plan': plan_text.strip(),
+            'jobs': plan['jobs'],
+            'threads': plan['threads'],
+            'files': len(files),
+            'wall_seconds': best,
+            'files_per_minute': 60 * len(files) / best,
+            'realtime_factor': media_seconds / best if media_seconds else None,
+            'failed': failed,
+        })
+
+    baseline = rows[0]['wall_seconds']
+    print(f"{'plan':>10} {'jobs':>5} {'thr':>4} {'wall s':>9} {'files/min':>10} {'x realtime':>11} {'vs first':>9}")
+    for row in rows:
+        realtime = f"{row['realtime_factor']:.1f}" if row['realtime_factor'] else "-"
+        print(f"{row['plan']:>10} {row['jobs']:>5} {row['threads']:>4} {row['wall_seconds']:>9.2f} "
+              f"{row['files_per_minute']:>10.1f} {realtime:>11} {baseline / row['wall_seconds']:>8.2f}x"
+              + (f"  ({row['failed']} failed)" if row['failed'] else ""))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'cores': os.cpu_count(), 'media_seconds': media_seconds, 'results': rows}, file, indent=2)
+    return 0
+
+# Compara a área de preparação sem e com cópia antecipada; --read-limit simula um
+# compartilhamento lento limitando a leitura das entradas (MB/s)
+def bench_staging(args):
+    settings = read_settings(args.config)
+    if args.ffmpeg:
+        settings['ffmpeg_path'] = args.ffmpeg
+    settings['overwrite_existing'] = True
+    files = collect_input_files(args.inputs)
+    if not files:
+        print("no input files", file=sys.stderr)
+        return 2
+    input_bytes = sum(os.path.getsize(file) for file in files)
+
+    rows = []
+    for prefetch in [int(value) for value in args.prefetch.split(',')]:
+        scratch_dir = tempfile.mkdtemp(prefix='winff_bench_scratch_')
+        output_dir = tempfile.mkdtemp(prefix='winff_bench_')
+        stage_settings = dict(settings, staging_dir=scratch_dir, staging_prefetch=prefetch,
+                              staging_budget_mb=args.budget, staging_read_limit_mb=args.read_limit)
+        try:
+            start = time.perf_counter()
+            results = run_batch(files, stage_settings, output_dir)
+            wall = time.perf_counter() - start
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            shutil.rmtree(output_dir, ignore_errors=True)
+        rows.append({
+            'prefetch': prefetch,
+            'files': len(files),
+            'wall_seconds': wall,
+            'read_seconds': input_bytes / (args.read_limit * 1024 * 1024) if args.read_limit else None,
+            'failed': sum(1 for result in results if result['status'] != 'done'),
+        })
+
+    baseline = rows[0]['wall_seconds']
+    print(f"{'prefetch':>8} {'wall s':>9} {'read s':>8} {'vs first':>9}")
+    for row in rows:
+        read = f"{row['read_seconds']:.2f}" if row['read_seconds'] else "-"
+        print(f"{row['prefetch']:>8} {row['wall_seconds']:>9.2f} {read:>8} {baseline / row['wall_seconds']:>8.2f}x"
+              + (f"  ({row['failed']} failed)" if row['failed'] else ""))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'input_bytes': input_bytes, 'read_limit_mb': args.read_limit, 'results': rows}, file, indent=2)
+    return 0
+
+# Perfis oferecidos pela interface: (codec de vídeo, formato, codec de áudio)
+BENCH_PROFILES = [('wmv2', 'asf', 'wmav2'), ('libx264', 'mp4', 'aac'), ('libx265', 'mp4', 'aac'), ('mpeg4', 'avi', 'ac3')]
+BENCH_RESOLUTIONS = ['320x240', '640x480', '1280x720', '1920x1080']
+
+# Perda de velocidade (fração) a partir da qual "compare" aponta regressão
+REGRESSION_THRESHOLD = 0.05
+
+def get_ffmpeg_version(ffmpeg_path):
+    try:
+        output = subprocess.run([ffmpeg_path, '-version'], capture_output=True, text=True, **no_window_kwargs()).stdout
+    except OSError:
+        return None
+    return output.splitlines()[0] if output else None
+
+# Clipe de teste determinístico (testsrc + sine) gerado pelo próprio ffmpeg, sem rede nem amostras
+def make_test_clip(ffmpeg_path, clip_file, duration, resolution, frame_rate):
+    command = [ffmpeg_path, '-y', '-nostats', '-progress', 'pipe:1',
+               '-f', 'lavfi', '-i', f"testsrc=size={resolution}:rate={frame_rate}:duration={duration}",
+               '-f', 'lavfi', '-i', f"sine=frequency=1000:sample_rate=48000:duration={duration}",
+               '-c:v', 'mpeg4', '-q:v', '2', '-c:a', 'pcm_s16le', '-shortest', clip_file]
+    return run_ffmpeg(command)
+
+def profile_key(row):
+    return f"{row['video_codec']}/{row['format']} {row['resolution']} {row['video_bitrate']}"
+
+# Codifica o mesmo clipe sintético em cada combinação de perfil, resolução e bitrate
+def bench_profiles(args):
+    settings = read_settings(args.config)  # Sem o arquivo, valem os padrões do config.ini
+    if args.ffmpeg:
+        settings['ffmpeg_path'] = args.ffmpeg
+    codecs = args.codecs.split(',') if args.codecs else None
+    profiles = [profile for profile in BENCH_PROFILES if not codecs or profile[0] in codecs]
+    resolutions = args.resolutions.split(',')
+    bitrates = args.bitrates.split(',') if args.bitrates else [settings['video_bitrate']]
+
+    work_dir = tempfile.mkdtemp(prefix='winff_bench_profiles_')
+    rows = []
+    try:
+        clip_file = os.path.join(work_dir, 'testsrc.mkv')
+        returncode, error = make_test_clip(settings['ffmpeg_path'], clip_file, args.duration, args.source_resolution, args.frame_rate)
+        if returncode != 0:
+            print(f"could not generate the test clip: {error}", file=sys.stderr)
+            return 2
+
+        for video_codec, output_format, audio_codec in profiles:
+            for resolution in resolutions:
+                for bitrate in bitrates:
+                    profile_settings = dict(settings, default_video_codec=video_codec, default_format=output_format,
+                                            default_audio_codec=audio_codec, default_resolution=resolution,
+                                            video_bitrate=bitrate, parallel_jobs=1)
+                    profile_settings = apply_core_budget(profile_settings, plan_core_budget(profile_settings, 1))
+                    output_file = os.path.join(work_dir, f"out.{output_format}")
+                    last = {}
+                    usage = {}
+                    start = time.perf_counter()
+                    returncode, error = run_ffmpeg(build_command(clip_file, output_file, profile_settings, progress=True),
+                                                   lambda update: last.update({k: v for k, v in update.items() if v is not None}), usage)
+                    wall = time.perf_counter() - start
+                    row = {
+                        'video_codec': video_codec,
+                        'format': output_format,
+                        'audio_codec': audio_codec,
+                        'resolution': resolution,
+                        'video_bitrate': bitrate,
+                        'threads': profile_settings['threads_per_job'],
+                        'status': 'done' if returncode == 0 else 'failed',
+                        'error': error,
+                        'wall_seconds': wall,
+                        'fps': last.get('fps'),
+                        'realtime_factor': args.duration / wall if returncode == 0 else None,
+                        'cpu_seconds': usage.get('user_seconds', 0.0) + usage.get('system_seconds', 0.0) if usage else None,
+                        'max_rss': usage.get('max_rss'),
+                        'output_bytes': os.path.getsize(output_file) if returncode == 0 and os.path.exists(output_file) else None,
+                    }
+                    rows.append(row)
+                    if os.path.exists(output_file):
+                        os.remove(output_file)
+                    if row['status'] == 'done':
+                        cpu = f"{row['cpu_seconds']:.2f}" if row['cpu_seconds'] is not None else "-"
+                        rss = f"{row['max_rss'] / 2**20:.0f}" if row['max_rss'] else "-"
+                        fps = f"{row['fps']:.1f}" if row['fps'] else "-"
+                        print(f"{profile_key(row):<32} {fps:>8} fps {row['realtime_factor']:>7.2f}x {cpu:>8} cpu s {rss:>6} MB "
+                              f"{row['output_bytes'] or 0:>10} B", flush=True)
+                    else:
+                        print(f"{profile_key(row):<32} failed: {error}", flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    run = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'cores': os.cpu_count(),
+        'ffmpeg': get_ffmpeg_version(settings['ffmpeg_path']),
+        'clip': {'duration': args.duration, 'resolution': args.source_resolution, 'frame_rate': args.frame_rate},
+        'results': rows,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(run, file, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+# Compara duas execuções de "profiles" (JSON); retorna 1 se algum perfil ficou mais lento que o limite
+def bench_compare(args):
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.candidate, encoding='utf-8') as file:
+        candidate = json.load(file)
+    print(f"baseline:  {baseline.get('ffmpeg')} ({baseline.get('host')}, {baseline.get('created')})")
+    print(f"candidate: {candidate.get('ffmpeg')} ({candidate.get('host')}, {candidate.get('created')})")
+
+    before = {profile_key(row): row for row in baseline['results']}
+    regressions = 0
+    print(f"{'profile':<32} {'fps before':>10} {'fps after':>10} {'speed':>8} {'cpu s':>14} {'size':>8}")
+    for row in candidate['results']:
+        key = profile_key(row)
+        old = before.get(key)
+        if not old or old['status'] != 'done' or row['status'] != 'done':
+            status = row['status'] if old else 'new'
+            print(f"{key:<32} {'-':>10} {'-':>10} {status:>8}")
+            continue
+        # O fator de tempo real vem do tempo de parede do mesmo clipe; o fps do ffmpeg é só informativo
+        change = row['realtime_factor'] / old['realtime_factor'] - 1
+        cpu = f"{old['cpu_seconds']:.1f}->{row['cpu_seconds']:.1f}" if old['cpu_seconds'] is not None and row['cpu_seconds'] is not None else "-"
+        size = f"{row['output_bytes'] / old['output_bytes'] - 1:+.1%}" if old['output_bytes'] and row['output_bytes'] else "-"
+        flag = ""
+        if change < -args.threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{key:<32} {old['fps'] or 0:>10.1f} {row['fps'] or 0:>10.1f} {change:>+8.1%} {cpu:>14} {size:>8}{flag}")
+
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+# Latência por arquivo da sondagem completa e da rápida (sem cache); a rápida inclui a
+# segunda sondagem quando algum campo faltou
+def bench_probe(args):
+    settings = read_settings(args.config)
+    if args.ffmpeg:
+        settings['ffmpeg_path'] = args.ffmpeg
+    ffprobe_path = get_ffprobe_path(settings['ffmpeg_path'])
+    files = collect_input_files(args.inputs)
+    if not files:
+        print("no input files", file=sys.stderr)
+        return 2
+
+    def timed(probe):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            try:
+                probe()
+            except ProbeError:
+                return None
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    def fast_probe(input_file):
+        info = run_ffprobe(ffprobe_path, input_file, fast=True)
+        if not probe_is_complete(info):
+            info = run_ffprobe(ffprobe_path, input_file)
+            fallbacks.add(input_file)
+        return info
+
+    rows = []
+    fallbacks = set()
+    print(f"{'file':<40} {'size MB':>8} {'full ms':>9} {'fast ms':>9} {'speedup':>8}")
+    for input_file in files:
+        full = timed(lambda: run_ffprobe(ffprobe_path, input_file))
+        fast = timed(lambda: fast_probe(input_file))
+        row = {'file': input_file, 'bytes': os.path.getsize(input_file), 'full_seconds': full, 'fast_seconds': fast,
+               'fallback': input_file in fallbacks}
+        rows.append(row)
+        if full is None or fast is None:
+            print(f"{os.path.basename(input_file)[:40]:<40} {row['bytes'] / 2**20:>8.1f} {'failed':>9}")
+            continue
+        print(f"{os.path.basename(input_file)[:40]:<40} {row['bytes'] / 2**20:>8.1f} {full * 1000:>9.1f} {fast * 1000:>9.1f} "
+              f"{full / fast:>7.2f}x" + ("  (fallback to full probe)" if row['fallback'] else ""))
+
+    measured = [row for row in rows if row['full_seconds'] is not None and row['fast_seconds'] is not None]
+    if measured:
+        full_total = sum(row['full_seconds'] for row in measured)
+        fast_total = sum(row['fast_seconds'] for row in measured)
+        print(f"{len(measured)} files: full {full_total * 1000:.0f} ms, fast {fast_total * 1000:.0f} ms ({full_total / fast_total:.2f}x), "
+              f"{sum(1 for row in measured if row['fallback'])} fallback(s)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'ffprobe': ffprobe_path, 'repeat': args.repeat, 'results': rows}, file, indent=2)
+    return 0
+
+# Importações de primeiro nível mais lentas de uma execução com -X importtime: [(módulo, segundos)]
+def parse_import_times(stderr, limit):
+    imports = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        if not name.startswith(' '):
+            imports.append((name.strip(), int(parts[1]) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+# Abertura da interface em processos novos: tempo das importações e até a primeira janela
+# desenhada (informados pela própria interface com WINFF_STARTUP_BENCH) e do processo inteiro
+def bench_startup(args):
+    script = args.script or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'GUI_tkinter_WINFF_batch.py')
+    env = dict(os.environ, WINFF_STARTUP_BENCH='1')
+
+    def launch(extra=()):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, *extra, script], capture_output=True, text=True, env=env, timeout=args.timeout)
+        wall = time.perf_counter() - start
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit code {process.returncode}")
+        return dict(json.loads(lines[-1]), process_seconds=wall), process.stderr
+
+    runs = []
+    try:
+        for _ in range(args.repeat):
+            runs.append(launch()[0])
+        slowest = parse_import_times(launch(['-X', 'importtime'])[1], args.imports) if args.imports else []
+    except (RuntimeError, subprocess.TimeoutExpired, ValueError) as e:
+        print(f"could not start {script}: {e}", file=sys.stderr)
+        return 2
+
+    result = {key: statistics.median(run[key] for run in runs) for key in ('imports_seconds', 'first_window_seconds', 'process_seconds')}
+    print(f"{len(runs)} runs (median): imports {result['imports_seconds'] * 1000:.0f} ms, first window {result['first_window_seconds'] * 1000:.0f} ms, "
+          f"process {result['process_seconds'] * 1000:.0f} ms")
+    for name, seconds in slowest:
+        print(f"  {name:<40} {seconds * 1000:>8.1f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'host': platform.node(), 'python': platform.python_version(),
+                       'script': script, 'median': result, 'runs': runs, 'slowest_imports': slowest}, file, indent=2)
+    return 0
+
+# Operações da lista de arquivos com caminhos sintéticos (sem tocar no disco); a
+# deduplicação antiga (busca em tupla) é medida com menos arquivos por ser quadrática
+def bench_filelist(args):
+    paths = [os.path.join('//servidor', 'audiencias', f"{index // 1000:03d}", f"audiencia_{index:06d}.asf") for index in range(args.count)]
+    rows = []
+
+    def timed(name, func, count):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        rows.append({'operation': name, 'files': count, 'seconds': seconds})
+        print(f"{name:<28} {count:>8} {seconds * 1000:>10.1f} ms", flush=True)
+
+    file_list = FileList()
+    timed('add', lambda: file_list.add(paths), args.count)
+    timed('add duplicates', lambda: file_list.add(paths), args.count)
+    timed('visible rows (middle)', lambda: file_list.rows(args.count // 2, 10), 10)
+    removed = paths[::100]
+    timed('remove 1%', lambda: file_list.remove(removed), len(removed))
+    timed('clear', file_list.clear, len(file_list))
+
+    if args.legacy_count:
+        legacy_paths = paths[:args.legacy_count]
+
+        # Como select_files fazia antes: cada caminho procurado na tupla de itens da lista
+        def legacy_add():
+            current = ()
+            for path in legacy_paths:
+                if path not in current:
+                    current += (path,)
+        timed('add (tuple dedupe, old)', legacy_add, len(legacy_paths))
+        timed('add (FileList)', lambda: FileList().add(legacy_paths), len(legacy_paths))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'host': platform.node(), 'results': rows}, file, indent=2)
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="WinFF conversion benchmarks.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plans = subparsers.add_parser('plans', help="compare jobs x threads plans on the same file set")
+    plans.add_argument('inputs', nargs='+', help="input files or directories")
+    plans.add_argument('-c', '--config', default='config.ini', help="configuration file with the profile to benchmark")
+    plans.add_argument('--plans', default='auto,1x' + str(os.cpu_count() or 1), help="comma-separated plans: 'auto' or JOBSxTHREADS")
+    plans.add_argument('--repeat', type=int, default=1, help="runs per plan (the fastest is reported)")
+    plans.add_argument('--warmup', type=int, default=0, help="untimed runs per plan before measuring")
+    plans.add_argument('--ffmpeg', help="ffmpeg executable (overrides ffmpeg_path)")
+    plans.add_argument('--json', help="also write the results to this JSON file")
+    plans.set_defaults(func=bench_plans)
+
+    staging = subparsers.add_parser('staging', help="compare copying inputs on demand with copying them ahead of the encoders")
+    staging.add_argument('inputs', nargs='+', help="input files or directories")
+    staging.add_argument('-c', '--config', default='config.ini', help="configuration file with the profile to benchmark")
+    staging.add_argument('--prefetch', default='0,2', help="comma-separated prefetch depths (0 copies each input when its conversion starts)")
+    staging.add_argument('--read-limit', type=float, default=20.0, help="simulated share read speed in MB/s (0 = unlimited)")
+    staging.add_argument('--budget', type=float, default=4096.0, help="scratch space for staged inputs, in MB")
+    staging.add_argument('--ffmpeg', help="ffmpeg executable (overrides ffmpeg_path)")
+    staging.add_argument('--json', help="also write the results to this JSON file")
+    staging.set_defaults(func=bench_staging)
+
+    profiles = subparsers.add_parser('profiles', help="encode a synthetic lavfi clip with every profile and record speed, CPU, memory and size")
+    profiles.add_argument('-c', '--config', default='config.ini', help="configuration file (audio settings and ffmpeg_path)")
+    profiles.add_argument('--codecs', help="comma-separated video codecs to run (default: wmv2,libx264,libx265,mpeg4)")
+    profiles.add_argument('--resolutions', default=','.join(BENCH_RESOLUTIONS), help="comma-separated output resolutions")
+    profiles.add_argument('--bitrates', help="comma-separated video bitrates (default: video_bitrate from the configuration)")
+    profiles.add_argument('--duration', type=float, default=10.0, help="test clip duration in seconds")
+    profiles.add_argument('--source-resolution', default='1920x1080', help="test clip resolution")
+    profiles.add_argument('--frame-rate', default='30', help="test clip frame rate")
+    profiles.add_argument('--ffmpeg', help="ffmpeg executable (overrides ffmpeg_path)")
+    profiles.add_argument('--json', help="write the run to this JSON file (input for 'compare')")
+    profiles.add_argument('--csv', help="also write the results to this CSV file")
+    profiles.set_defaults(func=bench_profiles)
+
+    compare = subparsers.add_parser('compare', help="compare two 'profiles' runs and flag slower profiles")
+    compare.add_argument('baseline', help="JSON from the reference run")
+    compare.add_argument('candidate', help="JSON from the new run")
+    compare.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="speed drop (fraction) reported as a regression")
+    compare.set_defaults(func=bench_compare)
+
+    probe = subparsers.add_parser('probe', help="compare full and fast ffprobe latency per file")
+    probe.add_argument('inputs', nargs='+', help="input files or directories")
+    probe.add_argument('-c', '--config', default='config.ini', help="configuration file (ffmpeg_path)")
+    probe.add_argument('--repeat', type=int, default=3, help="probes per file and mode (the median is reported)")
+    probe.add_argument('--ffmpeg', help="ffmpeg executable (overrides ffmpeg_path)")
+    probe.add_argument('--json', help="also write the results to this JSON file")
+    probe.set_defaults(func=bench_probe)
+
+    startup = subparsers.add_parser('startup', help="measure GUI start-up: import time and time to the first window")
+    startup.add_argument('--repeat', type=int, default=5, help="launches (the median is reported)")
+    startup.add_argument('--imports', type=int, default=10, help="slowest top-level imports to list (one extra launch with -X importtime; 0 = skip)")
+    startup.add_argument('--script', help="GUI script to launch (default: GUI_tkinter_WINFF_batch.py next to this file)")
+    startup.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for each launch")
+    startup.add_argument('--json', help="also write the results to this JSON file")
+    startup.set_defaults(func=bench_startup)
+
+    filelist = subparsers.add_parser('filelist', help="time adding, deduplicating, removing and clearing file list entries")
+    filelist.add_argument('--count', type=int, default=100000, help="synthetic paths to insert")
+    filelist.add_argument('--legacy-count', type=int, default=5000, help="paths for the old tuple-based dedupe comparison (0 = skip)")
+    filelist.add_argument('--json', help="also write the results to this JSON file")
+    filelist.set_defaults(func=bench_filelist)
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
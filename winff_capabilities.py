@@ -0,0 +1,163 @@
+# Índice do que o ffmpeg instalado sabe fazer (encoders, decoders, muxers, demuxers e
+# filtros), montado uma vez a partir da saída do ffmpeg e guardado em disco por binário
+import os
+import json
+import threading
+import subprocess
+
+# Saídas do ffmpeg/ffprobe guardadas no índice (as de texto também aparecem em "Versão do FFmpeg")
+CAPABILITY_COMMANDS = {
+    'version': ['-version'],
+    'buildconf': ['-hide_banner', '-buildconf'],
+    'codecs': ['-hide_banner', '-codecs'],
+    'formats': ['-hide_banner', '-formats'],
+    'protocols': ['-hide_banner', '-protocols'],
+    'filters': ['-hide_banner', '-filters'],
+    'encoders': ['-hide_banner', '-encoders'],
+    'decoders': ['-hide_banner', '-decoders'],
+}
+
+# Formatos da interface cujo muxer tem outro nome no ffmpeg
+FORMAT_MUXERS = {'wmv': 'asf', 'mkv': 'matroska', 'm4a': 'ipod'}
+
+STREAM_TYPES = {'V': 'video', 'A': 'audio', 'S': 'subtitle', 'D': 'data', 'T': 'attachment'}
+
+# Linhas depois do separador (" ------" ou " --") das listagens do ffmpeg
+def listing_lines(text):
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip().startswith('--'):
+            return [line for line in lines[index + 1:] if line.strip()]
+    return []
+
+# "-encoders"/"-decoders": " V....D libx264   libx264 H.264 / AVC ..."
+def parse_coders(text):
+    coders = {}
+    for line in listing_lines(text):
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            coders[parts[1]] = {'type': STREAM_TYPES.get(parts[0][0], parts[0][0]), 'description': parts[2] if len(parts) > 2 else ''}
+    return coders
+
+# "-codecs": " DEV.LS h264   H.264 / AVC ... (encoders: libx264 ...)"; o ffmpeg aceita o nome do
+# codec em -vcodec/-acodec (ex.: mp3 usa libmp3lame) quando há algum encoder para ele
+def parse_codecs(text):
+    codecs = {}
+    for line in listing_lines(text):
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            codecs[parts[1]] = {'type': STREAM_TYPES.get(parts[0][2], parts[0][2]), 'decode': parts[0][0] == 'D',
+                                'encode': parts[0][1] == 'E', 'description': parts[2] if len(parts) > 2 else ''}
+    return codecs
+
+# "-formats": " DE asf   ASF (Advanced / Active Streaming Format)"; nomes podem vir separados por vírgula
+def parse_formats(text):
+    muxers = {}
+    demuxers = {}
+    for line in listing_lines(text):
+        flags, names = line[:4], line[4:].split(None, 1)
+        if not names:
+            continue
+        description = names[1] if len(names) > 1 else ''
+        for name in names[0].split(','):
+            if 'E' in flags:
+                muxers[name] = description
+            if 'D' in flags:
+                demuxers[name] = description
+    return muxers, demuxers
+
+# "-filters": " TSC scale   V->V   Scale the input video size ..."
+def parse_filters(text):
+    filters = {}
+    for line in listing_lines(text):
+        parts = line.split(None, 3)
+        if len(parts) >= 3 and '->' in parts[2]:
+            filters[parts[1]] = {'io': parts[2], 'description': parts[3] if len(parts) > 3 else ''}
+    return filters
+
+def binary_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+# Executa os comandos em paralelo e monta o índice; None se o ffmpeg não puder ser executado
+def build_capabilities(ffmpeg_path, ffprobe_path, popen_kwargs=None):
+    outputs = {}
+
+    def run(key, command):
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, errors='replace', **(popen_kwargs or {}))
+            outputs[key] = process.stdout.strip() if process.returncode == 0 else None
+        except OSError:
+            outputs[key] = None
+
+    commands = {key: [ffmpeg_path] + arguments for key, arguments in CAPABILITY_COMMANDS.items()}
+    commands['ffprobe_version'] = [ffprobe_path, '-version']
+    threads = [threading.Thread(target=run, args=(key, command)) for key, command in commands.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if not outputs.get('version') or not outputs.get('encoders'):
+        return None
+
+    muxers, demuxers = parse_formats(outputs['formats'] or '')
+    return {
+        'version': outputs['version'].splitlines()[0],
+        'codecs': parse_codecs(outputs['codecs'] or ''),
+        'encoders': parse_coders(outputs['encoders']),
+        'decoders': parse_coders(outputs['decoders'] or ''),
+        'muxers': muxers,
+        'demuxers': demuxers,
+        'filters': parse_filters(outputs['filters'] or ''),
+        'raw': {key: outputs[key] or '' for key in ('version', 'buildconf', 'codecs', 'formats', 'protocols', 'filters', 'ffprobe_version')},
+    }
+
+cache_lock = threading.Lock()
+
+# Índice do binário, lido do arquivo de cache se o ffmpeg e o ffprobe não mudaram
+def load_capabilities(ffmpeg_path, ffprobe_path, cache_file, popen_kwargs=None):
+    key = {'ffmpeg': binary_key(ffmpeg_path), 'ffprobe': binary_key(ffprobe_path)}
+    if key['ffmpeg'] is None:
+        return None
+    with cache_lock:
+        cache = {}
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, encoding='utf-8') as file:
+                    cache = json.load(file)
+            except (OSError, ValueError):
+                cache = {}
+        entry = cache.get(key['ffmpeg']['path'])
+        if entry and entry.get('key') == key:
+            return entry['index']
+
+        index = build_capabilities(ffmpeg_path, ffprobe_path, popen_kwargs)
+        if index is None or not cache_file:
+            return index
+        cache[key['ffmpeg']['path']] = {'key': key, 'index': index}
+        temp_file = cache_file + '.tmp'
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                json.dump(cache, file)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass  # Sem cache em disco o índice é montado de novo na próxima vez
+        return index
+
+def has_encoder(index, name):
+    return name in index['encoders'] or index['codecs'].get(name, {}).get('encode', False)
+
+# Encoders e muxer que as opções exigem e que o ffmpeg não tem: lista de (tipo, nome)
+def missing_capabilities(index, settings, output_format):
+    missing = []
+    for kind, key in (('video', 'default_video_codec'), ('audio', 'default_audio_codec')):
+        codec = settings.get(key)
+        if codec and codec != 'auto' and not has_encoder(index, codec):
+            missing.append((f"{kind} encoder", codec))
+    muxer = FORMAT_MUXERS.get(output_format, output_format)
+    if muxer not in index['muxers']:
+        missing.append(('muxer', muxer))
+    return missing
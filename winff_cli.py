@@ -0,0 +1,373 @@
+# Conversão em lote pela linha de comando, sem tkinter (servidores sem display, cron)
+#
+# Exemplos:
+#   python winff_cli.py -c config.ini gravacoes/*.mp4
+#   python winff_cli.py -c config.ini -j 8 -o /srv/convertidos /srv/audiencias
+#   python winff_cli.py -c config.ini --manifest lista.txt
+#   python winff_cli.py -c config.ini --check /srv/audiencias
+#   python winff_cli.py -c config.ini --transcription -o /srv/transcricao /srv/audiencias
+#   python winff_cli.py -c config.ini --resume
+#   python winff_cli.py -c config.ini -o /srv/convertidos --watch /srv/captura/sala1 --watch /srv/captura/sala2
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from winff_metrics import job_metrics, summarize_metrics
+from winff_preflight import run_preflight, report_has_problems, valid_files, format_preflight_report
+from winff_core import (PROGRESS_UPDATE_INTERVAL, MEDIA_EXTENSIONS, JOB_ORDERS, load_language, read_settings, get_output_dir, run_batch,
+                        parse_job_count, format_duration, check_capabilities, AUDIO_FORMATS, TRANSCRIPTION_CODECS)
+
+# Espera (segundos) por um arquivo pronto antes de verificar se o modo de observação terminou
+WATCH_QUEUE_TIMEOUT = 1.0
+
+# Lê um manifesto: um caminho por linha, linhas vazias e comentários (#) ignorados
+def read_manifest(manifest_file):
+    with open(manifest_file, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith('#')]
+
+# Expande arquivos, diretórios (recursivamente, só extensões de mídia) e manifestos
+def collect_input_files(paths, manifest_files=()):
+    for manifest_file in manifest_files:
+        paths = list(paths) + read_manifest(manifest_file)
+
+    files = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                        found.append(os.path.join(dirpath, name))
+        else:
+            found = [path]
+        for file in found:
+            file = os.path.abspath(file)
+            if file not in seen:
+                seen.add(file)
+                files.append(file)
+    return files
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch video conversion with FFmpeg (headless).")
+    parser.add_argument('inputs', nargs='*', help="input files or directories")
+    parser.add_argument('-c', '--config', default='config.ini', help="configuration file (same keys as the GUI config.ini)")
+    parser.add_argument('-m', '--manifest', action='append', default=[], help="text file with one input path per line")
+    parser.add_argument('-o', '--output-dir', help="output directory (overrides default_output_dir/use_same_directory)")
+    parser.add_argument('-j', '--jobs', help="simultaneous conversions or 'auto' (overrides parallel_jobs)")
+    parser.add_argument('-t', '--threads', help="ffmpeg threads per conversion or 'auto' (overrides threads_per_job)")
+    parser.add_argument('--order', choices=JOB_ORDERS, help="job order: longest first (shortest batch time), shortest first or as given (overrides job_order)")
+    parser.add_argument('--split', action='store_true', help="split long files at keyframes and encode the parts in parallel (overrides split_encode)")
+    parser.add_argument('--staging-dir', help="local scratch directory: copy upcoming inputs there while earlier files encode (overrides staging_dir)")
+    parser.add_argument('--staging-budget', type=float, help="scratch space for staged inputs, in MB (overrides staging_budget_mb)")
+    parser.add_argument('--prefetch', type=int, help="inputs to copy ahead of the running conversions (overrides staging_prefetch)")
+    parser.add_argument('--audio-only', choices=AUDIO_FORMATS, help="extract only the first audio stream to this format; video is never decoded and many extractions run per core (overrides default_format)")
+    parser.add_argument('--transcription', action='store_true', help="write WAV/FLAC as 16 kHz mono for speech-to-text; implies --audio-only wav unless flac is chosen (overrides transcription_audio)")
+    parser.add_argument('--ffmpeg', help="ffmpeg executable (overrides ffmpeg_path)")
+    parser.add_argument('--journal', help="SQLite job journal (overrides job_journal)")
+    parser.add_argument('--no-journal', action='store_true', help="do not record the batch in the job journal")
+    parser.add_argument('--resume', action='store_true', help="resume the unfinished batches recorded in the job journal")
+    parser.add_argument('--watch', action='append', default=[], metavar='DIR', help="watch a folder and convert each new recording once its size and mtime stop changing (repeatable; stop with Ctrl+C)")
+    parser.add_argument('--include-existing', action='store_true', help="with --watch, also convert the files already in the folders")
+    parser.add_argument('--check', action='store_true', help="only run the preflight checks (inputs, codecs/format, outputs, free space) and print the report")
+    parser.add_argument('--skip-invalid', action='store_true', help="convert the files that passed the preflight checks instead of stopping when some did not")
+    parser.add_argument('--status-port', type=int, help="serve the batch status on http://127.0.0.1:PORT (/status JSON, /metrics Prometheus) (overrides status_port)")
+    parser.add_argument('--language', default='pt_br', help="locale used for messages and the converted files folder name")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print the final summary and errors")
+    return parser.parse_args(argv)
+
+# Converte um lote imprimindo o progresso; retorna a quantidade de arquivos com falha
+def convert_and_report(files, settings, output_dir, language, args, journal=None, batch_id=None, status=None, probes=None):
+    total_files = len(files)
+    print_lock = threading.Lock()
+    state = {'completed': 0, 'last_print': {}, 'summary': None}
+
+    def on_event(event, input_file, data):
+        if status:
+            status.on_event(event, input_file, data)
+        name = os.path.basename(input_file) if input_file else ""
+        with print_lock:
+            if event == 'plan':
+                print(f"{language.get('core_plan', 'Core plan')}: {data['jobs']} {language.get('jobs', 'jobs')} x {data['threads']} threads "
+                      f"({data['cores']} {language.get('cores', 'cores')}, {data['encoder']})", flush=True)
+            elif event == 'schedule':
+                speed = f"{data['speed']:.2f}x" if data['speed_known'] else language.get('estimate_without_history', 'assuming realtime speed, no history for this profile')
+                print(f"{language.get('job_order', 'Order')}: {data['order']}, {language.get('estimated_time', 'estimated time')} "
+                      f"{format_duration(data['estimated_makespan'])} ({format_duration(data['media_seconds'])}, {speed})", flush=True)
+            elif event == 'summary':
+                state['summary'] = data
+            elif event == 'progress' and not args.quiet:
+                now = time.monotonic()
+                # Uma linha por arquivo a cada poucos segundos é suficiente em log de cron
+                if now - state['last_print'].get(input_file, 0.0) < PROGRESS_UPDATE_INTERVAL * 20 and not data['finished']:
+                    return
+                state['last_print'][input_file] = now
+                percent = f"{data['percent']:.0f}%" if data['percent'] is not None else "?"
+                speed = f"{data['speed']:.2f}x" if data['speed'] is not None else "?"
+                print(f"  {name}: {percent} {speed}", flush=True)
+            elif event == 'start' and not args.quiet:
+                print(f"{language.get('converting', 'Converting')}: {name}", flush=True)
+            elif event == 'done':
+                state['completed'] += 1
+                state['last_print'].pop(input_file, None)
+                if data['status'] == 'done':
+                    if not args.quiet:
+                        copied = f" (copy: {', '.join(data['copied_streams'])})" if data['copied_streams'] else ""
+                        print(f"[{state['completed']}/{total_files}] OK {name} -> {data['output_file']}{copied}", flush=True)
+                elif data['status'] == 'exists':
+                    print(f"[{state['completed']}/{total_files}] {language.get('file_exists_error', 'The file already exists and cannot be overwritten.')} '{data['output_file']}'", file=sys.stderr, flush=True)
+                else:
+                    print(f"[{state['completed']}/{total_files}] {language.get('conversion_error', 'Failed to convert video.')} {name}: {data['error']}", file=sys.stderr, flush=True)
+
+    if status:
+        status.start_batch(total_files)
+    start = time.monotonic()
+    results = run_batch(files, settings, output_dir, on_event=on_event, journal=journal, batch_id=batch_id, probes=probes)
+    failed = [result for result in results if result['status'] != 'done']
+
+    print(f"{language.get('conversion_complete', 'Video conversion completed.')} {total_files - len(failed)}/{total_files} OK, "
+          f"{len(failed)} {language.get('failed', 'failed')}, {time.monotonic() - start:.1f} s. "
+          f"{language.get('files_saved_in', 'Files saved in:')} {output_dir}")
+    if settings.get('metrics_log') and os.path.exists(os.path.join(output_dir, settings['metrics_log'])):
+        metrics = summarize_metrics([job_metrics(result) for result in results])
+        speed = f"{metrics['speed']:.2f}x" if metrics['speed'] else "-"
+        print(f"{language.get('job_metrics', 'Job metrics')}: CPU {metrics['user_seconds']:.1f} s user + {metrics['system_seconds']:.1f} s sys, "
+              f"{language.get('peak_memory', 'peak memory')} {metrics['max_rss'] / 2**20:.0f} MB, {language.get('speed', 'speed')} {speed} "
+              f"-> {os.path.join(output_dir, settings['metrics_log'])}")
+    summary = state['summary']
+    if summary:
+        print(f"{language.get('estimated_time', 'estimated time')} {format_duration(summary['estimated_makespan'])}, "
+              f"{language.get('actual_time', 'actual time')} {format_duration(summary['actual_makespan'])}"
+              + (f" ({summary['observed_speed']:.2f}x)" if summary['observed_speed'] else ""))
+    return len(failed)
+
+# Opções do config.ini com as substituições da linha de comando
+def load_settings(args):
+    settings = read_settings(args.config)
+    if args.ffmpeg:
+        settings['ffmpeg_path'] = args.ffmpeg
+    if args.jobs:
+        settings['parallel_jobs'] = parse_job_count(args.jobs)
+    if args.threads:
+        settings['threads_per_job'] = parse_job_count(args.threads)
+    if args.order:
+        settings['job_order'] = args.order
+    if args.split:
+        settings['split_encode'] = True
+    if args.staging_dir:
+        settings['staging_dir'] = args.staging_dir
+    if args.staging_budget is not None:
+        settings['staging_budget_mb'] = args.staging_budget
+    if args.prefetch is not None:
+        settings['staging_prefetch'] = args.prefetch
+    if args.audio_only:
+        settings['default_format'] = args.audio_only
+    if args.transcription:
+        settings['transcription_audio'] = True
+        if settings['default_format'] not in TRANSCRIPTION_CODECS:
+            settings['default_format'] = 'wav'
+    if args.output_dir:
+        settings['default_output_dir'] = args.output_dir
+        settings['use_same_directory'] = False
+    return settings
+
+# Verificação prévia de um lote (novo, retomado ou do modo de observação): imprime o relatório e
+# devolve (arquivos a converter, relatório). Nenhum arquivo segue se o lote tiver problemas; com
+# --skip-invalid seguem os sem problema próprio, desde que nada impeça o lote inteiro
+def preflight_batch(files, settings, output_dir, language, args):
+    report = run_preflight(files, settings, output_dir)
+    problems = report_has_problems(report)
+    if problems or args.check or not args.quiet:
+        print(f"{language.get('preflight', 'Preflight check')}: {format_preflight_report(report, language, limit=None if args.check else 20)}",
+              file=sys.stderr if problems else sys.stdout, flush=True)
+    if report['batch'] or (report['file_problems'] and not args.skip_invalid):
+        return [], report
+    return valid_files(report, files), report
+
+# Modo de observação: cada gravação pronta entra na fila e é convertida com o perfil atual do
+# config.ini (relido a cada lote); os arquivos prontos enquanto um lote converte formam o próximo.
+# Cada lote passa pela verificação prévia; as subpastas observadas são reproduzidas na pasta de
+# saída (com várias pastas observadas, dentro de uma subpasta com o nome de cada uma) para que
+# gravações de mesmo nome não se sobrescrevam
+def watch_and_convert(args, language, journal, status):
+    from winff_watch import FolderWatcher   # ctypes (inotify) só no modo de observação
+    settings = load_settings(args)
+    ready = queue.Queue()
+    stop = threading.Event()
+    busy = threading.Event()
+    watcher = FolderWatcher(args.watch, ready.put, settings['watch_settle_seconds'], settings['watch_poll_seconds'], settings['scan_magic'],
+                            {language.get("converted_files_folder", "Converted Files")}, args.include_existing)
+    failed = 0
+
+    # Caminho da pasta da gravação relativo à pasta observada ('' na raiz)
+    def relative_dir(file):
+        for directory in watcher.directories:
+            if file.startswith(directory + os.sep):
+                relative = os.path.relpath(os.path.dirname(file), directory)
+                if len(watcher.directories) > 1:
+                    relative = os.path.join(os.path.basename(directory), relative)
+                relative = os.path.normpath(relative)
+                return '' if relative == '.' else relative
+        return ''
+
+    # Erro fora da conversão (config inválido, pasta inacessível, diário bloqueado): o grupo conta como
+    # falha e o observador segue com as próximas gravações
+    def report_watch_error(files, error):
+        print(f"{language.get('watch_batch_error', 'These recordings were not converted')} ({', '.join(os.path.basename(file) for file in files)}): {error}",
+              file=sys.stderr, flush=True)
+
+    # Um lote do modo de observação; as gravações barradas na verificação prévia são listadas e voltam
+    # a ser entregues pelo observador quando mudarem (tamanho ou data)
+    def convert_group(group, batch_settings, output_dir):
+        valid, report = preflight_batch(group, batch_settings, output_dir, language, args)
+        skipped = [file for file in group if file not in valid]
+        if skipped:
+            print(f"{language.get('watch_skipped', 'Skipped until they change')}: {', '.join(skipped)}", file=sys.stderr, flush=True)
+        if not valid:
+            return len(group)
+        batch_id = journal.create_batch(valid, output_dir, batch_settings) if journal else None
+        return convert_and_report(valid, batch_settings, output_dir, language, args, journal, batch_id, status, report['probes'])
+
+    def convert_ready():
+        nonlocal failed
+        while not stop.is_set():
+            try:
+                files = [ready.get(timeout=WATCH_QUEUE_TIMEOUT)]
+            except queue.Empty:
+                continue
+            while not ready.empty():
+                files.append(ready.get_nowait())
+            busy.set()
+            try:
+                batch_settings = load_settings(args)
+                # Com "mesmo diretório", cada pasta de origem tem a sua pasta de saída; senão, cada subpasta observada
+                groups = {}
+                for file in files:
+                    groups.setdefault(os.path.dirname(file) if batch_settings['use_same_directory'] else relative_dir(file), []).append(file)
+            except Exception as e:
+                failed += len(files)
+                report_watch_error(files, e)
+                busy.clear()
+                continue
+            try:
+                for key, group in groups.items():
+                    try:
+                        output_dir = get_output_dir(batch_settings, group, language)
+                        if not batch_settings['use_same_directory'] and key:
+                            output_dir = os.path.join(output_dir, key)
+                        failed += convert_group(group, batch_settings, output_dir)
+                    except Exception as e:
+                        failed += len(group)
+                        report_watch_error(group, e)
+            finally:
+                busy.clear()
+
+    converter = threading.Thread(target=convert_ready, daemon=True)
+    converter.start()
+    print(f"{language.get('watching', 'Watching')} ({watcher.mode}): {', '.join(watcher.directories)}", flush=True)
+    try:
+        watcher.run(stop)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    if busy.is_set():
+        print(language.get('watch_stopping', 'Finishing the current batch (Ctrl+C again to abort)...'), flush=True)
+        converter.join()
+    return 1 if failed else 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    language = load_language(args.language)
+
+    if not os.path.exists(args.config):
+        print(f"{language.get('error', 'Error')}: {args.config}", file=sys.stderr)
+        return 2
+
+    settings = load_settings(args)
+
+    status = None
+    status_port = args.status_port if args.status_port is not None else settings['status_port']
+    if str(status_port).strip():
+        # Porta inválida ou em uso: segue sem o endpoint, como na interface
+        from winff_status import BatchStatus, start_status_server   # http.server só com o endpoint ativo
+        try:
+            status = BatchStatus()
+            server = start_status_server(status, int(status_port))
+        except (OSError, ValueError) as e:
+            status = None
+            print(f"{language.get('status_endpoint_unavailable', 'Status endpoint unavailable')}: {e}", file=sys.stderr, flush=True)
+        else:
+            print(f"Status: http://127.0.0.1:{server.server_address[1]}/status", flush=True)
+
+    journal = None
+    if not args.no_journal:
+        from winff_jobqueue import JobJournal   # sqlite3 só com o diário ativo
+        journal = JobJournal(os.path.abspath(args.journal) if args.journal else settings['job_journal'])
+    try:
+        # Retomada: só os arquivos não concluídos, com as opções gravadas no lote original, verificados
+        # de novo (o ffmpeg, as pastas e os arquivos podem ter mudado desde a interrupção). Um lote
+        # barrado fica no diário para outra retomada; os arquivos pulados com --skip-invalid saem como falha
+        if args.resume:
+            if not journal:
+                print("--resume requires the job journal", file=sys.stderr)
+                return 2
+            failed = 0
+            for batch_id, output_dir, batch_settings, count in journal.unfinished_batches():
+                files = journal.recover(batch_id)
+                print(f"{language.get('resuming_batch', 'Resuming batch')} {batch_id}: {count} {language.get('files', 'files')}", flush=True)
+                valid, report = preflight_batch(files, batch_settings, output_dir, language, args)
+                if not valid:
+                    failed += len(files)
+                    continue
+                for input_file, problems in report['file_problems'].items():
+                    journal.mark_failed(batch_id, input_file, ", ".join(kind for kind, _ in problems))
+                failed += convert_and_report(valid, batch_settings, output_dir, language, args, journal, batch_id, status, report['probes'])
+            return 1 if failed else 0
+
+        if args.watch:
+            if not os.path.exists(settings['ffmpeg_path']):
+                print(language.get("ffmpeg_path_not_found", "FFmpeg path not found. Please check if the path is correct."), file=sys.stderr)
+                return 2
+            missing = check_capabilities(settings)
+            if missing:
+                print(f"{language.get('missing_capabilities', 'The selected FFmpeg does not support')}: "
+                      + ", ".join(f"{kind} {name}" for kind, name in missing), file=sys.stderr)
+                return 2
+            if not settings['use_same_directory'] and not settings['default_output_dir']:
+                print(language.get("output_directory_error", "Please select an output directory or check the 'Use same directory as input file' option."), file=sys.stderr)
+                return 2
+            return watch_and_convert(args, language, journal, status)
+
+        files = collect_input_files(args.inputs, args.manifest)
+        if not files:
+            print(language.get("no_video_selected", "No video file selected."), file=sys.stderr)
+            return 2
+
+        if not os.path.exists(settings['ffmpeg_path']):
+            print(language.get("ffmpeg_path_not_found", "FFmpeg path not found. Please check if the path is correct."), file=sys.stderr)
+            return 2
+
+        if not settings['use_same_directory'] and not settings['default_output_dir']:
+            print(language.get("output_directory_error", "Please select an output directory or check the 'Use same directory as input file' option."), file=sys.stderr)
+            return 2
+
+        # Verificação prévia: nenhum arquivo é convertido se o lote tiver problemas
+        output_dir = get_output_dir(settings, files, language)
+        files, report = preflight_batch(files, settings, output_dir, language, args)
+        if args.check:
+            return 2 if report_has_problems(report) else 0
+        if not files:
+            return 2
+
+        batch_id = journal.create_batch(files, output_dir, settings) if journal else None
+        return 1 if convert_and_report(files, settings, output_dir, language, args, journal, batch_id, status, report['probes']) else 0
+
+    finally:
+        if journal:
+            journal.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1125 @@
+# Núcleo de conversão sem dependência do tkinter, compartilhado pela interface
+# gráfica (GUI_tkinter_WINFF_batch.py) e pela linha de comando (winff_cli.py)
+import os
+import subprocess
+import configparser
+import json
+import threading
+import platform
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from winff_staging import InputStager
+from winff_metrics import MetricsLog, job_metrics
+from winff_probecache import ProbeCache, get_ffprobe_version
+from winff_capabilities import load_capabilities, missing_capabilities
+
+# Valores padrão do config.ini
+DEFAULT_CONFIG = {
+    'default_format': 'wmv',
+    'default_output_dir': '',
+    'default_video_codec': 'wmv2',
+    'default_audio_codec': 'wmav2',
+    'default_resolution': '320x240',
+    'video_bitrate': '204800',
+    'audio_bitrate': '65536',
+    'frame_rate': '20',
+    'audio_sample_rate': '22050',
+    'audio_channels': '1',
+    'use_same_directory': 'False',
+    'overwrite_existing': 'True',
+    'stream_copy': 'True',
+    'split_encode': 'False',
+    'split_min_duration': '600',
+    'parallel_jobs': 'auto',
+    'threads_per_job': 'auto',
+    'job_journal': 'winff_jobs.sqlite',
+    'job_order': 'longest',
+    'staging_dir': '',
+    'staging_budget_mb': '4096',
+    'staging_prefetch': '2',
+    'staging_read_limit_mb': '0',
+    'metrics_log': 'winff_metrics.jsonl',
+    'status_port': '',
+    'probe_cache': 'winff_probe_cache.sqlite',
+    'probe_cache_mb': '64',
+    'probe_mode': 'fast',
+    'capability_cache': 'winff_capabilities.json',
+    'scan_magic': 'False',
+    'scan_settle_seconds': '30',
+    'watch_settle_seconds': '15',
+    'watch_poll_seconds': '10',
+    'renditions': '[]',
+    'transcription_audio': 'False',
+}
+
+# Opções de cada rendição extra (saída adicional gerada da mesma decodificação)
+RENDITION_KEYS = ('default_format', 'default_video_codec', 'default_audio_codec', 'default_resolution', 'video_bitrate',
+                  'audio_bitrate', 'frame_rate', 'audio_sample_rate', 'audio_channels', 'suffix')
+
+# Extensões de mídia reconhecidas ao expandir diretórios
+MEDIA_EXTENSIONS = {'.asf', '.wmv', '.wma', '.mp4', '.m4v', '.m4a', '.mov', '.avi', '.mkv', '.flv', '.webm',
+                    '.mpg', '.mpeg', '.ts', '.mts', '.m2ts', '.3gp', '.mp3', '.wav', '.flac', '.ogg', '.aac'}
+
+# Nome do codec informado pelo ffprobe para cada encoder oferecido na interface
+ENCODER_CODEC_NAMES = {
+    'libx264': 'h264',
+    'libx265': 'hevc',
+    'mpeg4': 'mpeg4',
+    'wmv2': 'wmv2',
+    'aac': 'aac',
+    'mp3': 'mp3',
+    'ac3': 'ac3',
+    'wmav2': 'wmav2',
+    'libmp3lame': 'mp3',
+    'pcm_s16le': 'pcm_s16le',
+    'flac': 'flac',
+}
+
+# Tolerância sobre a taxa de bits alvo para aceitar a cópia de um fluxo
+STREAM_COPY_BITRATE_TOLERANCE = 1.05
+
+# Máximo de threads que cada encoder aproveita bem; acima disso é melhor rodar mais
+# conversões simultâneas. Em resoluções pequenas nenhum encoder escala além de SMALL_FRAME_MAX_THREADS
+ENCODER_MAX_THREADS = {
+    'wmv2': 1,
+    'mpeg4': 4,
+    'libx264': 8,
+    'libx265': 8,
+    'auto': 4,
+}
+SMALL_FRAME_AREA = 640 * 480
+SMALL_FRAME_MAX_THREADS = 4
+
+# Saídas só de áudio: o vídeo não é lido nem decodificado (-vn) e só o primeiro fluxo de áudio
+# é mapeado. Essas extrações quase não usam CPU e passam a maior parte do tempo esperando o
+# disco/rede, por isso rodam várias por núcleo (até AUDIO_MAX_JOBS), cada uma com uma thread
+AUDIO_FORMATS = ('mp3', 'wav', 'flac', 'm4a')
+AUDIO_JOBS_PER_CORE = 4
+AUDIO_MAX_JOBS = 32
+
+# Áudio para transcrição (transcription_audio): WAV/FLAC em 16 kHz mono
+TRANSCRIPTION_SAMPLE_RATE = '16000'
+TRANSCRIPTION_CHANNELS = '1'
+TRANSCRIPTION_CODECS = {'wav': 'pcm_s16le', 'flac': 'flac'}
+
+# Codec de áudio de cada formato só de áudio, usado quando o configurado (ex.: wmav2) não cabe
+# no contêiner; os prefixos são os encoders aceitos como estão
+AUDIO_FORMAT_CODECS = {
+    'mp3': ('libmp3lame', ('libmp3lame', 'libshine')),
+    'm4a': ('aac', ('aac', 'libfdk_aac', 'alac')),
+    'flac': ('flac', ('flac',)),
+    'wav': ('pcm_s16le', ('pcm_',)),
+}
+
+# Modo dividido: duração mínima de cada parte e tolerância (segundos) na conferência da duração final
+SPLIT_MIN_CHUNK_DURATION = 60
+SPLIT_DURATION_TOLERANCE = 1.0
+
+# Ordem dos arquivos no lote: maior primeiro (menor tempo total), menor primeiro
+# (resultados mais cedo) ou a ordem da lista
+JOB_ORDERS = ('longest', 'shortest', 'original')
+
+# Processos ffprobe simultâneos ao sondar o lote antes de começar
+PROBE_WORKERS = 8
+
+# Sondagem rápida: só os campos usados pela interface e pelo planejamento, lendo no
+# máximo FAST_PROBE_SIZE bytes / FAST_ANALYZE_DURATION microssegundos do início do arquivo
+PROBE_MODES = ('fast', 'full')
+FAST_PROBE_ENTRIES = ('stream=index,codec_type,codec_name,codec_long_name,width,height,r_frame_rate,channels,sample_rate,bit_rate'
+                      ':stream_disposition=attached_pic:format=format_name,duration,size,bit_rate,start_time')
+FAST_PROBE_SIZE = '5000000'
+FAST_ANALYZE_DURATION = '5000000'
+
+# Intervalo mínimo (segundos) entre atualizações de progresso exibidas
+PROGRESS_UPDATE_INTERVAL = 0.25
+
+# Caminho padrão em subpasta bin para o ffmpeg
+def get_default_ffmpeg_path():
+    if getattr(sys, 'frozen', False):  # Verifica se o programa está empacotado pelo PyInstaller
+        base_path = os.path.join(sys._MEIPASS, 'bin')
+    else:
+        base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin')
+
+    executable_name = 'ffmpeg.exe' if platform.system() == 'Windows' else 'ffmpeg'
+    return os.path.join(base_path, executable_name)
+
+# Converte um número de conversões/threads do config.ini: inteiro >= 1 ou "auto"
+def parse_job_count(value):
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 'auto'
+
+# Caminho do ffprobe, na mesma pasta do ffmpeg
+def get_ffprobe_path(ffmpeg_path):
+    executable_name = 'ffprobe.exe' if platform.system() == 'Windows' else 'ffprobe'
+    return os.path.join(os.path.dirname(ffmpeg_path), executable_name)
+
+# Argumentos extras do subprocess para não abrir janela de console no Windows
+def no_window_kwargs():
+    if platform.system() == "Windows":
+        return {'creationflags': subprocess.CREATE_NO_WINDOW}
+    return {}
+
+# Função para carregar o idioma selecionado (dicionário vazio se não existir)
+def load_language(lang_code):
+    locales_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+    try:
+        with open(os.path.join(locales_folder, f"{lang_code}.json"), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+# Configuração completa do config.ini com os valores padrão
+def get_default_config():
+    defaults = dict(DEFAULT_CONFIG)
+    defaults['ffmpeg_path'] = get_default_ffmpeg_path()
+    return defaults
+
+# Opção booleana do config.ini; um valor inválido (ex.: "sim") vale o padrão
+def config_boolean(config, key):
+    default = DEFAULT_CONFIG[key] == 'True'
+    try:
+        return config.getboolean('DEFAULT', key, fallback=default)
+    except ValueError:
+        return default
+
+# Converte a seção DEFAULT de um config.ini nas opções de conversão; valores inválidos valem o padrão
+def settings_from_config(config):
+    defaults = get_default_config()
+    settings = {key: config.get('DEFAULT', key, fallback=value) for key, value in defaults.items()}
+    for key in ('use_same_directory', 'overwrite_existing', 'stream_copy', 'split_encode', 'scan_magic', 'transcription_audio'):
+        settings[key] = config_boolean(config, key)
+    try:
+        settings['split_min_duration'] = float(settings['split_min_duration'])
+    except ValueError:
+        settings['split_min_duration'] = float(DEFAULT_CONFIG['split_min_duration'])
+    settings['parallel_jobs'] = parse_job_count(settings['parallel_jobs'])
+    settings['threads_per_job'] = parse_job_count(settings['threads_per_job'])
+    for key, convert in (('staging_budget_mb', float), ('staging_prefetch', int), ('staging_read_limit_mb', float), ('probe_cache_mb', float),
+                         ('scan_settle_seconds', float), ('watch_settle_seconds', float), ('watch_poll_seconds', float)):
+        try:
+            settings[key] = convert(settings[key])
+        except ValueError:
+            settings[key] = convert(DEFAULT_CONFIG[key])
+    if settings['probe_mode'] not in PROBE_MODES:
+        settings['probe_mode'] = DEFAULT_CONFIG['probe_mode']
+    if settings['job_order'] not in JOB_ORDERS:
+        settings['job_order'] = DEFAULT_CONFIG['job_order']
+    settings['renditions'] = parse_renditions(settings['renditions'])
+    return settings
+
+# Rendições extras do config.ini (lista JSON de objetos com as chaves de RENDITION_KEYS);
+# um valor inválido vale como nenhuma rendição
+def parse_renditions(value):
+    try:
+        renditions = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return []
+    if not isinstance(renditions, list):
+        return []
+    return [{key: str(rendition[key]) for key in RENDITION_KEYS if key in rendition} for rendition in renditions if isinstance(rendition, dict)]
+
+# Saídas extras de um arquivo: [(caminho, opções da rendição)]. O nome recebe o sufixo da
+# rendição (padrão: _resolução) e um número se ainda coincidir com outra saída
+def get_rendition_outputs(output_file, settings):
+    base_name = os.path.splitext(output_file)[0]
+    used = {output_file}
+    outputs = []
+    for index, rendition in enumerate(settings.get('renditions') or []):
+        rendition_settings = dict(settings, **{key: value for key, value in rendition.items() if key != 'suffix'})
+        suffix = rendition.get('suffix') or ("_" + rendition_settings['default_resolution'] if rendition_settings['default_resolution'] != "original" else f"_{index + 2}")
+        extension = '.' + get_output_format(rendition_settings)
+        rendition_file = base_name + suffix + extension
+        if rendition_file in used:
+            rendition_file = f"{base_name}{suffix}_{index + 2}{extension}"
+        used.add(rendition_file)
+        outputs.append((rendition_file, rendition_settings))
+    return outputs
+
+# Lê um arquivo de configuração (mesmas chaves de load_or_create_config)
+def read_settings(config_file):
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    return resolve_data_paths(settings_from_config(config), config_file)
+
+# Diário e caches com caminho relativo ficam na pasta do config.ini, não na pasta atual
+DATA_PATH_KEYS = ('job_journal', 'probe_cache', 'capability_cache')
+
+def resolve_data_paths(settings, config_file):
+    base_dir = os.path.dirname(os.path.abspath(config_file))
+    for key in DATA_PATH_KEYS:
+        if settings.get(key) and not os.path.isabs(settings[key]):
+            settings[key] = os.path.join(base_dir, settings[key])
+    return settings
+
+# Temporários de todas as saídas de um arquivo (principal e rendições), registrados no diário
+def get_job_temp_files(output_file, settings):
+    return [get_temp_output_file(output_file)] + [get_temp_output_file(rendition_file) for rendition_file, _ in get_rendition_outputs(output_file, settings)]
+
+# Extensão de saída: o codec wmv2 sempre gera um contêiner asf (exceto nas saídas só de áudio)
+def get_output_format(settings):
+    if settings['default_video_codec'] == "wmv2" and settings['default_format'] not in AUDIO_FORMATS:
+        return "asf"
+    return settings['default_format']
+
+def is_audio_only(settings):
+    return settings['default_format'] in AUDIO_FORMATS
+
+# Opções efetivas de uma saída só de áudio: sem codec de vídeo e, para transcrição, WAV/FLAC
+# em 16 kHz mono (a taxa de bits não se aplica a esses codecs sem perdas)
+def get_audio_settings(settings):
+    if not is_audio_only(settings):
+        return settings
+    settings = dict(settings, default_video_codec='auto')
+    codec, accepted = AUDIO_FORMAT_CODECS[settings['default_format']]
+    if settings['default_audio_codec'] not in ('auto', 'copy') and not settings['default_audio_codec'].startswith(accepted):
+        settings['default_audio_codec'] = codec
+    if settings.get('transcription_audio') and settings['default_format'] in TRANSCRIPTION_CODECS:
+        settings.update(default_audio_codec=TRANSCRIPTION_CODECS[settings['default_format']], audio_sample_rate=TRANSCRIPTION_SAMPLE_RATE,
+                        audio_channels=TRANSCRIPTION_CHANNELS, audio_bitrate='')
+    return settings
+
+# Pasta de saída do lote, com a subpasta de arquivos convertidos
+def get_output_dir(settings, files, language):
+    if settings['use_same_directory']:
+        output_dir = os.path.dirname(files[0])
+    else:
+        output_dir = settings['default_output_dir']
+    return os.path.join(output_dir, language.get("converted_files_folder", "Converted Files"))
+
+def get_output_file(output_dir, input_file, settings):
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_dir, base_name + '.' + get_output_format(settings))
+
+# Índice de encoders/muxers/filtros do ffmpeg configurado (winff_capabilities), montado
+# uma vez por binário; None se o ffmpeg não puder ser executado
+def get_capabilities(settings):
+    return load_capabilities(settings['ffmpeg_path'], get_ffprobe_path(settings['ffmpeg_path']),
+                             settings.get('capability_cache'), no_window_kwargs())
+
+# Encoders e muxers das opções (e das rendições extras) que o ffmpeg não oferece, verificados antes de iniciar um lote
+def check_capabilities(settings):
+    index = get_capabilities(settings)
+    if index is None:
+        return []
+    missing = []
+    for output_settings in [settings] + [rendition_settings for _, rendition_settings in get_rendition_outputs('', settings)]:
+        for item in missing_capabilities(index, get_audio_settings(output_settings), get_output_format(output_settings)):
+            if item not in missing:
+                missing.append(item)
+    return missing
+
+# Nome temporário (oculto, mesma extensão para o ffmpeg escolher o contêiner) onde a
+# conversão é gravada antes de ser renomeada atomicamente para o nome final
+def get_temp_output_file(output_file):
+    directory, name = os.path.split(output_file)
+    base_name, extension = os.path.splitext(name)
+    return os.path.join(directory, f".{base_name}.partial{extension}")
+
+# Monta a linha de comando do ffmpeg para um arquivo. Fluxos marcados para cópia
+# são apenas remuxados (-c:v/-c:a copy) e ignoram as opções de codificação.
+# extra_outputs: [(saída, opções, copiar vídeo, copiar áudio)] gravadas pelo mesmo processo,
+# que decodifica a entrada uma única vez e entrega os quadros a cada saída
+def build_command(input_file, output_file, settings, progress=False, copy_video=False, copy_audio=False, input_options=None, extra_outputs=()):
+    command = [settings['ffmpeg_path'], '-y']
+    if progress:
+        command += ['-nostats', '-progress', 'pipe:1']
+    threads = settings.get('threads_per_job')
+    if isinstance(settings.get('filter_threads'), int):
+        command += ['-filter_threads', str(settings['filter_threads'])]
+    if isinstance(threads, int):
+        command += ['-threads', str(threads)]
+    input_options = list(input_options or [])
+    if is_audio_only(settings) and all(is_audio_only(extra_settings) for _, extra_settings, _, _ in extra_outputs):
+        input_options += ['-vn', '-sn', '-dn']   # Nenhuma saída usa vídeo: o demuxer descarta esses pacotes
+    command += input_options + ['-i', input_file]
+    command += build_output_options(settings, copy_video, copy_audio) + [output_file]
+    for extra_file, extra_settings, extra_copy_video, extra_copy_audio in extra_outputs:
+        command += build_output_options(extra_settings, extra_copy_video, extra_copy_audio) + [extra_file]
+    return command
+
+# Opções de codificação de uma saída
+def build_output_options(settings, copy_video=False, copy_audio=False):
+    command = []
+    threads = settings.get('threads_per_job')
+    settings = get_audio_settings(settings)
+    if is_audio_only(settings):
+        command += ['-map', '0:a:0', '-vn', '-sn', '-dn']
+    elif copy_video:
+        command += ['-c:v', 'copy']
+    else:
+        if settings['video_bitrate']:
+            command += ['-b:v', settings['video_bitrate']]
+        if settings['default_resolution'] != "original":
+            command += ['-s', settings['default_resolution']]
+        if settings['frame_rate']:
+            command += ['-r', settings['frame_rate']]
+        if settings['default_video_codec'] != "auto":
+            command += ['-vcodec', settings['default_video_codec']]
+
+    if copy_audio:
+        command += ['-c:a', 'copy']
+    else:
+        if settings['audio_bitrate']:
+            command += ['-b:a', settings['audio_bitrate']]
+        if settings['audio_sample_rate']:
+            command += ['-ar', settings['audio_sample_rate']]
+        if settings['audio_channels']:
+            command += ['-ac', settings['audio_channels']]
+        if settings['default_audio_codec'] != "auto":
+            command += ['-acodec', settings['default_audio_codec']]
+
+    if isinstance(threads, int):
+        command += ['-threads', str(threads)]
+    return command
+
+# Divide os núcleos entre conversões simultâneas e threads por conversão, conforme o
+# encoder escolhido. Valores fixos no config.ini são respeitados; "auto" é planejado
+def plan_core_budget(settings, file_count, cores=None):
+    cores = cores or os.cpu_count() or 1
+    outputs = [settings] + [rendition_settings for _, rendition_settings in get_rendition_outputs('', settings)]
+    video_outputs = [output_settings for output_settings in outputs if not is_audio_only(output_settings)]
+    if not video_outputs:
+        return plan_audio_budget(settings, file_count, cores)
+    # Com rendições, todas as saídas do processo recebem o mesmo -threads: vale a que mais aproveita threads
+    encoder, max_threads = max(((output_settings['default_video_codec'], encoder_max_threads(output_settings)) for output_settings in video_outputs),
+                               key=lambda item: item[1])
+    max_threads = max(1, min(max_threads, cores))
+
+    jobs = settings['parallel_jobs']
+    threads = settings['threads_per_job']
+    if jobs == 'auto' and threads == 'auto':
+        threads = max_threads
+        jobs = max(1, cores // threads)
+        if file_count and jobs > file_count and not settings.get('split_encode'):
+            # Poucos arquivos: os núcleos que sobram vão para threads (até o limite do encoder)
+            jobs = file_count
+            threads = max(1, min(max_threads, cores // jobs))
+    elif jobs == 'auto':
+        jobs = max(1, cores // threads)
+    elif threads == 'auto':
+        threads = max(1, min(max_threads, cores // jobs))
+
+    return {'cores': cores, 'encoder': encoder, 'jobs': jobs, 'threads': threads, 'filter_threads': threads}
+
+# Threads que o encoder de uma saída aproveita bem, menos em resoluções pequenas
+def encoder_max_threads(settings):
+    max_threads = ENCODER_MAX_THREADS.get(settings['default_video_codec'], ENCODER_MAX_THREADS['auto'])
+    width, _, height = settings['default_resolution'].partition('x')
+    if width.isdigit() and height.isdigit() and int(width) * int(height) <= SMALL_FRAME_AREA:
+        max_threads = min(max_threads, SMALL_FRAME_MAX_THREADS)
+    return max_threads
+
+# Extração de áudio: várias conversões por núcleo, uma thread cada
+def plan_audio_budget(settings, file_count, cores):
+    jobs = settings['parallel_jobs']
+    threads = settings['threads_per_job']
+    if threads == 'auto':
+        threads = 1
+    if jobs == 'auto':
+        jobs = min(AUDIO_MAX_JOBS, max(1, cores * AUDIO_JOBS_PER_CORE // threads))
+        if file_count:
+            jobs = min(jobs, file_count)
+    return {'cores': cores, 'encoder': 'audio', 'jobs': jobs, 'threads': threads, 'filter_threads': threads}
+
+# Opções com o plano de núcleos aplicado (conversões e threads sempre inteiros)
+def apply_core_budget(settings, plan):
+    return dict(settings, parallel_jobs=plan['jobs'], threads_per_job=plan['threads'], filter_threads=plan['filter_threads'])
+
+# Texto do comando para exibição, com aspas nos caminhos
+def format_command(command):
+    parts = []
+    for arg in command:
+        if not arg.startswith('-') and (' ' in arg or '/' in arg or '\\' in arg):
+            arg = f"\"{arg}\""
+        parts.append(arg)
+    return " ".join(parts)
+
+# Executa o ffprobe e retorna o JSON de fluxos e formato, ou None se não for possível
+class ProbeError(Exception):
+    pass
+
+# Cache de ffprobe (winff_probecache), aberto uma vez por arquivo; None se desativado ou indisponível
+probe_caches = {}
+probe_caches_lock = threading.Lock()
+
+def get_probe_cache(settings):
+    path = settings.get('probe_cache')
+    if not path:
+        return None
+    import sqlite3   # Importado aqui, junto com o cache
+    with probe_caches_lock:
+        if path not in probe_caches:
+            try:
+                max_bytes = int(float(settings.get('probe_cache_mb', DEFAULT_CONFIG['probe_cache_mb'])) * 1024 * 1024)
+                probe_caches[path] = ProbeCache(path, max_bytes)
+            except (sqlite3.Error, ValueError):
+                probe_caches[path] = None
+        return probe_caches[path]
+
+# Resultado já guardado no cache, sem executar o ffprobe (None se não houver)
+def cached_probe(ffprobe_path, input_file, cache, fast=False):
+    version = get_ffprobe_version(ffprobe_path, no_window_kwargs(), run=False) if cache else None
+    if version is None:
+        return None
+    return cache.get(input_file, version, 'fast' if fast else 'full')
+
+# Executa o ffprobe (ou lê do cache); em caso de falha levanta ProbeError com a mensagem do ffprobe.
+# No modo rápido, um resultado sem algum campo necessário é refeito com a sondagem completa
+def read_probe(ffprobe_path, input_file, cache=None, fast=False):
+    if cache:
+        version = get_ffprobe_version(ffprobe_path, no_window_kwargs())
+        info = cache.get(input_file, version, 'fast' if fast else 'full')
+        if info is not None:
+            return info
+    info = run_ffprobe(ffprobe_path, input_file, fast)
+    if fast and not probe_is_complete(info):
+        info = run_ffprobe(ffprobe_path, input_file)
+    if cache:
+        cache.put(input_file, version, 'fast' if fast else 'full', info)
+    return info
+
+# Confere se a sondagem rápida trouxe tudo o que a interface e o planejamento usam
+def probe_is_complete(info):
+    streams = info.get('streams') or []
+    if not streams or get_probe_duration(info) is None:
+        return False
+    for stream in streams:
+        if stream.get('codec_type') == 'video' and not (stream.get('codec_name') and stream.get('width') and stream.get('height')):
+            return False
+        if stream.get('codec_type') == 'audio' and not (stream.get('codec_name') and stream.get('sample_rate') and stream.get('channels')):
+            return False
+    return True
+
+def run_ffprobe(ffprobe_path, input_file, fast=False):
+    command = [ffprobe_path, '-v', 'error', '-print_format', 'json']
+    if fast:
+        command += ['-probesize', FAST_PROBE_SIZE, '-analyzeduration', FAST_ANALYZE_DURATION, '-show_entries', FAST_PROBE_ENTRIES]
+    else:
+        command += ['-show_streams', '-show_format']
+    command.append(input_file)
+    try:
+        process = subprocess.run(command, capture_output=True, **no_window_kwargs())
+    except OSError as e:
+        raise ProbeError(str(e))
+    if process.returncode != 0:
+        lines = process.stderr.decode('utf-8', 'replace').strip().splitlines()
+        raise ProbeError(lines[-1] if lines else f"exit code {process.returncode}")
+    try:
+        return json.loads(process.stdout)
+    except ValueError as e:
+        raise ProbeError(str(e))
+
+# Resultado do ffprobe, ou None se o arquivo não puder ser lido
+def probe_file(ffprobe_path, input_file, cache=None, fast=False):
+    try:
+        return read_probe(ffprobe_path, input_file, cache, fast)
+    except ProbeError:
+        return None
+
+# Duração (segundos) a partir do resultado do ffprobe
+def get_probe_duration(info):
+    try:
+        duration = float((info or {}).get('format', {}).get('duration', ''))
+    except ValueError:
+        return None
+    return duration if duration > 0 else None
+
+# Converte "30000/1001" ou "20" em número
+def parse_rate(value):
+    try:
+        numerator, _, denominator = str(value).partition('/')
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+# Taxa de bits da origem dentro do alvo ("800k", "2M"...). Sem taxa no fluxo (comum em ASF/WMV) vale a
+# do contêiner, que soma todos os fluxos e por isso é um limite superior; sem nenhuma das duas, ou com
+# alvo inválido, o fluxo é recodificado para respeitar o limite escolhido
+def bitrate_within_target(stream, target, format_info=None):
+    if not target:
+        return True
+    target_bps = parse_bitrate(target)
+    source_bps = parse_bitrate(stream.get('bit_rate')) or parse_bitrate((format_info or {}).get('bit_rate'))
+    if target_bps is None or source_bps is None:
+        return False
+    return source_bps <= target_bps * STREAM_COPY_BITRATE_TOLERANCE
+
+# Verifica se um fluxo de vídeo já atende ao perfil (codec, resolução, fps e taxa de bits)
+def video_stream_matches(stream, settings, format_info=None):
+    if ENCODER_CODEC_NAMES.get(settings['default_video_codec']) != stream.get('codec_name'):
+        return False
+    if settings['default_resolution'] != "original":
+        if settings['default_resolution'] != f"{stream.get('width')}x{stream.get('height')}":
+            return False
+    if settings['frame_rate']:
+        source_rate = parse_rate(stream.get('r_frame_rate'))
+        target_rate = parse_rate(settings['frame_rate'])
+        if source_rate is None or target_rate is None or abs(source_rate - target_rate) > 0.01:
+            return False
+    return bitrate_within_target(stream, settings['video_bitrate'], format_info)
+
+# Verifica se um fluxo de áudio já atende ao perfil (codec, amostragem, canais e taxa de bits)
+def audio_stream_matches(stream, settings, format_info=None):
+    if ENCODER_CODEC_NAMES.get(settings['default_audio_codec']) != stream.get('codec_name'):
+        return False
+    if settings['audio_sample_rate'] and str(stream.get('sample_rate')) != settings['audio_sample_rate']:
+        return False
+    if settings['audio_channels'] and str(stream.get('channels')) != settings['audio_channels']:
+        return False
+    return bitrate_within_target(stream, settings['audio_bitrate'], format_info)
+
+# Decide quais tipos de fluxo podem ser copiados sem recodificar: (copy_video, copy_audio)
+def plan_stream_copy(info, settings):
+    if not settings.get('stream_copy') or not info:
+        return False, False
+    settings = get_audio_settings(settings)
+    streams = info.get('streams', [])
+    video_streams = [stream for stream in streams if stream.get('codec_type') == 'video' and not stream.get('disposition', {}).get('attached_pic')]
+    audio_streams = [stream for stream in streams if stream.get('codec_type') == 'audio']
+    if is_audio_only(settings):
+        # Só o primeiro fluxo de áudio vai para a saída (-map 0:a:0)
+        return False, bool(audio_streams) and audio_stream_matches(audio_streams[0], settings, info.get('format'))
+    copy_video = bool(video_streams) and all(video_stream_matches(stream, settings, info.get('format')) for stream in video_streams)
+    copy_audio = bool(audio_streams) and all(audio_stream_matches(stream, settings, info.get('format')) for stream in audio_streams)
+    return copy_video, copy_audio
+
+# "800k", "2M" ou "204800" em bits por segundo; None se vazio ou inválido
+def parse_bitrate(value):
+    value = str(value or '').strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    try:
+        return float(value.rstrip('km')) * multiplier if value else None
+    except ValueError:
+        return None
+
+# Tamanho estimado (bytes) de uma saída: duração x taxas de bits alvo (ou as da origem nos
+# fluxos copiados); sem duração conhecida vale o tamanho da entrada
+def estimate_output_bytes(info, input_bytes, settings):
+    duration = get_probe_duration(info)
+    if not duration:
+        return input_bytes
+    source_bps = input_bytes * 8 / duration
+    streams = (info or {}).get('streams', [])
+    video_streams = [stream for stream in streams if stream.get('codec_type') == 'video']
+    audio_streams = [stream for stream in streams if stream.get('codec_type') == 'audio']
+    copy_video, copy_audio = plan_stream_copy(info, settings)
+    settings = get_audio_settings(settings)
+
+    def stream_bps(stream):
+        return parse_bitrate(stream.get('bit_rate')) or source_bps
+
+    video_bps = 0
+    if video_streams and not is_audio_only(settings):
+        video_bps = stream_bps(video_streams[0]) if copy_video else parse_bitrate(settings['video_bitrate']) or source_bps
+    audio_bps = 0
+    if audio_streams:
+        if copy_audio:
+            audio_bps = stream_bps(audio_streams[0])
+        elif settings['default_format'] in TRANSCRIPTION_CODECS and not settings['audio_bitrate']:
+            audio_bps = (parse_bitrate(settings['audio_sample_rate']) or 48000) * (parse_bitrate(settings['audio_channels']) or 2) * 16
+        else:
+            audio_bps = parse_bitrate(settings['audio_bitrate']) or stream_bps(audio_streams[0])
+    return duration * (video_bps + audio_bps) / 8
+
+# Converte o tempo de saída de um bloco "-progress" do ffmpeg para segundos
+def parse_progress_time(block):
+    for key in ('out_time_us', 'out_time_ms'):  # out_time_ms também é em microssegundos
+        value = block.get(key, '')
+        if value.lstrip('-').isdigit():
+            return max(0.0, int(value) / 1000000)
+    value = block.get('out_time', '')
+    try:
+        hours, minutes, seconds = value.split(':')
+        return max(0.0, int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+    except ValueError:
+        return None
+
+# Lê o fluxo chave=valor de "-progress" e chama on_progress a cada bloco completo
+def read_ffmpeg_progress(stream, on_progress):
+    block = {}
+    for line in stream:
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        block[key] = value.strip()
+        if key == 'progress':
+            speed = block.get('speed', '').rstrip('x')
+            fps = block.get('fps', '')
+            total_size = block.get('total_size', '')
+            on_progress({
+                'out_time': parse_progress_time(block),
+                'speed': float(speed) if speed.replace('.', '', 1).isdigit() else None,
+                'fps': float(fps) if fps.replace('.', '', 1).isdigit() else None,
+                'total_size': int(total_size) if total_size.isdigit() else None,
+                'finished': value.strip() == 'end',
+            })
+            block = {}
+
+# Espera o processo terminar. Com usage (dicionário), soma nele o tempo de CPU
+# (user_seconds, system_seconds) e o pico de memória (max_rss, bytes) do processo,
+# quando o sistema informa (os.wait4; não existe no Windows)
+usage_lock = threading.Lock()
+
+def wait_process(process, usage=None):
+    if usage is None or not hasattr(os, 'wait4'):
+        return process.wait()
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    rss_scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss é em KB no Linux e em bytes no macOS
+    with usage_lock:
+        usage['user_seconds'] = usage.get('user_seconds', 0.0) + rusage.ru_utime
+        usage['system_seconds'] = usage.get('system_seconds', 0.0) + rusage.ru_stime
+        usage['max_rss'] = max(usage.get('max_rss', 0), rusage.ru_maxrss * rss_scale)
+    return process.returncode
+
+# Executa um comando do ffmpeg com "-progress pipe:1". Retorna (código de saída, erro);
+# o erro é a última linha do stderr quando o código é diferente de zero
+def run_ffmpeg(command, on_progress=None, usage=None):
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, **no_window_kwargs())
+
+    # O stderr é drenado em paralelo para não travar o ffmpeg; só as últimas linhas interessam
+    stderr_tail = deque(maxlen=5)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(line.strip() for line in process.stderr if line.strip()), daemon=True)
+    stderr_thread.start()
+
+    read_ffmpeg_progress(process.stdout, on_progress or (lambda update: None))
+
+    wait_process(process, usage)
+    stderr_thread.join()
+    if process.returncode != 0:
+        return process.returncode, stderr_tail[-1] if stderr_tail else f"exit code {process.returncode}"
+    return 0, None
+
+# Instantes (segundos, relativos ao início do arquivo) dos quadros-chave do primeiro
+# fluxo de vídeo. Lê só os pacotes, sem decodificar
+def list_keyframes(ffprobe_path, input_file, start_time=0.0):
+    command = [ffprobe_path, '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', input_file]
+    try:
+        out = subprocess.check_output(command, universal_newlines=True, stderr=subprocess.DEVNULL, **no_window_kwargs())
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    keyframes = []
+    for line in out.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' not in flags:
+            continue
+        try:
+            keyframes.append(float(pts_time) - start_time)
+        except ValueError:
+            continue
+    return sorted(set(keyframes))
+
+# Escolhe os pontos de corte: o quadro-chave mais próximo de cada divisão ideal,
+# sem gerar partes menores que SPLIT_MIN_CHUNK_DURATION
+def plan_split_points(keyframes, duration, chunks):
+    points = []
+    for index in range(1, chunks):
+        target = duration * index / chunks
+        candidate = min(keyframes, key=lambda keyframe: abs(keyframe - target), default=None)
+        previous = points[-1] if points else 0.0
+        if candidate is None or candidate - previous < SPLIT_MIN_CHUNK_DURATION or duration - candidate < SPLIT_MIN_CHUNK_DURATION:
+            continue
+        points.append(candidate)
+    return points
+
+# Verifica se o arquivo deve ser dividido em partes codificadas em paralelo
+def should_split(info, settings, copy_video, copy_audio):
+    duration = get_probe_duration(info)
+    if not settings.get('split_encode') or not duration or copy_video or settings.get('renditions') or is_audio_only(settings):
+        return False
+    if settings['parallel_jobs'] < 2:
+        return False
+    return duration >= settings['split_min_duration']
+
+# Divide o arquivo em quadros-chave, codifica as partes em processos paralelos e junta
+# o resultado sem perdas com o demuxer concat. A junção também ocupa um slot, para não passar do
+# plano de núcleos enquanto outros arquivos codificam; a duração da saída juntada (ainda com o
+# nome temporário) é conferida com a original antes de o chamador dar o nome final
+def split_encode(input_file, output_file, settings, info, copy_audio, slots, on_progress=None, usage=None):
+    ffprobe_path = get_ffprobe_path(settings['ffmpeg_path'])
+    duration = get_probe_duration(info)
+    start_time = parse_rate((info.get('format') or {}).get('start_time', 0)) or 0.0
+    chunks = max(2, min(settings['parallel_jobs'], int(duration // SPLIT_MIN_CHUNK_DURATION)))
+    points = plan_split_points(list_keyframes(ffprobe_path, input_file, start_time), duration, chunks)
+    if not points:
+        return None  # Sem pontos de corte úteis: o chamador converte o arquivo inteiro
+
+    # Importados aqui: só o modo dividido usa, e o módulo é carregado na abertura da interface
+    import shutil
+    import tempfile
+    bounds = list(zip([0.0] + points, points + [None]))
+    chunk_dir = tempfile.mkdtemp(prefix=os.path.basename(output_file) + '.chunks_', dir=os.path.dirname(output_file))
+    extension = os.path.splitext(output_file)[1]
+    chunk_files = [os.path.join(chunk_dir, f"part{index:04d}{extension}") for index in range(len(bounds))]
+    chunk_times = [0.0] * len(bounds)
+    progress_lock = threading.Lock()
+    started = time.monotonic()
+
+    def encode_chunk(index):
+        start, end = bounds[index]
+        input_options = ['-ss', f"{start:.6f}"]
+        if end is not None:
+            input_options += ['-t', f"{end - start:.6f}"]
+        command = build_command(input_file, chunk_files[index], settings, progress=True, copy_audio=copy_audio, input_options=input_options)
+
+        def handle_progress(update):
+            with progress_lock:
+                if update['out_time'] is not None:
+                    chunk_times[index] = update['out_time']
+                encoded = sum(chunk_times)
+            if on_progress:
+                elapsed = time.monotonic() - started
+                on_progress({
+                    'out_time': encoded,
+                    'speed': encoded / elapsed if elapsed > 0 else None,
+                    'fps': None,
+                    'total_size': None,
+                    'finished': False,
+                })
+
+        with slots:
+            return run_ffmpeg(command, handle_progress, usage)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+            chunk_results = list(executor.map(encode_chunk, range(len(bounds))))
+        for returncode, error in chunk_results:
+            if returncode != 0:
+                return returncode, error
+
+        list_file = os.path.join(chunk_dir, 'concat.txt')
+        with open(list_file, 'w', encoding='utf-8') as file:
+            for chunk_file in chunk_files:
+                escaped = chunk_file.replace("'", "'\\''")
+                file.write(f"file '{escaped}'\n")
+        command = [settings['ffmpeg_path'], '-y', '-nostats', '-progress', 'pipe:1', '-f', 'concat', '-safe', '0', '-i', list_file, '-map', '0', '-c', 'copy', output_file]
+        with slots:
+            returncode, error = run_ffmpeg(command, usage=usage)
+            if returncode != 0:
+                return returncode, error
+            try:
+                output_duration = get_probe_duration(probe_file(ffprobe_path, output_file))
+            except ProbeError:
+                output_duration = None
+        if output_duration is None or abs(output_duration - duration) > max(SPLIT_DURATION_TOLERANCE, duration * 0.002):
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            return 1, f"duration mismatch after joining parts: {output_duration} s != {duration:.3f} s"
+        return 0, None
+
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+# Resultado inicial de um arquivo do lote (também o de um arquivo cujo processamento falhou antes do ffmpeg)
+def new_job_result(input_file, output_file):
+    return {'input_file': input_file, 'output_file': output_file, 'status': 'done', 'error': None, 'returncode': None,
+            'copied_streams': [], 'split': False, 'media_seconds': None, 'wall_seconds': None,
+            'user_seconds': None, 'system_seconds': None, 'max_rss': None, 'fps': None, 'speed': None,
+            'input_bytes': None, 'output_bytes': None, 'renditions': []}
+
+# Converte um único arquivo, copiando os fluxos que já atendem ao perfil. Retorna um dicionário com status "done", "failed"
+# ou "exists" (saída já existe e a sobrescrita está desativada). slots limita o total de
+# processos ffmpeg simultâneos quando vários arquivos (ou partes) são convertidos ao mesmo tempo.
+# A saída só recebe o nome final depois de concluída; uma falha não deixa arquivo parcial
+def convert_file(input_file, output_file, settings, on_progress=None, slots=None, info=None):
+    result = new_job_result(input_file, output_file)
+    slots = slots or threading.BoundedSemaphore(max(1, settings['parallel_jobs']))
+    renditions = get_rendition_outputs(output_file, settings)
+
+    if not settings['overwrite_existing']:
+        for existing_file in [output_file] + [rendition_file for rendition_file, _ in renditions]:
+            if os.path.exists(existing_file):
+                result['status'] = 'exists'
+                result['output_file'] = existing_file
+                return result
+
+    started = time.monotonic()
+    usage = {}
+    last_fps = {}
+    if os.path.exists(input_file):
+        result['input_bytes'] = os.path.getsize(input_file)
+    if info is None:
+        info = probe_file(get_ffprobe_path(settings['ffmpeg_path']), input_file, get_probe_cache(settings), settings.get('probe_mode') == 'fast')
+    duration = get_probe_duration(info)
+    result['media_seconds'] = duration
+    copy_video, copy_audio = plan_stream_copy(info, settings)
+    result['copied_streams'] = [kind for kind, copied in (('video', copy_video), ('audio', copy_audio)) if copied]
+
+    def handle_progress(update):
+        if update['fps']:
+            last_fps['fps'] = update['fps']
+        if duration and update['out_time'] is not None:
+            update['percent'] = min(100.0, 100 * update['out_time'] / duration)
+        else:
+            update['percent'] = None
+        if on_progress:
+            on_progress(update)
+
+    temp_file = get_temp_output_file(output_file)
+    # Rendições extras saem do mesmo processo; cada uma decide a cópia de fluxos pelas suas opções
+    extra_outputs = [(get_temp_output_file(rendition_file), rendition_settings) + plan_stream_copy(info, rendition_settings)
+                     for rendition_file, rendition_settings in renditions]
+    try:
+        outcome = None
+        if should_split(info, settings, copy_video, copy_audio):
+            outcome = split_encode(input_file, temp_file, settings, info, copy_audio, slots, handle_progress, usage)
+            result['split'] = outcome is not None
+        if outcome is None:
+            command = build_command(input_file, temp_file, settings, progress=True, copy_video=copy_video, copy_audio=copy_audio, extra_outputs=extra_outputs)
+            with slots:
+                outcome = run_ffmpeg(command, handle_progress, usage)
+        result['returncode'], result['error'] = outcome
+        if result['returncode'] != 0:
+            result['status'] = 'failed'
+        else:
+            # output_bytes soma todas as saídas do arquivo
+            os.replace(temp_file, output_file)
+            result['output_bytes'] = os.path.getsize(output_file)
+            for (rendition_file, _), extra_output in zip(renditions, extra_outputs):
+                os.replace(extra_output[0], rendition_file)
+                result['output_bytes'] += os.path.getsize(rendition_file)
+                result['renditions'].append(rendition_file)
+
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+
+    finally:
+        if result['status'] != 'done':
+            for partial_file in [temp_file] + [extra_output[0] for extra_output in extra_outputs]:
+                if os.path.exists(partial_file):
+                    os.remove(partial_file)
+        result['wall_seconds'] = time.monotonic() - started
+        result['user_seconds'] = usage.get('user_seconds')
+        result['system_seconds'] = usage.get('system_seconds')
+        result['max_rss'] = usage.get('max_rss')
+        # O ffmpeg já informa o fps médio desde o início; o último valor é a média da conversão
+        result['fps'] = last_fps.get('fps')
+        if duration and result['status'] == 'done' and result['wall_seconds']:
+            result['speed'] = duration / result['wall_seconds']
+
+    return result
+
+# Sonda vários arquivos em paralelo; retorna {arquivo: resultado do ffprobe ou None}
+def probe_files(ffprobe_path, files, workers=PROBE_WORKERS, cache=None, fast=False):
+    if not files:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        return dict(zip(files, executor.map(lambda file: probe_file(ffprobe_path, file, cache, fast), files)))
+
+# Custo estimado (segundos de mídia) de cada arquivo: a duração do ffprobe ou, sem ela,
+# o tamanho convertido pela taxa média de bytes por segundo dos arquivos com duração conhecida
+def estimate_job_costs(files, probes):
+    sizes = {}
+    for file in files:
+        try:
+            sizes[file] = os.path.getsize(file)
+        except OSError:
+            sizes[file] = 0
+    durations = {file: get_probe_duration(probes.get(file)) for file in files}
+    known = [file for file in files if durations[file] and sizes[file]]
+    bytes_per_second = sum(sizes[file] for file in known) / sum(durations[file] for file in known) if known else None
+    costs = {}
+    for file in files:
+        if durations[file]:
+            costs[file] = durations[file]
+        elif bytes_per_second:
+            costs[file] = sizes[file] / bytes_per_second
+        else:
+            costs[file] = float(sizes[file])  # Sem nenhuma duração: só a ordem relativa importa
+    return costs
+
+# Ordena o lote: "longest" (LPT, reduz o tempo total), "shortest" (retorno mais rápido) ou "original"
+def order_jobs(files, costs, order):
+    if order == 'longest':
+        return sorted(files, key=lambda file: costs[file], reverse=True)
+    if order == 'shortest':
+        return sorted(files, key=lambda file: costs[file])
+    return list(files)
+
+# Simula a fila (cada arquivo vai para o primeiro processo livre, na ordem dada) e
+# retorna o tempo total estimado em segundos, dada a velocidade de cada processo (x tempo real)
+def estimate_makespan(costs, workers, speed):
+    finish_times = [0.0] * max(1, workers)
+    for cost in costs:
+        finish_times.sort()
+        finish_times[0] += cost / speed
+    return max(finish_times)
+
+# Chave do perfil para o histórico de velocidade de codificação
+def get_speed_profile(settings):
+    if is_audio_only(settings):
+        audio_settings = get_audio_settings(settings)
+        profile = f"{settings['default_format']}:{audio_settings['default_audio_codec']}|{settings['threads_per_job']}"
+    else:
+        profile = f"{settings['default_video_codec']}|{settings['default_resolution']}|{settings['threads_per_job']}"
+    for rendition in settings.get('renditions') or []:
+        profile += f"+{rendition.get('default_video_codec', settings['default_video_codec'])}|{rendition.get('default_resolution', settings['default_resolution'])}"
+    return profile
+
+# Formata segundos como 1h02m03s
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+# Converte uma lista de arquivos com até parallel_jobs processos ffmpeg simultâneos.
+# on_event(evento, arquivo, dados) recebe "plan" (plano de núcleos, arquivo None),
+# "schedule" (ordem e tempo total estimado), "start", "progress", "done" e, ao final,
+# "summary" (tempo total real x estimado); uma falha não interrompe o restante da fila.
+# Com staging_dir, as entradas são copiadas antes para o disco local e as saídas
+# voltam ao destino em segundo plano (winff_staging). Cada conversão é registrada em
+# metrics_log (relativo à pasta de saída; vazio desativa).
+# Com journal (winff_jobqueue.JobJournal) e batch_id, o estado de cada arquivo é gravado
+# no diário para que o lote possa ser retomado depois de uma interrupção
+# probes: sondagens já feitas (ex.: pela verificação prévia do lote); só as que faltarem são refeitas
+def run_batch(files, settings, output_dir, on_event=None, journal=None, batch_id=None, probes=None):
+    os.makedirs(output_dir, exist_ok=True)
+    plan = plan_core_budget(settings, len(files))
+    settings = apply_core_budget(settings, plan)
+    slots = threading.BoundedSemaphore(settings['parallel_jobs'])
+
+    def notify(event, input_file, data=None):
+        if on_event:
+            on_event(event, input_file, data)
+
+    notify('plan', None, plan)
+
+    # Todos os arquivos são sondados antes (em paralelo) para ordenar o lote e estimar o tempo total
+    batch_started = time.monotonic()
+    probes = dict(probes or {})
+    probes.update(probe_files(get_ffprobe_path(settings['ffmpeg_path']), [file for file in files if file not in probes], cache=get_probe_cache(settings),
+                              fast=settings.get('probe_mode') == 'fast'))
+    costs = estimate_job_costs(files, probes)
+    order = settings.get('job_order', 'longest')
+    files = order_jobs(files, costs, order)
+    speed_profile = get_speed_profile(settings)
+    speed = journal.get_speed(speed_profile) if journal else None
+    schedule = {
+        'order': order,
+        'media_seconds': sum(costs.values()),
+        'speed': speed or 1.0,
+        'speed_known': speed is not None,
+        'estimated_makespan': estimate_makespan([costs[file] for file in files], settings['parallel_jobs'], speed or 1.0),
+    }
+    notify('schedule', None, schedule)
+
+    stager = None
+    if settings.get('staging_dir'):
+        # staging_read_limit_mb (MB/s, 0 = sem limite) evita saturar o link do compartilhamento
+        stager = InputStager(settings['staging_dir'], int(settings['staging_budget_mb'] * 1024 * 1024), settings['staging_prefetch'],
+                             settings['staging_read_limit_mb'] * 1024 * 1024 or None)
+        stager.start(files)
+    positions = {input_file: index for index, input_file in enumerate(files)}
+    metrics = MetricsLog(os.path.join(output_dir, settings['metrics_log'])) if settings.get('metrics_log') else None
+    batch_started_at = datetime.now().isoformat(timespec='milliseconds')
+    queued = time.monotonic()
+
+    def finish_job(result):
+        if journal:
+            journal.mark_finished(batch_id, result)
+        if metrics:
+            try:
+                metrics.write(job_metrics(result, batch_id, batch_started_at))
+            except OSError:
+                pass  # O registro de desempenho não pode derrubar a conversão
+        return result
+
+    # Retorna o resultado, ou um Future quando a saída ainda está voltando da área local
+    def run_job(input_file):
+        output_file = get_output_file(output_dir, input_file, settings)
+        if not stager:
+            notify('start', input_file)
+            queue_wait = time.monotonic() - queued
+            if journal:
+                journal.mark_running(batch_id, input_file, output_file, get_job_temp_files(output_file, settings))
+            result = convert_file(input_file, output_file, settings, on_progress=lambda update: notify('progress', input_file, update), slots=slots, info=probes.get(input_file))
+            result['queue_wait'] = queue_wait
+            return finish_job(result)
+
+        local_input = stager.acquire(input_file)
+        notify('start', input_file)
+        queue_wait = time.monotonic() - queued
+        if journal:
+            try:
+                journal.mark_running(batch_id, input_file, output_file, get_job_temp_files(output_file, settings))
+            except Exception:
+                stager.release(input_file, local_input)
+                raise
+        if not settings['overwrite_existing'] and os.path.exists(output_file):
+            stager.release(input_file, local_input)
+            return finish_job(dict(convert_file(input_file, output_file, settings, info=probes.get(input_file)), queue_wait=queue_wait))
+        # Com rendições extras, ou sem espaço reservado na área local, a saída é gravada direto no destino
+        local_output = None
+        if not settings.get('renditions'):
+            try:
+                input_bytes = os.path.getsize(input_file)
+            except OSError:
+                input_bytes = 0
+            local_output = stager.local_output(output_file, positions[input_file], estimate_output_bytes(probes.get(input_file), input_bytes, settings))
+        result = convert_file(local_input, local_output or output_file, settings, on_progress=lambda update: notify('progress', input_file, update), slots=slots, info=probes.get(input_file))
+        stager.release(input_file, local_input)
+        result['input_file'] = input_file
+        result['queue_wait'] = queue_wait
+        if local_output is None:
+            return finish_job(result)
+        result['output_file'] = output_file
+        if result['status'] != 'done':
+            stager.release_output(local_output)
+            return finish_job(result)
+
+        def on_moved(error):
+            if error:
+                result['status'] = 'failed'
+                result['error'] = error
+            return finish_job(result)
+        return stager.move_output(local_output, output_file, get_temp_output_file(output_file), on_moved)
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=settings['parallel_jobs']) as executor:
+            jobs = {executor.submit(run_job, input_file): input_file for input_file in files}
+            pending = set(jobs)
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    input_file = jobs.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Erro fora do ffmpeg (diário bloqueado, compartilhamento indisponível): só este arquivo falha
+                        result = dict(new_job_result(input_file, get_output_file(output_dir, input_file, settings)), status='failed', error=str(e))
+                        try:
+                            finish_job(result)
+                        except Exception:
+                            pass  # O diário pode ser a causa; o arquivo fica para a retomada
+                    if isinstance(result, Future):
+                        jobs[result] = input_file
+                        pending.add(result)
+                        continue
+                    results.append(result)
+                    notify('done', result['input_file'], result)
+    finally:
+        if stager:
+            stager.close()
+
+    # Velocidade observada (x tempo real por processo) nos arquivos recodificados inteiros, para a próxima estimativa
+    encoded = [result for result in results if result['status'] == 'done' and result['media_seconds'] and not result['copied_streams'] and not result['split']]
+    encoded_seconds = sum(result['wall_seconds'] for result in encoded)
+    observed_speed = sum(result['media_seconds'] for result in encoded) / encoded_seconds if encoded_seconds else None
+    if journal:
+        if observed_speed:
+            journal.record_speed(speed_profile, observed_speed)
+        journal.finish_batch(batch_id)
+    notify('summary', None, dict(schedule, actual_makespan=time.monotonic() - batch_started, observed_speed=observed_speed))
+    return results
@@ -0,0 +1,58 @@
+# Lista de arquivos do lote: conjunto ordenado (dicionário + lista de ordem) com tamanho,
+# duração e situação de cada arquivo; incluir, remover e limpar continuam rápidos com
+# 100 mil arquivos e a interface pede só as linhas visíveis
+class FileList:
+    def __init__(self):
+        self.entries = {}   # caminho -> {'size', 'duration', 'status'}
+        self.order = []
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    # Inclui os caminhos ainda não listados, na ordem recebida; retorna os novos
+    def add(self, paths):
+        added = []
+        for path in paths:
+            if path not in self.entries:
+                self.entries[path] = {'size': None, 'duration': None, 'status': ''}
+                added.append(path)
+        self.order.extend(added)
+        return added
+
+    # Remove vários caminhos com uma única passada pela ordem
+    def remove(self, paths):
+        removed = 0
+        for path in paths:
+            if self.entries.pop(path, None) is not None:
+                removed += 1
+        if removed:
+            self.order = [path for path in self.order if path in self.entries]
+        return removed
+
+    def clear(self):
+        self.entries = {}
+        self.order = []
+
+    def paths(self):
+        return list(self.order)
+
+    def first(self):
+        return self.order[0] if self.order else None
+
+    # Linhas [start, start + count) como (caminho, dados)
+    def rows(self, start, count):
+        return [(path, self.entries[path]) for path in self.order[start:start + count]]
+
+    # Atualiza tamanho/duração/situação de um arquivo (ignorado se ele já saiu da lista)
+    def update(self, path, **fields):
+        entry = self.entries.get(path)
+        if entry is not None:
+            entry.update(fields)
+        return entry is not None
+
+    def set_status(self, paths, status):
+        for path in paths:
+            self.update(path, status=status)
@@ -0,0 +1,158 @@
+# Diário persistente (SQLite) da fila de conversão: sobrevive a fechamento da
+# interface, reinicialização da máquina ou queda do ffmpeg, e permite retomar o lote
+import os
+import glob
+import json
+import time
+import sqlite3
+import threading
+
+# Estados de cada arquivo no diário
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    finished REAL,
+    output_dir TEXT NOT NULL,
+    settings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id INTEGER NOT NULL REFERENCES batches(id),
+    position INTEGER NOT NULL,
+    input_file TEXT NOT NULL,
+    output_file TEXT,
+    temp_file TEXT,            -- lista JSON com os temporários de todas as saídas (antes: um caminho)
+    state TEXT NOT NULL,
+    error TEXT,
+    returncode INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started REAL,
+    finished REAL,
+    UNIQUE (batch_id, input_file)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (batch_id, state);
+CREATE TABLE IF NOT EXISTS encode_speeds (
+    profile TEXT PRIMARY KEY,
+    speed REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    # Registra um novo lote com todos os arquivos pendentes e retorna o id do lote. Os caminhos
+    # são gravados absolutos, para a retomada funcionar a partir de qualquer pasta
+    def create_batch(self, files, output_dir, settings):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("INSERT INTO batches (created, output_dir, settings) VALUES (?, ?, ?)",
+                           (time.time(), os.path.abspath(output_dir), json.dumps(settings)))
+            batch_id = cursor.lastrowid
+            cursor.executemany("INSERT OR IGNORE INTO jobs (batch_id, position, input_file, state) VALUES (?, ?, ?, ?)",
+                               [(batch_id, position, os.path.abspath(input_file), PENDING) for position, input_file in enumerate(files)])
+            cursor.execute("COMMIT")
+        return batch_id
+
+    # temp_files: temporários de todas as saídas do arquivo (principal e rendições)
+    def mark_running(self, batch_id, input_file, output_file, temp_files):
+        self.execute("UPDATE jobs SET state = ?, output_file = ?, temp_file = ?, attempts = attempts + 1, started = ?, finished = NULL "
+                     "WHERE batch_id = ? AND input_file = ?",
+                     (RUNNING, output_file, json.dumps([os.path.abspath(temp_file) for temp_file in temp_files]), time.time(),
+                      batch_id, os.path.abspath(input_file)))
+
+    # Grava o resultado de convert_file; "exists" conta como falha (saída não produzida)
+    def mark_finished(self, batch_id, result):
+        state = DONE if result['status'] == 'done' else FAILED
+        self.execute("UPDATE jobs SET state = ?, output_file = ?, temp_file = NULL, error = ?, returncode = ?, finished = ? "
+                     "WHERE batch_id = ? AND input_file = ?",
+                     (state, result['output_file'], result['error'] or (result['status'] if state == FAILED else None),
+                      result['returncode'], time.time(), batch_id, os.path.abspath(result['input_file'])))
+
+    # Arquivo barrado antes da conversão (verificação prévia de um lote retomado)
+    def mark_failed(self, batch_id, input_file, error):
+        self.execute("UPDATE jobs SET state = ?, temp_file = NULL, error = ?, finished = ? WHERE batch_id = ? AND input_file = ?",
+                     (FAILED, error, time.time(), batch_id, os.path.abspath(input_file)))
+
+    # Fecha o lote quando nenhum arquivo está pendente ou em andamento
+    def finish_batch(self, batch_id):
+        remaining = self.execute("SELECT COUNT(*) FROM jobs WHERE batch_id = ? AND state IN (?, ?)", (batch_id, PENDING, RUNNING))[0][0]
+        if not remaining:
+            self.execute("UPDATE batches SET finished = ? WHERE id = ?", (time.time(), batch_id))
+        return not remaining
+
+    # Lotes não concluídos: (id, pasta de saída, opções, arquivos restantes)
+    def unfinished_batches(self):
+        rows = self.execute("SELECT b.id, b.output_dir, b.settings, COUNT(j.id) FROM batches b "
+                            "JOIN jobs j ON j.batch_id = b.id AND j.state IN (?, ?) "
+                            "WHERE b.finished IS NULL GROUP BY b.id ORDER BY b.id", (PENDING, RUNNING))
+        return [(batch_id, output_dir, json.loads(settings), count) for batch_id, output_dir, settings, count in rows]
+
+    # Prepara a retomada: apaga saídas parciais dos arquivos que estavam em andamento,
+    # devolve-os ao estado pendente e retorna a lista de arquivos ainda não concluídos
+    def recover(self, batch_id):
+        running = self.execute("SELECT input_file, temp_file FROM jobs WHERE batch_id = ? AND state = ?", (batch_id, RUNNING))
+        for input_file, temp_files in running:
+            for temp_file in load_temp_files(temp_files):
+                remove_partial_output(temp_file)
+        self.execute("UPDATE jobs SET state = ?, temp_file = NULL WHERE batch_id = ? AND state = ?", (PENDING, batch_id, RUNNING))
+        rows = self.execute("SELECT input_file FROM jobs WHERE batch_id = ? AND state = ? ORDER BY position", (batch_id, PENDING))
+        return [input_file for (input_file,) in rows]
+
+    # Descarta um lote não concluído (o operador escolheu não retomar)
+    def abandon_batch(self, batch_id):
+        self.recover(batch_id)
+        self.execute("UPDATE batches SET finished = ? WHERE id = ?", (time.time(), batch_id))
+
+    # Velocidade de codificação (x tempo real por processo) observada no último lote do perfil
+    def get_speed(self, profile):
+        rows = self.execute("SELECT speed FROM encode_speeds WHERE profile = ?", (profile,))
+        return rows[0][0] if rows else None
+
+    def record_speed(self, profile, speed):
+        self.execute("INSERT OR REPLACE INTO encode_speeds (profile, speed, updated) VALUES (?, ?, ?)", (profile, speed, time.time()))
+
+    def counts(self, batch_id):
+        return dict(self.execute("SELECT state, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY state", (batch_id,)))
+
+# Temporários gravados por mark_running; diários antigos guardavam um único caminho
+def load_temp_files(value):
+    if not value:
+        return []
+    try:
+        temp_files = json.loads(value)
+    except ValueError:
+        return [value]
+    return temp_files if isinstance(temp_files, list) else [value]
+
+# Remove o arquivo temporário de uma conversão interrompida e as partes do modo dividido
+def remove_partial_output(temp_file):
+    if not temp_file:
+        return
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+    for chunk_dir in glob.glob(glob.escape(temp_file) + '.chunks_*'):
+        for name in os.listdir(chunk_dir):
+            os.remove(os.path.join(chunk_dir, name))
+        os.rmdir(chunk_dir)
@@ -0,0 +1,89 @@
+# Registro de desempenho por conversão (JSONL ou CSV, conforme a extensão), gravado
+# ao lado das saídas para planejamento de capacidade
+import os
+import csv
+import json
+import time
+import threading
+
+# Campos de cada registro, na ordem das colunas do CSV
+METRICS_FIELDS = [
+    'batch_id', 'batch_started', 'finished', 'input_file', 'output_file', 'status', 'returncode', 'error',
+    'queue_wait_seconds', 'wall_seconds', 'user_seconds', 'system_seconds', 'max_rss',
+    'media_seconds', 'fps', 'speed', 'input_bytes', 'output_bytes', 'size_ratio', 'copied_streams', 'split',
+]
+
+NUMERIC_FIELDS = {'returncode', 'queue_wait_seconds', 'wall_seconds', 'user_seconds', 'system_seconds', 'max_rss',
+                  'media_seconds', 'fps', 'speed', 'input_bytes', 'output_bytes', 'size_ratio'}
+
+# Registro de um resultado de convert_file
+def job_metrics(result, batch_id=None, batch_started=None):
+    record = {field: result.get(field) for field in METRICS_FIELDS}
+    record['batch_id'] = batch_id
+    record['batch_started'] = batch_started
+    record['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    record['queue_wait_seconds'] = result.get('queue_wait')
+    record['copied_streams'] = ','.join(result.get('copied_streams') or [])
+    if result.get('input_bytes') and result.get('output_bytes'):
+        record['size_ratio'] = result['output_bytes'] / result['input_bytes']
+    return record
+
+class MetricsLog:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    # Acrescenta um registro (o arquivo é aberto e fechado a cada conversão, então um
+    # lote interrompido mantém os registros das conversões já concluídas)
+    def write(self, record):
+        with self.lock:
+            if self.path.lower().endswith('.csv'):
+                new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                with open(self.path, 'a', encoding='utf-8', newline='') as file:
+                    writer = csv.DictWriter(file, fieldnames=METRICS_FIELDS)
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerow(record)
+            else:
+                with open(self.path, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps(record) + '\n')
+
+def read_metrics(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        if not path.lower().endswith('.csv'):
+            return [json.loads(line) for line in file if line.strip()]
+        records = []
+        for row in csv.DictReader(file):
+            for field in NUMERIC_FIELDS:
+                row[field] = float(row[field]) if row.get(field) else None
+            records.append(row)
+        return records
+
+# Registros do lote mais recente do arquivo
+def last_batch_metrics(records):
+    if not records:
+        return []
+    last = records[-1]['batch_started']
+    return [record for record in records if record['batch_started'] == last]
+
+# Totais de um conjunto de registros para o resumo
+def summarize_metrics(records):
+    def total(field):
+        return sum(record[field] or 0 for record in records)
+
+    done = [record for record in records if record['status'] == 'done']
+    wall = sum(record['wall_seconds'] or 0 for record in done)
+    return {
+        'files': len(records),
+        'done': len(done),
+        'failed': len(records) - len(done),
+        'wall_seconds': total('wall_seconds'),
+        'queue_wait_seconds': max((record['queue_wait_seconds'] or 0 for record in records), default=0),
+        'user_seconds': total('user_seconds'),
+        'system_seconds': total('system_seconds'),
+        'max_rss': max((record['max_rss'] or 0 for record in records), default=0),
+        'media_seconds': sum(record['media_seconds'] or 0 for record in done),
+        'speed': sum(record['media_seconds'] or 0 for record in done) / wall if wall else None,
+        'input_bytes': total('input_bytes'),
+        'output_bytes': total('output_bytes'),
+    }
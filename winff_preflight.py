@@ -0,0 +1,173 @@
+# Verificação do lote antes de codificar: sonda todas as entradas em paralelo, testa cada
+# combinação de formato/codecs no ffmpeg instalado (uma gravação curta de quadros sintéticos
+# descartada em os.devnull), procura saídas repetidas ou já existentes e compara o tamanho
+# estimado das saídas com o espaço livre. Tudo vai para um único relatório
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from winff_capabilities import FORMAT_MUXERS
+from winff_core import (PROBE_WORKERS, read_probe, ProbeError, get_probe_cache, get_ffprobe_path, get_output_file, get_output_format,
+                        get_rendition_outputs, get_audio_settings, is_audio_only, build_output_options, estimate_output_bytes,
+                        check_capabilities, get_capabilities, no_window_kwargs)
+
+# Entrada sintética do teste de gravação: vídeo (0:v) e áudio (0:a) no mesmo arquivo, como numa gravação real
+TRIAL_INPUT = "color=c=black:s=320x240:r=20[out0];anullsrc=r=44100:cl=stereo[out1]"
+TRIAL_DURATION = '0.2'
+TRIAL_TIMEOUT = 30
+
+# Folga sobre o tamanho estimado das saídas ao comparar com o espaço livre
+SPACE_MARGIN = 1.1
+
+# Textos de cada problema: os quatro primeiros impedem o lote inteiro, os demais só o arquivo
+PROBLEM_TEXTS = {
+    'capability': ("missing_capabilities", "The selected FFmpeg does not support"),
+    'incompatible': ("preflight_incompatible", "FFmpeg rejected this format/codec combination"),
+    'output_dir': ("preflight_output_dir", "The output folder cannot be written"),
+    'disk_space': ("preflight_disk_space", "Not enough free space for the estimated output"),
+    'unreadable': ("preflight_unreadable", "Cannot be read:"),
+    'no_audio': ("preflight_no_audio", "No audio stream to extract:"),
+    'exists': ("file_exists_error", "The file already exists and cannot be overwritten."),
+    'duplicate_output': ("preflight_duplicate_output", "Same output name as"),
+}
+
+# Grava TRIAL_DURATION segundos sintéticos com as opções da saída; None se o ffmpeg aceitou,
+# senão a última linha de erro. Testes iguais (mesmo ffmpeg e opções) são feitos uma vez por processo
+trial_results = {}
+
+def trial_mux(ffmpeg_path, settings):
+    muxer = FORMAT_MUXERS.get(get_output_format(settings), get_output_format(settings))
+    options = build_output_options(dict(settings, threads_per_job='auto'))
+    key = (ffmpeg_path, muxer, tuple(options))
+    if key in trial_results:
+        return trial_results[key]
+    command = ([ffmpeg_path, '-hide_banner', '-nostdin', '-v', 'error', '-f', 'lavfi', '-i', TRIAL_INPUT]
+               + options + ['-t', TRIAL_DURATION, '-f', muxer, '-y', os.devnull])
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, errors='replace', timeout=TRIAL_TIMEOUT, **no_window_kwargs())
+    except subprocess.TimeoutExpired:
+        return None  # Sem resposta a tempo: a conversão real mostra o erro, se houver
+    except OSError as e:
+        return str(e)
+    lines = process.stderr.strip().splitlines()
+    error = None if process.returncode == 0 else (lines[-1] if lines else f"exit code {process.returncode}")
+    trial_results[key] = error
+    return error
+
+# Pasta existente mais próxima (a de saída pode ainda não ter sido criada)
+def existing_parent(path):
+    path = os.path.abspath(path)
+    while not os.path.isdir(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+# Relatório: 'batch' [(tipo, detalhe)] impede o lote; 'file_problems' {entrada: [(tipo, detalhe)]} só aquele
+# arquivo; 'probes' fica com as sondagens (None nas que falharam) para run_batch não sondar de novo
+def run_preflight(files, settings, output_dir, workers=PROBE_WORKERS):
+    started = time.monotonic()
+    report = {'files': len(files), 'outputs': 0, 'batch': [], 'file_problems': {}, 'probes': {},
+              'estimated_bytes': 0.0, 'free_bytes': None, 'seconds': None}
+
+    def add_problem(input_file, kind, detail=''):
+        if input_file is None:
+            report['batch'].append((kind, detail))
+        else:
+            report['file_problems'].setdefault(input_file, []).append((kind, detail))
+
+    for kind, name in check_capabilities(settings):
+        add_problem(None, 'capability', f"{kind} {name}")
+
+    ffprobe_path = get_ffprobe_path(settings['ffmpeg_path'])
+    cache = get_probe_cache(settings)
+    fast = settings.get('probe_mode') == 'fast'
+
+    def probe(input_file):
+        try:
+            return read_probe(ffprobe_path, input_file, cache, fast), None
+        except ProbeError as e:
+            return None, str(e)
+
+    # Perfis de saída distintos (principal e rendições); o teste de gravação precisa do lavfi
+    profiles = [settings] + [rendition_settings for _, rendition_settings in get_rendition_outputs('', settings)]
+    index = get_capabilities(settings)
+    can_trial = not report['batch'] and index is not None and 'lavfi' in index['demuxers']
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files) + len(profiles)))) as executor:
+        trials = [executor.submit(trial_mux, settings['ffmpeg_path'], profile) for profile in profiles] if can_trial else []
+        probes = dict(zip(files, executor.map(probe, files)))
+        for profile, trial in zip(profiles, trials):
+            error = trial.result()
+            if error:
+                add_problem(None, 'incompatible', f"{get_output_format(profile)} + {get_audio_settings(profile)['default_video_codec']}/"
+                                                  f"{get_audio_settings(profile)['default_audio_codec']}: {error}")
+
+    outputs = {}
+    for input_file in files:
+        info, error = probes[input_file]
+        report['probes'][input_file] = info
+        if info is None:
+            add_problem(input_file, 'unreadable', error)
+        output_file = get_output_file(output_dir, input_file, settings)
+        for target, target_settings in [(output_file, settings)] + get_rendition_outputs(output_file, settings):
+            report['outputs'] += 1
+            key = os.path.normcase(os.path.abspath(target))
+            if key in outputs:
+                add_problem(input_file, 'duplicate_output', f"{outputs[key]} ({os.path.basename(target)})")
+                continue
+            outputs[key] = input_file
+            if not settings['overwrite_existing'] and os.path.exists(target):
+                add_problem(input_file, 'exists', target)
+            if info is None:
+                continue
+            if is_audio_only(target_settings) and not any(stream.get('codec_type') == 'audio' for stream in info.get('streams', [])):
+                add_problem(input_file, 'no_audio', os.path.basename(target))
+            try:
+                input_bytes = os.path.getsize(input_file)
+            except OSError:
+                input_bytes = 0
+            report['estimated_bytes'] += estimate_output_bytes(info, input_bytes, target_settings)
+
+    target_dir = existing_parent(output_dir)
+    if not os.access(target_dir, os.W_OK):
+        add_problem(None, 'output_dir', target_dir)
+    else:
+        try:
+            import shutil   # Importado aqui: o módulo é carregado na abertura da interface
+            report['free_bytes'] = shutil.disk_usage(target_dir).free
+        except OSError:
+            pass
+        if report['free_bytes'] is not None and report['estimated_bytes'] * SPACE_MARGIN > report['free_bytes']:
+            add_problem(None, 'disk_space', f"{report['estimated_bytes'] / 2**20:.0f} MB > {report['free_bytes'] / 2**20:.0f} MB ({target_dir})")
+
+    report['seconds'] = time.monotonic() - started
+    return report
+
+def report_has_problems(report):
+    return bool(report['batch'] or report['file_problems'])
+
+# Arquivos sem problema próprio, na ordem original
+def valid_files(report, files):
+    return [input_file for input_file in files if input_file not in report['file_problems']]
+
+def problem_text(kind, language):
+    key, fallback = PROBLEM_TEXTS[kind]
+    return language.get(key, fallback)
+
+# Texto do relatório; limit: máximo de arquivos listados (None lista todos)
+def format_preflight_report(report, language, limit=20):
+    lines = [f"{report['files']} {language.get('files', 'files')}, {report['outputs']} {language.get('preflight_outputs', 'outputs')}, "
+             f"~{report['estimated_bytes'] / 2**20:.0f} MB"
+             + (f" / {report['free_bytes'] / 2**20:.0f} MB {language.get('preflight_free', 'free')}" if report['free_bytes'] is not None else "")
+             + f" ({report['seconds']:.1f} s)"]
+    for kind, detail in report['batch']:
+        lines.append(f"{problem_text(kind, language)}: {detail}")
+    problems = list(report['file_problems'].items())
+    for input_file, file_problems in problems[:limit]:
+        for kind, detail in file_problems:
+            lines.append(f"{os.path.basename(input_file)}: {problem_text(kind, language)} {detail}".rstrip())
+    if limit is not None and len(problems) > limit:
+        lines.append(f"... (+{len(problems) - limit})")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+# Cache persistente (SQLite) dos resultados do ffprobe, por caminho absoluto e modo da sondagem
+# (rápida ou completa, cada uma na sua linha), validado pelo tamanho, data de modificação e versão
+# do ffprobe; entradas menos usadas saem primeiro
+import os
+import json
+import time
+import threading
+import subprocess
+
+# Versão do esquema (PRAGMA user_version); um cache de outra versão é descartado ao abrir
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path TEXT NOT NULL,
+    probe_mode TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (path, probe_mode)
+);
+CREATE INDEX IF NOT EXISTS probes_last_used ON probes (last_used);
+"""
+
+# Versão de cada binário do ffprobe, consultada uma vez por processo (e de novo se o binário mudar)
+probe_versions = {}
+probe_versions_lock = threading.Lock()
+
+# Com run=False só devolve uma versão já conhecida (None se ainda não consultada)
+def get_ffprobe_version(ffprobe_path, popen_kwargs=None, run=True):
+    try:
+        stat = os.stat(ffprobe_path)
+        key = (ffprobe_path, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        key = (ffprobe_path, None, None)
+    with probe_versions_lock:
+        if key in probe_versions or not run:
+            return probe_versions.get(key)
+    try:
+        output = subprocess.run([ffprobe_path, '-version'], capture_output=True, text=True, **(popen_kwargs or {})).stdout
+        version = output.splitlines()[0] if output else ''
+    except OSError:
+        version = ''
+    with probe_versions_lock:
+        probe_versions[key] = version
+    return version
+
+class ProbeCache:
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        import sqlite3   # Importado aqui: só quem abre o cache paga a carga do módulo
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS probes")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(SCHEMA)
+        # Total de bytes mantido a cada gravação; a soma real só é refeita quando ele passa do limite
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM probes").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # Chave do arquivo como está agora no disco; None se ele não puder ser lido
+    @staticmethod
+    def file_key(input_file):
+        try:
+            stat = os.stat(input_file)
+        except OSError:
+            return None
+        return os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns
+
+    # Resultado guardado se o arquivo e o ffprobe não mudaram; uma entrada desatualizada é apagada.
+    # probe_mode: 'fast' ou 'full'; as duas sondagens do mesmo arquivo não se invalidam
+    def get(self, input_file, version, probe_mode):
+        key = self.file_key(input_file)
+        if key is None:
+            return None
+        path, size, mtime_ns = key
+        with self.lock:
+            row = self.connection.execute("SELECT size, mtime_ns, version, data, bytes FROM probes WHERE path = ? AND probe_mode = ?",
+                                          (path, probe_mode)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if (row[0], row[1], row[2]) != (size, mtime_ns, version):
+                self.connection.execute("DELETE FROM probes WHERE path = ? AND probe_mode = ?", (path, probe_mode))
+                self.total_bytes -= row[4]
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE probes SET last_used = ? WHERE path = ? AND probe_mode = ?", (time.time(), path, probe_mode))
+            self.hits += 1
+        return json.loads(row[3])
+
+    def put(self, input_file, version, probe_mode, info):
+        key = self.file_key(input_file)
+        if key is None:
+            return
+        path, size, mtime_ns = key
+        data = json.dumps(info, separators=(',', ':'))
+        with self.lock:
+            row = self.connection.execute("SELECT bytes FROM probes WHERE path = ? AND probe_mode = ?", (path, probe_mode)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO probes (path, probe_mode, size, mtime_ns, version, data, bytes, last_used) "
+                                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (path, probe_mode, size, mtime_ns, version, data, len(data), time.time()))
+            self.total_bytes += len(data) - (row[0] if row else 0)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    # Remove as entradas usadas há mais tempo até o cache caber em max_bytes. A soma é refeita
+    # aqui porque outro processo pode ter gravado no mesmo arquivo
+    def evict(self):
+        total = self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM probes").fetchone()[0]
+        removed = 0
+        if total > self.max_bytes:
+            for path, probe_mode, size in self.connection.execute("SELECT path, probe_mode, bytes FROM probes ORDER BY last_used").fetchall():
+                if total - removed <= self.max_bytes:
+                    break
+                self.connection.execute("DELETE FROM probes WHERE path = ? AND probe_mode = ?", (path, probe_mode))
+                removed += size
+        self.total_bytes = total - removed
+
+    def stats(self):
+        with self.lock:
+            entries, total = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM probes").fetchone()
+        return {'entries': entries, 'bytes': total, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,117 @@
+# Importação recursiva de pastas: os diretórios são lidos com os.scandir em um pool de
+# threads (um diretório por tarefa) e os arquivos de mídia encontrados são entregues em lotes
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from winff_core import MEDIA_EXTENSIONS
+
+SCAN_WORKERS = 8
+SCAN_BATCH_SIZE = 500
+SCAN_FLUSH_INTERVAL = 0.5   # Segundos máximos entre lotes, para o progresso andar em compartilhamentos lentos
+
+# Arquivos modificados há menos que isso (segundos) são considerados ainda em gravação
+SETTLE_SECONDS = 30
+
+# Assinaturas dos contêineres aceitos em arquivos sem extensão de mídia: (posição, bytes)
+MAGIC_SIGNATURES = [
+    (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'),   # ASF/WMV/WMA
+    (4, b'ftyp'), (4, b'moov'), (4, b'mdat'),   # MP4/MOV/3GP/M4A
+    (0, b'\x1a\x45\xdf\xa3'),                   # Matroska/WebM
+    (0, b'FLV'),
+    (0, b'\x00\x00\x01\xba'),                   # MPEG-PS
+    (0, b'ID3'), (0, b'fLaC'), (0, b'OggS'),
+]
+MAGIC_READ_SIZE = 512
+
+def has_media_magic(path):
+    try:
+        with open(path, 'rb') as file:
+            header = file.read(MAGIC_READ_SIZE)
+    except OSError:
+        return False
+    if any(header[offset:offset + len(signature)] == signature for offset, signature in MAGIC_SIGNATURES):
+        return True
+    if header[:4] == b'RIFF' and header[8:12] in (b'AVI ', b'WAVE'):
+        return True
+    if len(header) > 188 and header[0] == 0x47 and header[188] == 0x47:   # MPEG-TS (pacotes de 188 bytes)
+        return True
+    return len(header) > 1 and header[0] == 0xff and header[1] & 0xe0 == 0xe0   # MP3/AAC sem cabeçalho ID3
+
+# Lê um diretório: retorna os arquivos aceitos [(caminho, tamanho)], os subdiretórios e os contadores de descarte
+def scan_directory(directory, use_magic, settle_seconds, now):
+    files = []
+    subdirectories = []
+    skipped = {'empty': 0, 'growing': 0, 'other': 0, 'errors': 0}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    media_extension = os.path.splitext(entry.name)[1].lower() in MEDIA_EXTENSIONS
+                    if not media_extension and not use_magic:
+                        skipped['other'] += 1
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    skipped['errors'] += 1
+                    continue
+                if stat.st_size == 0:
+                    skipped['empty'] += 1
+                elif now - stat.st_mtime < settle_seconds:
+                    skipped['growing'] += 1
+                elif media_extension or has_media_magic(entry.path):
+                    files.append((entry.path, stat.st_size))
+                else:
+                    skipped['other'] += 1
+    except OSError:
+        skipped['errors'] += 1
+    files.sort()
+    return files, subdirectories, skipped
+
+# Percorre as pastas e chama on_batch([(caminho, tamanho), ...]) a cada lote, na thread que
+# chamou esta função; cancel (threading.Event) interrompe a busca. Retorna os totais
+def scan_media_files(roots, on_batch, use_magic=False, settle_seconds=SETTLE_SECONDS, workers=SCAN_WORKERS,
+                     batch_size=SCAN_BATCH_SIZE, cancel=None, on_progress=None):
+    totals = {'files': 0, 'directories': 0, 'empty': 0, 'growing': 0, 'other': 0, 'errors': 0, 'cancelled': False}
+    cancel = cancel or threading.Event()
+    now = time.time()
+    batch = []
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal batch, last_flush
+        if batch:
+            on_batch(batch)
+            batch = []
+        last_flush = time.monotonic()
+        if on_progress:
+            on_progress(totals)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scan_directory, root, use_magic, settle_seconds, now) for root in roots}
+        while pending:
+            done, pending = wait(pending, timeout=SCAN_FLUSH_INTERVAL, return_when=FIRST_COMPLETED)
+            if cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                totals['cancelled'] = True
+                break
+            for future in done:
+                files, subdirectories, skipped = future.result()
+                totals['directories'] += 1
+                totals['files'] += len(files)
+                for key, count in skipped.items():
+                    totals[key] += count
+                batch.extend(files)
+                for subdirectory in sorted(subdirectories):
+                    pending.add(executor.submit(scan_directory, subdirectory, use_magic, settle_seconds, now))
+            if len(batch) >= batch_size or time.monotonic() - last_flush >= SCAN_FLUSH_INTERVAL:
+                flush()
+    if not totals['cancelled']:
+        flush()
+    return totals
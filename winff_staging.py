@@ -0,0 +1,243 @@
+# Área de preparação local para entradas em armazenamento lento (compartilhamento SMB):
+# os próximos arquivos da fila são copiados para o disco local enquanto os anteriores
+# são convertidos, e as saídas prontas voltam para o destino em segundo plano
+import os
+import time
+import socket
+import threading
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+# Tamanho de cada leitura ao copiar (grandes o bastante para compartilhamentos de rede)
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Áreas locais deixadas por execuções interrompidas: cada uma tem um arquivo com o processo
+# dono; as sem dono (versões anteriores) são removidas depois de STALE_STAGING_SECONDS
+STAGING_PREFIX = 'winff_staging_'
+OWNER_FILE = 'owner'
+STALE_STAGING_SECONDS = 6 * 3600
+
+def process_alive(pid):
+    if platform.system() == "Windows":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)   # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259   # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# Remove as áreas locais de execuções que não estão mais rodando nesta máquina
+def sweep_stale_staging(scratch_dir):
+    import shutil
+    try:
+        entries = [entry for entry in os.scandir(scratch_dir) if entry.name.startswith(STAGING_PREFIX) and entry.is_dir()]
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            with open(os.path.join(entry.path, OWNER_FILE), encoding='utf-8') as file:
+                host, _, pid = file.read().strip().rpartition(' ')
+            stale = host == socket.gethostname() and pid.isdigit() and not process_alive(int(pid))
+        except OSError:
+            try:
+                stale = time.time() - entry.stat().st_mtime > STALE_STAGING_SECONDS
+            except OSError:
+                continue
+        if stale:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+# Limite de leitura (bytes/s) compartilhado por todas as cópias, como o link de um
+# compartilhamento de rede; também permite simular localmente um diretório lento
+class ReadThrottle:
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self.lock = threading.Lock()
+        self.available_at = time.monotonic()
+
+    def consume(self, size):
+        with self.lock:
+            start = max(self.available_at, time.monotonic())
+            self.available_at = start + size / self.bytes_per_second
+            delay = self.available_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+# Copia um arquivo em blocos, respeitando o limite de leitura se houver
+def copy_file(source, destination, throttle=None, chunk_size=COPY_CHUNK_SIZE):
+    copied = 0
+    with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+        while True:
+            chunk = source_file.read(chunk_size)
+            if not chunk:
+                break
+            if throttle:
+                throttle.consume(len(chunk))
+            destination_file.write(chunk)
+            copied += len(chunk)
+    return copied
+
+class InputStager:
+    # prefetch: quantos arquivos copiar à frente dos que já estão em conversão (0 copia
+    # só quando o arquivo é pedido, alternando leitura e conversão); budget: bytes de entradas
+    # e saídas na área local (um arquivo maior que o espaço disponível usa direto a origem/destino)
+    def __init__(self, scratch_dir, budget, prefetch=2, read_limit=None):
+        import tempfile   # Só quando a área local é usada; não pesa na abertura da interface
+        os.makedirs(scratch_dir, exist_ok=True)
+        sweep_stale_staging(scratch_dir)
+        self.directory = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=scratch_dir)
+        with open(os.path.join(self.directory, OWNER_FILE), 'w', encoding='utf-8') as file:
+            file.write(f"{socket.gethostname()} {os.getpid()}")
+        self.budget = budget
+        self.prefetch = prefetch
+        self.throttle = ReadThrottle(read_limit) if read_limit else None
+        self.condition = threading.Condition()
+        self.staged = {}      # entrada -> cópia local, ou None se for lida direto da origem
+        self.sizes = {}       # entrada -> bytes ocupados na área local
+        self.output_sizes = {}   # saída local -> bytes reservados até voltar ao destino
+        self.positions = {}
+        self.waiting = 0      # copiados e ainda não pedidos por uma conversão
+        self.used = 0
+        self.closed = False
+        self.thread = None
+        self.mover = ThreadPoolExecutor(max_workers=1)
+
+    def start(self, files):
+        self.queue = list(files)
+        self.positions = {input_file: index for index, input_file in enumerate(self.queue)}
+        if self.prefetch > 0:
+            self.thread = threading.Thread(target=self.stage_ahead, daemon=True)
+            self.thread.start()
+
+    def local_path(self, input_file, index):
+        return os.path.join(self.directory, f"{index:05d}_{os.path.basename(input_file)}")
+
+    # Reserva espaço na área local; False se o arquivo não cabe nem com a área vazia. Com
+    # wait=False não espera espaço ser liberado (saídas: esperar poderia travar a fila)
+    def reserve(self, size, wait=True):
+        with self.condition:
+            if size > self.budget:
+                return False
+            while wait and not self.closed and self.used + size > self.budget:
+                self.condition.wait()
+            if self.closed or self.used + size > self.budget:
+                return False
+            self.used += size
+            return True
+
+    def free(self, size):
+        with self.condition:
+            self.used -= size
+            self.condition.notify_all()
+
+    # Copia um arquivo para a área local; em caso de falha a conversão lê da origem
+    def stage(self, input_file, index):
+        try:
+            size = os.path.getsize(input_file)
+        except OSError:
+            return None, 0
+        if not self.reserve(size):
+            return None, 0
+        local_file = self.local_path(input_file, index)
+        try:
+            copy_file(input_file, local_file, self.throttle)
+        except OSError:
+            if os.path.exists(local_file):
+                os.remove(local_file)
+            self.free(size)
+            return None, 0
+        return local_file, size
+
+    # Thread de cópia antecipada: segue a ordem da fila, no máximo prefetch arquivos à frente
+    def stage_ahead(self):
+        for index, input_file in enumerate(self.queue):
+            with self.condition:
+                while not self.closed and self.waiting >= self.prefetch:
+                    self.condition.wait()
+                if self.closed:
+                    return
+            local_file, size = self.stage(input_file, index)
+            with self.condition:
+                self.staged[input_file] = local_file
+                self.sizes[input_file] = size
+                self.waiting += 1
+                self.condition.notify_all()
+
+    # Caminho que a conversão deve ler: espera a cópia antecipada ou copia na hora (prefetch 0)
+    def acquire(self, input_file):
+        if self.prefetch <= 0:
+            local_file, size = self.stage(input_file, self.positions[input_file])
+            with self.condition:
+                self.sizes[input_file] = size
+            return local_file or input_file
+        with self.condition:
+            while not self.closed and input_file not in self.staged:
+                self.condition.wait()
+            local_file = self.staged.pop(input_file, None)
+            self.waiting -= 1
+            self.condition.notify_all()
+        return local_file or input_file
+
+    # Descarta a cópia local de uma entrada já convertida
+    def release(self, input_file, local_file):
+        if local_file != input_file and os.path.exists(local_file):
+            os.remove(local_file)
+        size = self.sizes.pop(input_file, 0)
+        if size:
+            self.free(size)
+
+    # Saída gravada primeiro na área local, com expected_bytes reservados até ela voltar ao
+    # destino; None se não houver espaço agora (a conversão grava direto no destino)
+    def local_output(self, output_file, index, expected_bytes):
+        size = max(1, int(expected_bytes or 0))
+        if not self.reserve(size, wait=False):
+            return None
+        local_file = os.path.join(self.directory, f"{index:05d}_out_{os.path.basename(output_file)}")
+        with self.condition:
+            self.output_sizes[local_file] = size
+        return local_file
+
+    # Libera o espaço reservado para uma saída local (movida ou descartada)
+    def release_output(self, local_file):
+        if os.path.exists(local_file):
+            os.remove(local_file)
+        with self.condition:
+            size = self.output_sizes.pop(local_file, 0)
+        if size:
+            self.free(size)
+
+    # Move uma saída pronta para o destino em segundo plano: copia para o nome temporário
+    # ao lado do destino e renomeia atomicamente; retorna um Future com on_moved(erro)
+    def move_output(self, local_file, output_file, temp_file, on_moved):
+        def move():
+            error = None
+            try:
+                copy_file(local_file, temp_file)
+                os.replace(temp_file, output_file)
+            except OSError as e:
+                error = str(e)
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            finally:
+                self.release_output(local_file)
+            return on_moved(error)
+        return self.mover.submit(move)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+        self.mover.shutdown(wait=True)
+        import shutil
+        shutil.rmtree(self.directory, ignore_errors=True)
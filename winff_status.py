@@ -0,0 +1,133 @@
+# Situação do lote em andamento servida por HTTP só em localhost, em JSON (/status)
+# e no formato texto do Prometheus (/metrics), para acompanhar lotes noturnos à distância
+import json
+import time
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Janelas (segundos) da vazão informada e quantos minutos de histórico são mantidos
+THROUGHPUT_WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+HISTORY_MINUTES = 60
+
+class BatchStatus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = {}
+        self.completed = 0
+        self.failed = 0
+        self.media_seconds = 0.0
+        self.batch_started = None
+        self.finished_times = deque()   # (instante, segundos de mídia) das conversões concluídas
+        self.history = deque(maxlen=HISTORY_MINUTES)
+
+    # Chamado antes de cada lote com a quantidade de arquivos
+    def start_batch(self, file_count):
+        with self.lock:
+            self.queued += file_count
+            self.batch_started = time.time()
+
+    # Recebe os mesmos eventos de winff_core.run_batch; só atualiza contadores (não bloqueia a conversão)
+    def on_event(self, event, input_file, data):
+        now = time.time()
+        with self.lock:
+            if event == 'start':
+                self.queued = max(0, self.queued - 1)
+                self.active[input_file] = {'started': now, 'percent': None, 'fps': None, 'speed': None}
+            elif event == 'progress' and input_file in self.active:
+                self.active[input_file].update(percent=data['percent'], fps=data['fps'], speed=data['speed'])
+            elif event == 'done':
+                self.active.pop(input_file, None)
+                if data['status'] == 'done':
+                    self.completed += 1
+                    media_seconds = data.get('media_seconds') or 0.0
+                    self.media_seconds += media_seconds
+                    self.finished_times.append((now, media_seconds))
+                    minute = int(now // 60) * 60
+                    if self.history and self.history[-1][0] == minute:
+                        self.history[-1][1] += 1
+                        self.history[-1][2] += media_seconds
+                    else:
+                        self.history.append([minute, 1, media_seconds])
+                else:
+                    self.failed += 1
+            while self.finished_times and now - self.finished_times[0][0] > max(THROUGHPUT_WINDOWS.values()):
+                self.finished_times.popleft()
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            throughput = {}
+            for name, window in THROUGHPUT_WINDOWS.items():
+                recent = [media for finished, media in self.finished_times if now - finished <= window]
+                throughput[name] = {'files_per_minute': len(recent) * 60 / window, 'media_seconds_per_second': sum(recent) / window}
+            return {
+                'time': now,
+                'batch_started': self.batch_started,
+                'queue_depth': self.queued,
+                'active_jobs': [dict(job, file=input_file, elapsed=now - job['started']) for input_file, job in self.active.items()],
+                'completed': self.completed,
+                'failed': self.failed,
+                'media_seconds_completed': self.media_seconds,
+                'throughput': throughput,
+                'history': [{'minute': minute, 'completed': count, 'media_seconds': media} for minute, count, media in self.history],
+            }
+
+# Formato texto do Prometheus (exposition format 0.0.4)
+def format_prometheus(snapshot):
+    def label(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    lines = [
+        "# HELP winff_queue_depth Files waiting to start.", "# TYPE winff_queue_depth gauge",
+        f"winff_queue_depth {snapshot['queue_depth']}",
+        "# HELP winff_active_jobs Conversions running now.", "# TYPE winff_active_jobs gauge",
+        f"winff_active_jobs {len(snapshot['active_jobs'])}",
+        "# HELP winff_jobs_completed_total Conversions finished successfully.", "# TYPE winff_jobs_completed_total counter",
+        f"winff_jobs_completed_total {snapshot['completed']}",
+        "# HELP winff_jobs_failed_total Conversions that failed.", "# TYPE winff_jobs_failed_total counter",
+        f"winff_jobs_failed_total {snapshot['failed']}",
+        "# HELP winff_media_seconds_completed_total Media seconds converted.", "# TYPE winff_media_seconds_completed_total counter",
+        f"winff_media_seconds_completed_total {snapshot['media_seconds_completed']}",
+        "# HELP winff_throughput_files_per_minute Finished conversions per minute over the window.", "# TYPE winff_throughput_files_per_minute gauge",
+    ]
+    for window, values in snapshot['throughput'].items():
+        lines.append(f'winff_throughput_files_per_minute{{window="{window}"}} {values["files_per_minute"]}')
+    for metric, key, help_text in (('winff_job_progress_percent', 'percent', "Progress of each running conversion."),
+                                   ('winff_job_fps', 'fps', "Frames per second of each running conversion."),
+                                   ('winff_job_speed', 'speed', "Speed (x realtime) of each running conversion.")):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for job in snapshot['active_jobs']:
+            if job[key] is not None:
+                lines.append(f'{metric}{{file="{label(job["file"])}"}} {job[key]}')
+    return "\n".join(lines) + "\n"
+
+class StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path in ('/', '/status'):
+            body = json.dumps(self.server.status.snapshot(), indent=2).encode('utf-8')
+            content_type = 'application/json'
+        elif path == '/metrics':
+            body = format_prometheus(self.server.status.snapshot()).encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Sem log de cada consulta no console
+
+# Inicia o servidor em uma thread própria, sempre em 127.0.0.1; port 0 escolhe uma porta livre
+def start_status_server(status, port):
+    server = ThreadingHTTPServer(('127.0.0.1', port), StatusHandler)
+    server.daemon_threads = True
+    server.status = status
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
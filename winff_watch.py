@@ -0,0 +1,189 @@
+# Observação de pastas de entrada: gravações novas são entregues quando o tamanho e a data de
+# modificação param de mudar. No Linux usa inotify (via libc, sem dependências) para reagir na
+# hora; a varredura periódica continua valendo como garantia, porque compartilhamentos de rede
+# montados não avisam escritas feitas por outras máquinas, e é o único modo nos demais sistemas
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import platform
+from winff_core import MEDIA_EXTENSIONS
+from winff_scan import has_media_magic
+
+WATCH_SETTLE_SECONDS = 15   # Tempo sem mudança de tamanho/data para a gravação ser considerada pronta
+WATCH_POLL_SECONDS = 10     # Intervalo da varredura completa das pastas
+WATCH_CHECK_SECONDS = 1.0   # Intervalo entre verificações dos arquivos em observação
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT = struct.Struct('iIII')   # wd, mask, cookie, len (seguido do nome)
+
+class Inotify:
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.directories = {}
+
+    def add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self.directories[wd] = directory
+
+    # Eventos até timeout segundos: [(caminho, é_diretório)]; (None, False) se a fila do kernel estourou
+    def read(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0')
+            offset += INOTIFY_EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, False))
+            elif mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+            elif wd in self.directories and name:
+                events.append((os.path.join(self.directories[wd], os.fsdecode(name)), bool(mask & IN_ISDIR)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+# inotify se disponível (Linux), senão None e o observador só faz varreduras
+def open_inotify():
+    if platform.system() != 'Linux':
+        return None
+    try:
+        return Inotify()
+    except (OSError, AttributeError):
+        return None
+
+class FolderWatcher:
+    # on_ready(caminho) é chamado uma vez para cada gravação pronta (de novo se ela mudar depois);
+    # ignore_names: pastas não observadas (ex.: a de arquivos convertidos dentro da pasta de entrada);
+    # include_existing: os arquivos já presentes ao iniciar também são entregues
+    def __init__(self, directories, on_ready, settle_seconds=WATCH_SETTLE_SECONDS, poll_seconds=WATCH_POLL_SECONDS,
+                 use_magic=False, ignore_names=(), include_existing=False):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.on_ready = on_ready
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.use_magic = use_magic
+        self.ignore_names = set(ignore_names)
+        self.include_existing = include_existing
+        self.inotify = open_inotify()
+        self.watched = set()
+        self.candidates = {}   # caminho -> ((tamanho, mtime_ns), desde quando) ou None se ainda não verificado
+        self.queued = {}       # caminho -> (tamanho, mtime_ns) com que foi entregue
+
+    @property
+    def mode(self):
+        return 'inotify' if self.inotify else 'polling'
+
+    def is_media(self, path):
+        return os.path.splitext(path)[1].lower() in MEDIA_EXTENSIONS or (self.use_magic and has_media_magic(path))
+
+    # Percorre uma pasta (e subpastas), passando a observá-la; com existing=True os arquivos
+    # encontrados contam como já entregues (estado inicial sem include_existing)
+    def scan(self, directory, existing=False):
+        if self.inotify and directory not in self.watched:
+            try:
+                self.inotify.add(directory)
+                self.watched.add(directory)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:   # Limite de inotify do sistema: segue só com a varredura
+                    self.inotify.close()
+                    self.inotify = None
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.startswith('.') or entry.name in self.ignore_names:
+                continue   # Ocultos incluem as saídas temporárias (.nome.partial.ext)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self.scan(entry.path, existing)
+                    continue
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            key = (stat.st_size, stat.st_mtime_ns)
+            if self.queued.get(entry.path) == key or entry.path in self.candidates:
+                continue
+            if existing:
+                self.queued[entry.path] = key
+            elif self.is_media(entry.path):
+                self.candidates[entry.path] = None
+
+    def observe(self, path):
+        name = os.path.basename(path)
+        if not name.startswith('.') and path not in self.candidates and self.is_media(path):
+            self.candidates[path] = None
+
+    # Entrega os arquivos sem mudança de tamanho e data há settle_seconds
+    def check(self):
+        now = time.monotonic()
+        for path, observed in list(self.candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.candidates[path]
+                continue
+            key = (stat.st_size, stat.st_mtime_ns)
+            if self.queued.get(path) == key:
+                del self.candidates[path]
+            elif observed is None or observed[0] != key or key[0] == 0:
+                self.candidates[path] = (key, now)
+            elif now - observed[1] >= self.settle_seconds:
+                del self.candidates[path]
+                self.queued[path] = key
+                self.on_ready(path)
+
+    # Observa até stop (threading.Event) ser sinalizado
+    def run(self, stop):
+        for directory in self.directories:
+            self.scan(directory, existing=not self.include_existing)
+        next_scan = time.monotonic() + self.poll_seconds
+        try:
+            while not stop.is_set():
+                if self.inotify:
+                    for path, is_dir in self.inotify.read(WATCH_CHECK_SECONDS):
+                        if path is None:
+                            next_scan = 0
+                        elif is_dir:
+                            if os.path.basename(path) not in self.ignore_names and not os.path.basename(path).startswith('.'):
+                                self.scan(path)
+                        else:
+                            self.observe(path)
+                else:
+                    stop.wait(WATCH_CHECK_SECONDS)
+                if time.monotonic() >= next_scan:
+                    for directory in self.directories:
+                        self.scan(directory)
+                    next_scan = time.monotonic() + self.poll_seconds
+                self.check()
+        finally:
+            if self.inotify:
+                self.inotify.close()